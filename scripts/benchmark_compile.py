@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Compare eager and accelerated train_step/validate on CPU.
+
+Compile time (first steps) and steady-state step time are reported
+separately. The accelerated mode runs twice in fresh processes sharing one
+compile cache, so the second run shows the warm-restart cost.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import torch
+import torch.multiprocessing as mp
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.models.resnet import MODEL_REGISTRY, create_model
+from src.pipeline.trainer import DistributedTrainer
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_mode(accelerated: bool, cache_dir: str, args, results) -> None:
+    config = {
+        'accelerated': accelerated,
+        'compile_cache_dir': cache_dir,
+        'optimizer': 'sgd',
+        'learning_rate': 0.01,
+    }
+    with patch('boto3.client'):
+        trainer = DistributedTrainer(config, distributed=False)
+    model = trainer.load_model(create_model(args.model, num_classes=10))
+    optimizer = trainer.create_optimizer(model)
+    criterion = torch.nn.CrossEntropyLoss()
+    batch = (torch.randn(args.batch_size, 3, args.image_size, args.image_size),
+             torch.randint(0, 10, (args.batch_size,)))
+
+    # The first train step compiles forward, backward and optimizer step;
+    # the first validate compiles the eval graph.
+    first_train = timed(lambda: trainer.train_step(model, batch, optimizer, criterion))
+    first_eval = timed(lambda: trainer.validate(model, [batch]))
+    train = [timed(lambda: trainer.train_step(model, batch, optimizer, criterion))
+             for _ in range(args.steps)]
+    evals = [timed(lambda: trainer.validate(model, [batch])) for _ in range(args.steps)]
+    steady_train = sorted(train)[len(train) // 2]
+    steady_eval = sorted(evals)[len(evals) // 2]
+    results.put({
+        'compile_s': first_train + first_eval - steady_train - steady_eval,
+        'train_ms': steady_train * 1000,
+        'eval_ms': steady_eval * 1000,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the accelerated execution mode')
+    parser.add_argument('--model', default='resnet18', choices=sorted(MODEL_REGISTRY))
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--image-size', type=int, default=224)
+    parser.add_argument('--steps', type=int, default=10)
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    cache_dir = tempfile.mkdtemp(prefix='inductor_cache_')
+    runs = [
+        ('eager', False),
+        ('accelerated (cold cache)', True),
+        ('accelerated (warm cache)', True),
+    ]
+    print(f"{'mode':<26} {'compile s':>10} {'train ms/step':>14} {'eval ms/step':>13}")
+    for name, accelerated in runs:
+        process = ctx.Process(target=run_mode, args=(accelerated, cache_dir, args, results))
+        process.start()
+        row = results.get()
+        process.join()
+        print(f"{name:<26} {row['compile_s']:>10.2f} {row['train_ms']:>14.1f} {row['eval_ms']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
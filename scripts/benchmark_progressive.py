@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Compare time to a target validation accuracy with and without progressive resizing.
+
+Both modes train the same model from the same initialisation on the same
+data, each in a fresh process. Without --data a synthetic dataset (one
+colour per class plus noise) is generated in memory, so the comparison runs
+offline:
+
+    python scripts/benchmark_progressive.py --schedule 0:128,2:176,4:224 --target-accuracy 90
+    python scripts/benchmark_progressive.py --data /mnt/nvme/imagenette --model resnet50
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import torch
+import torch.multiprocessing as mp
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.models.resnet import MODEL_REGISTRY
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.storage import MemoryStorage, Storage, open_storage
+
+
+def parse_schedule(text: str) -> Dict[int, int]:
+    """``'0:128,4:224'`` -> ``{0: 128, 4: 224}``."""
+    stages = {}
+    for stage in text.split(','):
+        epoch, resolution = stage.split(':')
+        stages[int(epoch)] = int(resolution)
+    return stages
+
+
+def synthetic_storage(samples: int, classes: int, image_size: int = 256) -> Storage:
+    storage = MemoryStorage()
+    generator = torch.Generator().manual_seed(0)
+    colors = torch.rand(classes, 3, 1, 1, generator=generator)
+    for split, count in (('train', samples), ('val', max(samples // 5, classes))):
+        for i in range(count):
+            label = i % classes
+            pixels = 0.6 * colors[label] + 0.4 * torch.rand(3, image_size, image_size,
+                                                              generator=generator)
+            image = Image.fromarray((pixels * 255).byte().permute(1, 2, 0).numpy())
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=90)
+            storage.put(f'{split}/class_{label}/{i}.jpg', buffer.getvalue())
+    return storage
+
+
+def time_to_accuracy(history: List[Dict[str, Any]], target: float) -> Optional[float]:
+    """Wall-clock seconds until validation accuracy first reached ``target``."""
+    for entry in history:
+        if entry['val_accuracy'] is not None and entry['val_accuracy'] >= target:
+            return entry['elapsed_s']
+    return None
+
+
+def run_mode(overrides: Dict[str, Any], args, results) -> None:
+    """Train with ``overrides`` applied to the base config; put the history on ``results``."""
+    storage = open_storage(args.data) if args.data else synthetic_storage(args.samples,
+                                                                          args.classes)
+    train_dataset = S3Dataset(None, prefix='train/', storage=storage)
+    val_loader = torch.utils.data.DataLoader(
+        S3Dataset(None, prefix='val/', storage=storage),
+        batch_size=args.batch_size, num_workers=args.num_workers)
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        config = {
+            'model_name': args.model,
+            'num_classes': args.classes,
+            'batch_size': args.batch_size,
+            'epochs': args.epochs,
+            'optimizer': 'sgd',
+            'learning_rate': args.lr,
+            'num_workers': args.num_workers,
+            'snapshot_path': os.path.join(snapshot_dir, 'snapshot.pt'),
+            'snapshot_every': 10 ** 9,
+            'handle_preemption': False,
+            **overrides,
+        }
+        torch.manual_seed(args.seed)
+        trainer = DistributedTrainer(config, distributed=False)
+        model = trainer.build_model()
+        trainer.fit(model, trainer.create_optimizer(model), torch.nn.CrossEntropyLoss(),
+                    train_dataset, val_loader)
+    results.put(trainer.history)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark progressive resizing')
+    parser.add_argument('--data', help='Storage URL with train/ and val/ (default: synthetic)')
+    parser.add_argument('--model', default='resnet18', choices=sorted(MODEL_REGISTRY))
+    parser.add_argument('--classes', type=int, default=10)
+    parser.add_argument('--samples', type=int, default=2000, help='Synthetic training samples')
+    parser.add_argument('--schedule', default='0:128,2:160,4:192,6:224',
+                        help='Comma-separated first_epoch:resolution stages')
+    parser.add_argument('--scale-batch', action='store_true',
+                        help='Scale the batch size with resolution')
+    parser.add_argument('--target-accuracy', type=float, default=90.0)
+    parser.add_argument('--epochs', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--lr', type=float, default=0.05)
+    parser.add_argument('--num-workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    runs = [('fixed 224', {}),
+            ('progressive', {'resolution_schedule': parse_schedule(args.schedule),
+                             'scale_batch_with_resolution': args.scale_batch})]
+    reached = {}
+    print(f"{'mode':<14} {'time to target s':>17} {'final acc':>10} {'total s':>9}")
+    for name, overrides in runs:
+        process = ctx.Process(target=run_mode, args=(overrides, args, results))
+        process.start()
+        history = results.get()
+        process.join()
+        reached[name] = time_to_accuracy(history, args.target_accuracy)
+        to_target = f"{reached[name]:.1f}" if reached[name] is not None else 'not reached'
+        print(f"{name:<14} {to_target:>17} {history[-1]['val_accuracy']:>9.2f}% "
+              f"{history[-1]['elapsed_s']:>9.1f}")
+
+    if None not in reached.values():
+        print(f"\nProgressive resizing reached {args.target_accuracy:.1f}% val accuracy "
+              f"{reached['fixed 224'] / reached['progressive']:.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Compare samples and time to a target validation accuracy with and without pruning.
+
+Runs the same training as benchmark_progressive.py (fresh process per mode,
+synthetic data unless --data is given), once on the full dataset and once
+with loss-based pruning of well-learned samples:
+
+    python scripts/benchmark_pruning.py --keep-fraction 0.3 --target-accuracy 90
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import torch.multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.models.resnet import MODEL_REGISTRY
+from scripts.benchmark_progressive import run_mode, time_to_accuracy
+
+
+def samples_to_accuracy(history: List[Dict[str, Any]], target: float) -> Optional[int]:
+    """Training samples processed until validation accuracy first reached ``target``."""
+    samples = 0
+    for entry in history:
+        samples += entry['samples']
+        if entry['val_accuracy'] is not None and entry['val_accuracy'] >= target:
+            return samples
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark loss-based data pruning')
+    parser.add_argument('--data', help='Storage URL with train/ and val/ (default: synthetic)')
+    parser.add_argument('--model', default='resnet18', choices=sorted(MODEL_REGISTRY))
+    parser.add_argument('--classes', type=int, default=10)
+    parser.add_argument('--samples', type=int, default=2000, help='Synthetic training samples')
+    parser.add_argument('--keep-fraction', type=float, default=0.3,
+                        help='Share of below-mean-loss samples kept per epoch')
+    parser.add_argument('--warmup-epochs', type=int, default=1)
+    parser.add_argument('--anneal-epochs', type=int, default=1)
+    parser.add_argument('--target-accuracy', type=float, default=90.0)
+    parser.add_argument('--epochs', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--lr', type=float, default=0.05)
+    parser.add_argument('--num-workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    runs = [('full', {'track_sample_losses': True}),
+            ('pruned', {'prune_keep_fraction': args.keep_fraction,
+                        'prune_warmup_epochs': args.warmup_epochs,
+                        'prune_anneal_epochs': args.anneal_epochs})]
+    reached = {}
+    print(f"{'mode':<8} {'samples to target':>18} {'time to target s':>17} "
+          f"{'total samples':>14} {'final acc':>10}")
+    for name, overrides in runs:
+        process = ctx.Process(target=run_mode, args=(overrides, args, results))
+        process.start()
+        history = results.get()
+        process.join()
+        reached[name] = samples_to_accuracy(history, args.target_accuracy)
+        seconds = time_to_accuracy(history, args.target_accuracy)
+        samples = str(reached[name]) if reached[name] is not None else 'not reached'
+        to_target = f"{seconds:.1f}" if seconds is not None else 'not reached'
+        total = sum(entry['samples'] for entry in history)
+        print(f"{name:<8} {samples:>18} {to_target:>17} {total:>14} "
+              f"{history[-1]['val_accuracy']:>9.2f}%")
+
+    if None not in reached.values():
+        print(f"\nPruning reached {args.target_accuracy:.1f}% val accuracy with "
+              f"{1 - reached['pruned'] / reached['full']:.0%} fewer samples")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Measure peak memory and throughput of the ResNet memory/speed options."""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+import torch
+import torch.multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.models.resnet import MODEL_REGISTRY, create_model
+
+# name -> (create_model kwargs, training?, fuse for eval?)
+OPTIONS = {
+    'baseline': ({}, True, False),
+    'checkpoint': ({'checkpoint_stages': [1, 2, 3, 4]}, True, False),
+    'channels_last': ({'channels_last': True}, True, False),
+    'eval': ({}, False, False),
+    'eval_fused': ({}, False, True),
+}
+
+
+def peak_memory_mb(device: torch.device) -> float:
+    if device.type == 'cuda':
+        return torch.cuda.max_memory_allocated(device) / 2**20
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_option(option: str, args, results) -> None:
+    kwargs, training, fuse = OPTIONS[option]
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    model = create_model(args.model, num_classes=10, **kwargs).to(device)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    criterion = torch.nn.CrossEntropyLoss()
+    data = torch.randn(args.batch_size, 3, args.image_size, args.image_size, device=device)
+    target = torch.randint(0, 10, (args.batch_size,), device=device)
+
+    if not training:
+        model.eval()
+        if fuse:
+            model.fuse()
+
+    def step():
+        if training:
+            optimizer.zero_grad(set_to_none=True)
+            criterion(model(data), target).backward()
+            optimizer.step()
+        else:
+            with torch.inference_mode():
+                model(data)
+        if device.type == 'cuda':
+            torch.cuda.synchronize()
+
+    for _ in range(args.warmup):
+        step()
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        step()
+    elapsed = time.perf_counter() - start
+
+    results.put((option, args.batch_size * args.steps / elapsed, peak_memory_mb(device)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ResNet options')
+    parser.add_argument('--model', default='resnet50', choices=sorted(MODEL_REGISTRY))
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--image-size', type=int, default=224)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--options', nargs='+', default=list(OPTIONS), choices=list(OPTIONS))
+    args = parser.parse_args()
+
+    # One fresh process per option so peak memory is not carried over
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    print(f"{'option':<14} {'samples/sec':>12} {'peak MB':>10}")
+    for option in args.options:
+        process = ctx.Process(target=run_option, args=(option, args, results))
+        process.start()
+        name, throughput, peak = results.get()
+        process.join()
+        print(f"{name:<14} {throughput:>12.1f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Compare per-rank memory of DDP, ZeRO and FSDP on a local gloo run."""
+
+import argparse
+import os
+import resource
+import socket
+import sys
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.models.resnet import create_model
+from src.pipeline.trainer import DistributedTrainer, SHARDING_MODES
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def tensor_bytes(tensors) -> int:
+    return sum(t.numel() * t.element_size() for t in tensors if torch.is_tensor(t))
+
+
+def optimizer_state_bytes(optimizer: torch.optim.Optimizer) -> int:
+    # ZeroRedundancyOptimizer keeps the local shard on its wrapped optimizer
+    inner = getattr(optimizer, 'optim', optimizer)
+    return sum(tensor_bytes(state.values()) for state in inner.state.values())
+
+
+def run_rank(rank: int, world_size: int, port: int, args) -> None:
+    os.environ.update({
+        'MASTER_ADDR': '127.0.0.1',
+        'MASTER_PORT': str(port),
+        'RANK': str(rank),
+        'WORLD_SIZE': str(world_size),
+    })
+    torch.manual_seed(0)
+    config = {
+        'sharding': args.mode,
+        'optimizer': 'adam',
+        'learning_rate': 0.001,
+        'checkpoint_bucket': None,
+    }
+    trainer = DistributedTrainer(config, distributed=True)
+    model = trainer.load_model(create_model(args.model, num_classes=10))
+    optimizer = trainer.create_optimizer(model)
+    criterion = torch.nn.CrossEntropyLoss()
+
+    batch = (torch.randn(args.batch_size, 3, args.image_size, args.image_size),
+             torch.randint(0, 10, (args.batch_size,)))
+    for _ in range(args.steps):
+        trainer.train_step(model, batch, optimizer, criterion)
+
+    stats = {
+        'rank': rank,
+        'params_mb': tensor_bytes(p.data for p in model.parameters()) / 2**20,
+        'grads_mb': tensor_bytes(p.grad for p in model.parameters()) / 2**20,
+        'optimizer_mb': optimizer_state_bytes(optimizer) / 2**20,
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    gathered = [None] * world_size
+    dist.all_gather_object(gathered, stats)
+    if rank == 0:
+        for row in gathered:
+            print(f"{args.mode:<5} rank {row['rank']}: "
+                  f"params {row['params_mb']:8.1f} MB  "
+                  f"grads {row['grads_mb']:8.1f} MB  "
+                  f"optimizer {row['optimizer_mb']:8.1f} MB  "
+                  f"peak RSS {row['peak_rss_mb']:8.1f} MB")
+    dist.destroy_process_group()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sharding modes on CPU/gloo')
+    parser.add_argument('--world-size', type=int, default=2)
+    parser.add_argument('--model', default='resnet50')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--image-size', type=int, default=224)
+    parser.add_argument('--steps', type=int, default=3)
+    parser.add_argument('--modes', nargs='+', default=list(SHARDING_MODES),
+                        choices=SHARDING_MODES)
+    args = parser.parse_args()
+
+    # Each mode runs in fresh processes so peak RSS is not carried over
+    for mode in args.modes:
+        args.mode = mode
+        mp.spawn(run_rank, args=(args.world_size, free_port(), args),
+                 nprocs=args.world_size, join=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark suite against an in-process S3/CloudWatch stand-in.
+
+Runs offline: S3 and CloudWatch are served by moto (``local_aws``) with
+injected per-request latency and bandwidth, so numbers are reproducible on a
+laptop and comparable between commits.
+
+    python scripts/benchmark_suite.py --save-baseline benchmarks/baseline.json
+    python scripts/benchmark_suite.py --compare benchmarks/baseline.json
+
+In compare mode any metric that is worse than the baseline by more than
+--tolerance is reported and the exit status is 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import boto3
+import torch
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.models.resnet import MODEL_REGISTRY, create_model
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.local_aws import NetworkModel, local_aws
+from src.utils.monitoring import CloudWatchMonitor
+from src.utils.sample_cache import NodeCacheStorage, SampleCache, SampleCacheServer
+from src.utils.storage import open_storage
+from scripts.startup_report import startup_metrics
+
+BUCKET = 'benchmark-data'
+
+
+def metric(value: float, unit: str, higher_is_better: bool) -> Dict[str, Any]:
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def populate(network: NetworkModel, samples: int, image_size: int, classes: int = 10) -> None:
+    """Fill the benchmark bucket inside a ``local_aws`` block."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (image_size, image_size), color=(128, 64, 32)).save(buffer, format='JPEG')
+    latency, bandwidth = network.latency, network.bandwidth_mbps
+    # Set-up is not part of any measurement
+    network.latency, network.bandwidth_mbps = 0.0, None
+    s3 = boto3.client('s3')
+    s3.create_bucket(Bucket=BUCKET)
+    for split, count in (('train', samples), ('val', max(samples // 4, 1))):
+        for i in range(count):
+            s3.put_object(Bucket=BUCKET, Key=f'{split}/class_{i % classes}/{i}.jpg',
+                          Body=buffer.getvalue())
+    network.latency, network.bandwidth_mbps = latency, bandwidth
+
+
+def bench_dataset(network: NetworkModel, args) -> Dict[str, Any]:
+    # Listing happens on first use
+    listing = timed(lambda: len(S3Dataset(BUCKET, prefix='train/')))
+    dataset = S3Dataset(BUCKET, prefix='train/')
+    count = min(args.getitem_samples, len(dataset))
+    elapsed = timed(lambda: [dataset[i] for i in range(count)])
+    # Batched path used by the DataLoader: one concurrent get_many per batch
+    batched = timed(lambda: [dataset.__getitems__(list(range(i, min(i + args.batch_size, count))))
+                             for i in range(0, count, args.batch_size)])
+    return {
+        'dataset_listing_s': metric(listing, 's', False),
+        'dataset_getitem_samples_per_s': metric(count / elapsed, 'samples/s', True),
+        'dataset_getitems_samples_per_s': metric(count / batched, 'samples/s', True),
+    }
+
+
+def bench_dataloader(network: NetworkModel, args) -> Dict[str, Any]:
+    dataset = S3Dataset(BUCKET, prefix='train/')
+    results = {}
+    for workers in args.num_workers:
+        loader = torch.utils.data.DataLoader(dataset, batch_size=args.batch_size,
+                                             shuffle=True, num_workers=workers)
+        start = time.perf_counter()
+        samples = 0
+        for batch_index, (data, _) in enumerate(loader):
+            samples += len(data)
+            if batch_index + 1 >= args.loader_batches:
+                break
+        results[f'dataloader_workers_{workers}_samples_per_s'] = metric(
+            samples / (time.perf_counter() - start), 'samples/s', True)
+    return results
+
+
+def _trainer() -> DistributedTrainer:
+    return DistributedTrainer({'checkpoint_bucket': BUCKET, 'optimizer': 'sgd',
+                               'learning_rate': 0.01}, distributed=False)
+
+
+def _median(fn: Callable[[], Any], repeats: int) -> float:
+    times = sorted(timed(fn) for _ in range(repeats))
+    return times[len(times) // 2]
+
+
+def bench_training(network: NetworkModel, args) -> Dict[str, Any]:
+    trainer = _trainer()
+    model = trainer.load_model(create_model(args.model, num_classes=10))
+    optimizer = trainer.create_optimizer(model)
+    criterion = torch.nn.CrossEntropyLoss()
+    batch = (torch.randn(args.batch_size, 3, args.image_size, args.image_size),
+             torch.randint(0, 10, (args.batch_size,)))
+
+    trainer.train_step(model, batch, optimizer, criterion)  # warm-up
+    trainer.validate(model, [batch])
+    return {
+        'train_step_ms': metric(1000 * _median(
+            lambda: trainer.train_step(model, batch, optimizer, criterion), args.steps),
+            'ms', False),
+        'validate_batch_ms': metric(1000 * _median(
+            lambda: trainer.validate(model, [batch]), args.steps), 'ms', False),
+    }
+
+
+def bench_checkpoint(network: NetworkModel, args) -> Dict[str, Any]:
+    trainer = _trainer()
+    model = create_model(args.model, num_classes=10)
+    optimizer = trainer.create_optimizer(model)
+    save = _median(lambda: trainer.save_checkpoint(model, 0, optimizer), args.checkpoint_repeats)
+    load = _median(lambda: trainer.load_checkpoint(model, 0, optimizer), args.checkpoint_repeats)
+    return {
+        'checkpoint_save_s': metric(save, 's', False),
+        'checkpoint_load_s': metric(load, 's', False),
+    }
+
+
+def bench_monitoring(network: NetworkModel, args) -> Dict[str, Any]:
+    monitor = CloudWatchMonitor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed = timed(lambda: [monitor.log_metric('training_loss', 1.0, {'job': 'bench'})
+                                 for _ in range(args.metric_calls)])
+    return {'cloudwatch_log_metric_ms': metric(1000 * elapsed / args.metric_calls, 'ms', False)}
+
+
+def bench_cache(network: NetworkModel, args) -> Dict[str, Any]:
+    # Ranks on one node, as threads, each reading the same samples in batches
+    keys = [f'train/class_{i % 10}/{i}.jpg' for i in range(args.getitem_samples)]
+    batches = [keys[i:i + args.batch_size] for i in range(0, len(keys), args.batch_size)]
+
+    def run(storage_for_rank: Callable[[], Any]) -> Dict[str, float]:
+        requests = network.requests
+
+        def rank():
+            storage = storage_for_rank()
+            for batch in batches:
+                storage.get_many(batch)
+        threads = [threading.Thread(target=rank) for _ in range(args.cache_ranks)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        samples = len(keys) * args.cache_ranks
+        return {'requests': (network.requests - requests) / samples,
+                'throughput': samples / elapsed}
+
+    direct = run(lambda: open_storage(f's3://{BUCKET}'))
+    with tempfile.TemporaryDirectory() as tmp:
+        server = SampleCacheServer(os.path.join(tmp, 'cache.sock'),
+                                   SampleCache(2**30, [f's3://{BUCKET}']))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            cached = run(lambda: NodeCacheStorage(f's3://{BUCKET}', server.server_address))
+        finally:
+            server.shutdown()
+            server.server_close()
+    return {
+        'direct_s3_requests_per_sample': metric(direct['requests'], 'requests', False),
+        'cached_s3_requests_per_sample': metric(cached['requests'], 'requests', False),
+        'direct_read_samples_per_s': metric(direct['throughput'], 'samples/s', True),
+        'cached_read_samples_per_s': metric(cached['throughput'], 'samples/s', True),
+    }
+
+
+def bench_startup(network: NetworkModel, args) -> Dict[str, Any]:
+    # Fresh interpreters, so the local AWS set up here plays no part
+    return startup_metrics(args.num_workers)
+
+
+BENCHMARKS = {
+    'startup': bench_startup,
+    'dataset': bench_dataset,
+    'dataloader': bench_dataloader,
+    'cache': bench_cache,
+    'training': bench_training,
+    'checkpoint': bench_checkpoint,
+    'monitoring': bench_monitoring,
+}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            tolerance: float) -> List[str]:
+    """Describe every metric that is worse than baseline by more than ``tolerance``."""
+    regressions = []
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None or reference['value'] == 0:
+            continue
+        change = (result['value'] - reference['value']) / reference['value']
+        worse = -change if result['higher_is_better'] else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {reference['value']:.4g} -> {result['value']:.4g} "
+                               f"{result['unit']} ({worse:.0%} worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline benchmark suite')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=None)
+    parser.add_argument('--latency-ms', type=float, default=20.0,
+                        help='Injected latency per S3/CloudWatch request')
+    parser.add_argument('--bandwidth-mbps', type=float, default=1000.0,
+                        help='Injected S3 bandwidth (0 for unlimited)')
+    parser.add_argument('--samples', type=int, default=512, help='Training images in the bucket')
+    parser.add_argument('--getitem-samples', type=int, default=64)
+    parser.add_argument('--num-workers', type=int, nargs='+', default=[0, 2, 4, 8])
+    parser.add_argument('--loader-batches', type=int, default=8)
+    parser.add_argument('--cache-ranks', type=int, default=4,
+                        help='Ranks sharing the node-local sample cache')
+    parser.add_argument('--model', default='resnet18', choices=sorted(MODEL_REGISTRY))
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--image-size', type=int, default=224)
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--checkpoint-repeats', type=int, default=3)
+    parser.add_argument('--metric-calls', type=int, default=50)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--save-baseline', default=None, metavar='PATH')
+    parser.add_argument('--compare', default=None, metavar='PATH', help='Baseline to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed relative slowdown before flagging a regression')
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    results: Dict[str, Any] = {}
+    with local_aws(latency=args.latency_ms / 1000,
+                   bandwidth_mbps=args.bandwidth_mbps or None) as network:
+        populate(network, args.samples, args.image_size)
+        for name in args.only or BENCHMARKS:
+            print(f"Running {name} benchmarks...")
+            for metric_name, result in BENCHMARKS[name](network, args).items():
+                results[metric_name] = result
+                print(f"  {metric_name:<42} {result['value']:>10.3f} {result['unit']}")
+
+    report = {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'cpu_count': os.cpu_count(),
+            'cuda': torch.cuda.is_available(),
+            'latency_ms': args.latency_ms,
+            'bandwidth_mbps': args.bandwidth_mbps,
+            'model': args.model,
+            'batch_size': args.batch_size,
+            'image_size': args.image_size,
+        },
+        'results': results,
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
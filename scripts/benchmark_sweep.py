@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Compare sweep wall-clock time: trials one after another vs. the sweep runner.
+
+Writes a synthetic dataset (see benchmark_progressive.py) to local disk,
+then runs the same learning-rate/weight-decay trials twice: as separate
+full-length jobs, one at a time, each listing and decoding the data itself;
+and with run_sweep, concurrently on a shared decoded cache with successive
+halving:
+
+    python scripts/benchmark_sweep.py --trials 9 --max-epochs 9 --parallel 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import torch.multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.models.resnet import MODEL_REGISTRY
+from src.pipeline.sweep import run_sweep, sample_trials
+from src.utils.storage import LocalStorage
+from scripts.benchmark_progressive import run_mode, synthetic_storage
+
+SPACE = {
+    'learning_rate': {'log_uniform': [1e-3, 1e-1]},
+    'weight_decay': [0.0, 1e-4, 5e-4],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the single-node sweep runner')
+    parser.add_argument('--model', default='resnet18', choices=sorted(MODEL_REGISTRY))
+    parser.add_argument('--classes', type=int, default=10)
+    parser.add_argument('--samples', type=int, default=2000, help='Synthetic training samples')
+    parser.add_argument('--trials', type=int, default=9)
+    parser.add_argument('--min-epochs', type=int, default=1)
+    parser.add_argument('--max-epochs', type=int, default=9)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--parallel', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--num-workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    args.epochs, args.lr = args.max_epochs, 0.01  # as expected by run_mode
+
+    trials = sample_trials(SPACE, args.trials, seed=args.seed)
+    with tempfile.TemporaryDirectory() as data_dir:
+        source = synthetic_storage(args.samples, args.classes)
+        local = LocalStorage(data_dir)
+        for obj in source.list():
+            local.put(obj.key, source.get(obj.key))
+        args.data = f'file://{data_dir}'
+
+        ctx = mp.get_context('spawn')
+        results = ctx.Queue()
+        start = time.perf_counter()
+        sequential_best = 0.0
+        for trial in trials:
+            process = ctx.Process(target=run_mode, args=(trial, args, results))
+            process.start()
+            history = results.get()
+            process.join()
+            sequential_best = max(sequential_best, history[-1]['val_accuracy'])
+        sequential = time.perf_counter() - start
+        print(f"Sequential: {len(trials)} trials x {args.max_epochs} epochs in {sequential:.1f}s, "
+              f"best val_acc {sequential_best:.2f}%")
+
+        config = {
+            'model_name': args.model,
+            'num_classes': args.classes,
+            'batch_size': args.batch_size,
+            'optimizer': 'sgd',
+            'num_workers': args.num_workers,
+            'seed': args.seed,
+            'snapshot_every': 10 ** 9,
+            'data_storage': args.data,
+        }
+        start = time.perf_counter()
+        ranked = run_sweep(config, trials, min_epochs=args.min_epochs,
+                           max_epochs=args.max_epochs, eta=args.eta, parallel=args.parallel)
+        swept = time.perf_counter() - start
+        print(f"Sweep: {swept:.1f}s, best val_acc {ranked[0].val_accuracy:.2f}% "
+              f"(trial {ranked[0].trial})")
+
+    print(f"\nSweep runner finished {sequential / swept:.2f}x faster than sequential jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,23 @@
 import boto3
+from botocore.config import Config
 import argparse
 import yaml
 from typing import List
 import sys
+import os
 
-def cleanup_resources(config_path: str, force: bool = False):
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.aws import delete_all_objects
+
+def cleanup_resources(config_path: str, force: bool = False, max_workers: int = 16):
     """Clean up AWS resources created by deployment"""
     try:
         with open(config_path, 'r') as f:
             config = yaml.safe_load(f)
 
         # Initialize AWS clients
-        s3 = boto3.client('s3')
+        # One pooled connection per concurrent delete
+        s3 = boto3.client('s3', config=Config(max_pool_connections=max_workers))
         ecs = boto3.client('ecs')
         cloudwatch = boto3.client('cloudwatch')
         
@@ -31,14 +37,14 @@ def cleanup_resources(config_path: str, force: bool = False):
         
         for bucket in buckets:
             try:
-                # Delete all objects first
-                response = s3.list_objects_v2(Bucket=bucket)
-                if 'Contents' in response:
-                    objects = [{'Key': obj['Key']} for obj in response['Contents']]
-                    s3.delete_objects(
-                        Bucket=bucket,
-                        Delete={'Objects': objects}
-                    )
+                # Delete all objects and versions first
+                stats = delete_all_objects(s3, bucket, max_workers=max_workers)
+                print(f"Deleted {stats.deleted} objects from {bucket} in {stats.elapsed:.1f}s "
+                      f"({stats.rate:.0f} objects/sec)")
+                if stats.failed:
+                    print(f"Failed to delete {stats.failed} objects from {bucket}, "
+                          f"e.g. {stats.errors[0]}")
+                    continue
                 # Delete bucket
                 s3.delete_bucket(Bucket=bucket)
                 print(f"Deleted bucket: {bucket}")
@@ -79,7 +85,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Clean up ML infrastructure resources')
     parser.add_argument('--config', required=True, help='Path to configuration YAML')
     parser.add_argument('--force', action='store_true', help='Skip confirmation prompt')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent DeleteObjects calls')
     args = parser.parse_args()
     
-    success = cleanup_resources(args.config, args.force)
+    success = cleanup_resources(args.config, args.force, args.workers)
     sys.exit(0 if success else 1)
\ No newline at end of file
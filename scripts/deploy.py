@@ -6,25 +6,23 @@ import os
 from pathlib import Path
 import json
 import time
+from typing import Any, Dict, List, Optional
 
-def create_service_linked_role():
-    """Create the ECS service-linked role if it doesn't exist"""
-    try:
-        iam = boto3.client('iam')
-        try:
-            iam.get_role(RoleName='AWSServiceRoleForECS')
-            print("ECS service-linked role already exists")
-            return True
-        except iam.exceptions.NoSuchEntityException:
-            iam.create_service_linked_role(
-                AWSServiceName='ecs.amazonaws.com'
-            )
-            print("Created ECS service-linked role")
-            time.sleep(10)
-            return True
-    except Exception as e:
-        print(f"Error creating service-linked role: {e}")
-        return False
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.aws import (
+    APPLIED,
+    UNCHANGED,
+    Resource,
+    ResourceGraph,
+    error_code,
+    retry_with_backoff,
+)
+
+CLUSTER_NAME = 'ml-training-cluster'
+DASHBOARD_NAME = 'MLTrainingDashboard'
+ECS_ROLE_NAME = 'AWSServiceRoleForECS'
+# Looked up by path: the name's casing is up to IAM (moto says AWSServiceRoleForecs)
+ECS_ROLE_PATH = '/aws-service-role/ecs.amazonaws.com/'
 
 def create_dashboard_body(config, region):
     """Create properly formatted dashboard JSON"""
@@ -73,112 +71,183 @@ def create_dashboard_body(config, region):
     
     return json.dumps(dashboard)
 
-def create_cloudwatch_alarms(cloudwatch_client, config):
-    """Create CloudWatch alarms with proper numeric thresholds"""
-    try:
-        for alert in config['monitoring']['alerts']:
-            # Parse threshold value properly
-            condition_parts = alert['condition'].split()
-            operator = condition_parts[0]
-            # Remove any '%' sign and convert to float
-            threshold = float(condition_parts[1].replace('%', ''))
+def alarm_definition(alert: Dict[str, Any]) -> Dict[str, Any]:
+    """put_metric_alarm arguments for an alert, with a numeric threshold"""
+    # Parse threshold value properly
+    condition_parts = alert['condition'].split()
+    operator = condition_parts[0]
+    # Remove any '%' sign and convert to float
+    threshold = float(condition_parts[1].replace('%', ''))
             
-            cloudwatch_client.put_metric_alarm(
-                AlarmName=f"MLTraining_{alert['metric']}",
-                MetricName=alert['metric'],
-                Namespace='MLTraining',
-                Period=alert.get('window', 300),
-                EvaluationPeriods=2,
-                Threshold=threshold,
-                ComparisonOperator='GreaterThanThreshold' if operator == '>' else 'LessThanThreshold',
-                Statistic='Average',
-                ActionsEnabled=True,
-                Dimensions=[{"Name": "Environment", "Value": "Production"}]
-            )
-            print(f"Created alarm for {alert['metric']}")
-        return True
-    except Exception as e:
-        print(f"Error creating alarms: {e}")
-        print(f"Alert details: {alert}")  # Print the problematic alert
-        return False
+    return {
+        'AlarmName': f"MLTraining_{alert['metric']}",
+        'MetricName': alert['metric'],
+        'Namespace': 'MLTraining',
+        'Period': alert.get('window', 300),
+        'EvaluationPeriods': 2,
+        'Threshold': threshold,
+        'ComparisonOperator': 'GreaterThanThreshold' if operator == '>' else 'LessThanThreshold',
+        'Statistic': 'Average',
+        'ActionsEnabled': True,
+        'Dimensions': [{"Name": "Environment", "Value": "Production"}]
+    }
+
+def bucket_names(config) -> List[str]:
+    bucket_prefix = config['infrastructure']['storage']['s3_bucket_prefix']
+    return [
+        f"{bucket_prefix}-data",
+        f"{bucket_prefix}-checkpoints",
+        f"{bucket_prefix}-logs"
+    ]
+
+def create_clients(region: str) -> Dict[str, Any]:
+    return {
+        name: boto3.client(name, region_name=region)
+        for name in ('s3', 'iam', 'ecs', 'cloudwatch')
+    }
+
+def build_resources(config, clients) -> List[Resource]:
+    """Describe the desired infrastructure as a dependency graph"""
+    s3, iam, ecs, cloudwatch = (clients[n] for n in ('s3', 'iam', 'ecs', 'cloudwatch'))
+    region = config['infrastructure']['region']
+    resources = []
+
+    def read_role():
+        pages = iam.get_paginator('list_roles').paginate(PathPrefix=ECS_ROLE_PATH)
+        for page in pages:
+            for role in page['Roles']:
+                return role
+        return None
+
+    resources.append(Resource(
+        name=f"iam:{ECS_ROLE_NAME}",
+        read=read_role,
+        apply=lambda: iam.create_service_linked_role(AWSServiceName='ecs.amazonaws.com'),
+        ready=lambda: read_role() is not None
+    ))
+
+    for bucket in bucket_names(config):
+        def read_bucket(bucket=bucket):
+            try:
+                s3.head_bucket(Bucket=bucket)
+                return {}
+            except Exception as e:
+                if error_code(e) in ('404', 'NoSuchBucket', 'NotFound'):
+                    return None
+                raise
+
+        def create_bucket(bucket=bucket):
+            kwargs = {'Bucket': bucket}
+            if region != 'us-east-1':
+                kwargs['CreateBucketConfiguration'] = {'LocationConstraint': region}
+            s3.create_bucket(**kwargs)
+
+        resources.append(Resource(
+            name=f"s3:{bucket}",
+            read=read_bucket,
+            apply=create_bucket,
+            ready=lambda read_bucket=read_bucket: read_bucket() is not None
+        ))
+
+    def read_cluster() -> Optional[Dict[str, Any]]:
+        clusters = ecs.describe_clusters(clusters=[CLUSTER_NAME])['clusters']
+        active = [c for c in clusters if c['status'] == 'ACTIVE']
+        return active[0] if active else None
+
+    capacity = {
+        'capacityProviders': ['FARGATE_SPOT'],
+        'defaultCapacityProviderStrategy': [{
+            'capacityProvider': 'FARGATE_SPOT',
+            'weight': 1
+        }]
+    }
+
+    def apply_cluster():
+        # The service-linked role can take a while to propagate, which ECS
+        # reports as InvalidParameterException
+        if read_cluster() is None:
+            call = lambda: ecs.create_cluster(clusterName=CLUSTER_NAME, **capacity)
+        else:
+            call = lambda: ecs.put_cluster_capacity_providers(cluster=CLUSTER_NAME, **capacity)
+        retry_with_backoff(
+            call,
+            should_retry=lambda e: error_code(e) == 'InvalidParameterException'
+        )
+
+    resources.append(Resource(
+        name=f"ecs:{CLUSTER_NAME}",
+        read=read_cluster,
+        apply=apply_cluster,
+        desired={'capacityProviders': capacity['capacityProviders']},
+        depends_on=[f"iam:{ECS_ROLE_NAME}"],
+        ready=lambda: read_cluster() is not None
+    ))
+
+    dashboard_body = create_dashboard_body(config, region)
+
+    def read_dashboard():
+        try:
+            response = cloudwatch.get_dashboard(DashboardName=DASHBOARD_NAME)
+            return json.loads(response['DashboardBody'])
+        except Exception as e:
+            if error_code(e) in ('ResourceNotFound', 'DashboardNotFoundError'):
+                return None
+            raise
+
+    resources.append(Resource(
+        name=f"dashboard:{DASHBOARD_NAME}",
+        read=read_dashboard,
+        apply=lambda: cloudwatch.put_dashboard(
+            DashboardName=DASHBOARD_NAME,
+            DashboardBody=dashboard_body
+        ),
+        desired=json.loads(dashboard_body)
+    ))
+
+    for alert in config['monitoring']['alerts']:
+        definition = alarm_definition(alert)
+
+        def read_alarm(name=definition['AlarmName']):
+            alarms = cloudwatch.describe_alarms(AlarmNames=[name])['MetricAlarms']
+            return alarms[0] if alarms else None
+
+        resources.append(Resource(
+            name=f"alarm:{definition['AlarmName']}",
+            read=read_alarm,
+            apply=lambda definition=definition: cloudwatch.put_metric_alarm(**definition),
+            desired=definition
+        ))
+
+    return resources
+
+def reconcile(config, clients, max_workers: int = 8) -> Dict[str, str]:
+    """Bring the deployment in line with ``config``; return status per resource"""
+    return ResourceGraph(build_resources(config, clients), max_workers=max_workers).apply()
 
 def deploy_training_infrastructure(config_path: str):
     """Deploy the ML training infrastructure"""
     try:
+        start = time.perf_counter()
         # Load and validate configuration
         with open(config_path, 'r') as f:
             config = yaml.safe_load(f)
 
         # Initialize AWS clients
-        s3 = boto3.client('s3')
-        cloudwatch = boto3.client('cloudwatch')
-        ecs = boto3.client('ecs')
-        
-        # Create service-linked role first
-        if not create_service_linked_role():
-            raise Exception("Failed to create service-linked role")
-
-        # Create S3 buckets
-        bucket_prefix = config['infrastructure']['storage']['s3_bucket_prefix']
-        buckets = [
-            f"{bucket_prefix}-data",
-            f"{bucket_prefix}-checkpoints",
-            f"{bucket_prefix}-logs"
-        ]
+        clients = create_clients(config['infrastructure']['region'])
+        status = reconcile(config, clients)
         
-        for bucket in buckets:
-            try:
-                s3.create_bucket(Bucket=bucket)
-                print(f"Created bucket: {bucket}")
-            except s3.exceptions.BucketAlreadyExists:
-                print(f"Bucket already exists: {bucket}")
-            except Exception as e:
-                print(f"Error creating bucket {bucket}: {e}")
-                raise e
+        applied = [name for name, s in status.items() if s == APPLIED]
+        unchanged = [name for name, s in status.items() if s == UNCHANGED]
+        failed = [name for name, s in status.items() if s not in (APPLIED, UNCHANGED)]
+        elapsed = time.perf_counter() - start
 
-        # Create ECS cluster with retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                cluster_response = ecs.create_cluster(
-                    clusterName='ml-training-cluster',
-                    capacityProviders=['FARGATE_SPOT'],
-                    defaultCapacityProviderStrategy=[{
-                        'capacityProvider': 'FARGATE_SPOT',
-                        'weight': 1
-                    }]
-                )
-                print("Created ECS cluster")
-                break
-            except ecs.exceptions.InvalidParameterException as e:
-                if attempt == max_retries - 1:
-                    raise e
-                print(f"Retrying ECS cluster creation... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(10)
-        
-        # Create CloudWatch dashboard
-        dashboard_body = create_dashboard_body(config, config['infrastructure']['region'])
-        try:
-            cloudwatch.put_dashboard(
-                DashboardName='MLTrainingDashboard',
-                DashboardBody=dashboard_body
-            )
-            print("Created CloudWatch dashboard")
-        except Exception as e:
-            print(f"Error creating dashboard: {e}")
-            print(f"Dashboard body: {dashboard_body}")
-            raise e
-
-        # Create CloudWatch alarms
-        if not create_cloudwatch_alarms(cloudwatch, config):
-            raise Exception("Failed to create CloudWatch alarms")
-        
+        print(f"\nDeployment finished in {elapsed:.1f}s")
+        print(f"- Created/updated: {len(applied)}")
+        print(f"- Unchanged: {len(unchanged)}")
+        if failed:
+            print(f"- Failed or skipped: {', '.join(failed)}")
+            return False
         print("\nDeployment completed successfully!")
-        print("\nResources created:")
-        print("- ECS Cluster: ml-training-cluster")
-        print("- CloudWatch Dashboard: MLTrainingDashboard")
-        print(f"- S3 Buckets: {', '.join(buckets)}")
-        print("- CloudWatch Alarms for metrics")
         return True
         
     except Exception as e:
@@ -199,4 +268,4 @@ def main():
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
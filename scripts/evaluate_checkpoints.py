@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Rank every epoch checkpoint on the validation set and optionally prune.
+
+    python scripts/evaluate_checkpoints.py --config config/training.yml \\
+        --production-config config/production.yml --output results.csv --prune
+
+--prune deletes all but the best keep_top_k checkpoints, with keep_top_k
+taken from --keep-top-k or model.checkpointing.keep_top_k in production.yml.
+"""
+
+import argparse
+import os
+import sys
+
+import boto3
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.pipeline.config import TrainingConfig
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.evaluation import (
+    evaluate_checkpoints,
+    list_checkpoints,
+    load_val_set,
+    prune_checkpoints,
+    write_results,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate checkpoints in parallel')
+    parser.add_argument('--config', required=True, help='Path to TrainingConfig YAML')
+    parser.add_argument('--production-config', default=None,
+                        help='production.yml providing model.checkpointing.keep_top_k')
+    parser.add_argument('--workers', type=int, default=None, help='Evaluation processes')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--output', default='checkpoint_results.csv')
+    parser.add_argument('--keep-top-k', type=int, default=None)
+    parser.add_argument('--prune', action='store_true',
+                        help='Delete checkpoints outside the top keep_top_k')
+    args = parser.parse_args()
+
+    config = TrainingConfig.from_yaml(args.config)
+    keep_top_k = args.keep_top_k
+    if keep_top_k is None and args.production_config:
+        with open(args.production_config, 'r') as f:
+            production = yaml.safe_load(f)
+        keep_top_k = production['model']['checkpointing']['keep_top_k']
+
+    s3 = boto3.client('s3')
+    checkpoints = list_checkpoints(s3, config.checkpoint_bucket)
+    print(f"Found {len(checkpoints)} checkpoints")
+
+    images, labels = load_val_set(S3Dataset(config.data_bucket, prefix='val/', normalize=False),
+                                  batch_size=args.batch_size,
+                                  num_workers=config.num_workers)
+    print(f"Decoded {len(labels)} validation samples")
+
+    results = evaluate_checkpoints(
+        s3, config.checkpoint_bucket, checkpoints, images, labels,
+        config.model_name, config.num_classes,
+        workers=args.workers, batch_size=args.batch_size
+    )
+    write_results(results, args.output)
+
+    print(f"\n{'rank':>4}  {'epoch':>5}  {'accuracy':>8}  {'loss':>8}")
+    for rank, result in enumerate(results, 1):
+        print(f"{rank:>4}  {result.epoch:>5}  {result.accuracy:>7.2f}%  {result.loss:>8.4f}")
+    print(f"Wrote {args.output}")
+
+    if args.prune:
+        if keep_top_k is None:
+            parser.error('--prune needs --keep-top-k or --production-config')
+        deleted = prune_checkpoints(s3, config.checkpoint_bucket, results, keep_top_k)
+        print(f"Kept the best {keep_top_k}, deleted {len(deleted)} checkpoints")
+
+
+if __name__ == "__main__":
+    main()
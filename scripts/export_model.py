@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Export a checkpoint to TorchScript or ONNX, optionally int8-quantized.
+
+    python scripts/export_model.py --config config/training.yml --epoch 12 \\
+        --format torchscript --quantization static --output model_int8.pt
+
+Reports the accuracy delta and speedup against the eager fp32 model.
+"""
+
+import argparse
+import os
+import sys
+
+import boto3
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.pipeline.config import TrainingConfig
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.export import (
+    EXPORT_FORMATS,
+    QUANTIZATION_MODES,
+    export_model,
+    load_model_from_checkpoint,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a checkpoint for CPU inference')
+    parser.add_argument('--config', required=True, help='Path to TrainingConfig YAML')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--epoch', type=int, help='Download checkpoints/epoch_N.pt')
+    source.add_argument('--checkpoint', help='Local checkpoint file')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='torchscript')
+    parser.add_argument('--quantization', choices=QUANTIZATION_MODES, default=None)
+    parser.add_argument('--calibration-batches', type=int, default=10)
+    parser.add_argument('--eval-batches', type=int, default=None,
+                        help='Limit the comparison to this many val batches')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    config = TrainingConfig.from_yaml(args.config)
+    path = args.checkpoint
+    if path is None:
+        path = f'/tmp/checkpoint_{args.epoch}_export.pt'
+        boto3.client('s3').download_file(config.checkpoint_bucket,
+                                         f'checkpoints/epoch_{args.epoch}.pt', path)
+    model = load_model_from_checkpoint(path, config.model_name, config.num_classes)
+
+    val_loader = torch.utils.data.DataLoader(
+        S3Dataset(config.data_bucket, prefix='val/'),
+        batch_size=config.batch_size,
+        num_workers=config.num_workers
+    )
+    calibration_loader = None
+    if args.quantization == 'static':
+        # Calibrate on training images so the validation set stays unseen
+        calibration_loader = torch.utils.data.DataLoader(
+            S3Dataset(config.data_bucket, prefix='train/'),
+            batch_size=config.batch_size,
+            shuffle=True,
+            num_workers=config.num_workers
+        )
+    report = export_model(model, args.output, val_loader,
+                          format=args.format,
+                          quantization=args.quantization,
+                          calibration_batches=args.calibration_batches,
+                          eval_batches=args.eval_batches,
+                          calibration_loader=calibration_loader)
+
+    print(f"\nWrote {report.path} ({report.size_mb:.1f} MB)")
+    print(f"Accuracy: {report.fp32_accuracy:.2f}% eager fp32 -> {report.accuracy:.2f}% "
+          f"({report.accuracy_delta:+.2f})")
+    print(f"Time: {report.fp32_seconds:.2f}s -> {report.seconds:.2f}s "
+          f"({report.speedup:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Find the throughput-optimal batch size and optionally write it back."""
+
+import argparse
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.pipeline.batch_finder import find_batch_size, write_batch_size
+from src.pipeline.config import TrainingConfig
+from src.pipeline.trainer import DistributedTrainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search for the best batch size')
+    parser.add_argument('--config', required=True, help='Path to TrainingConfig YAML')
+    parser.add_argument('--image-size', type=int, default=224)
+    parser.add_argument('--max-batch-size', type=int, default=4096)
+    parser.add_argument('--memory-budget-mb', type=float, default=None,
+                        help='Treat batches whose peak memory exceeds this as not fitting')
+    parser.add_argument('--write', nargs='?', const='', default=None, metavar='PATH',
+                        help='Write the result to PATH (default: --config)')
+    args = parser.parse_args()
+
+    config = TrainingConfig.from_yaml(args.config).__dict__
+    trainer = DistributedTrainer(config, distributed=False)
+    model = trainer.build_model()
+    optimizer = trainer.create_optimizer(model)
+
+    result = find_batch_size(
+        trainer, model, optimizer, torch.nn.CrossEntropyLoss(),
+        input_shape=(3, args.image_size, args.image_size),
+        num_classes=config['num_classes'],
+        max_batch_size=args.max_batch_size,
+        memory_budget_mb=args.memory_budget_mb
+    )
+    print(f"\nLargest batch size: {result.max_batch_size}")
+    print(f"Throughput-optimal batch size: {result.batch_size}")
+
+    if args.write is not None:
+        path = args.write or args.config
+        write_batch_size(path, result.batch_size)
+        print(f"Wrote batch_size={result.batch_size} to {path}")
+
+
+if __name__ == "__main__":
+    main()
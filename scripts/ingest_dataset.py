@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Upload a local image directory into the train/ and val/ layout of the data bucket.
+
+Accepts either an ImageNet-style directory of ``class_N/`` folders (split into
+train/val by a stable hash) or one that already has ``train/`` and ``val/``.
+Re-running after an interruption skips everything already uploaded:
+
+    python scripts/ingest_dataset.py --source /data/imagenet --bucket ml-training-data
+"""
+
+import argparse
+import os
+import sys
+
+import boto3
+from botocore.config import Config
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.ingest import ingest_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest an image dataset into S3')
+    parser.add_argument('--source', required=True, help='Local dataset directory')
+    parser.add_argument('--bucket', required=True, help='Destination data bucket')
+    parser.add_argument('--workers', type=int, default=32, help='Concurrent transfers')
+    parser.add_argument('--val-fraction', type=float, default=0.1,
+                        help='Fraction of files sent to val/ when --source is not pre-split')
+    parser.add_argument('--multipart-threshold-mb', type=int, default=8)
+    parser.add_argument('--chunk-mb', type=int, default=8, help='Multipart part size')
+    parser.add_argument('--state-file', default=None,
+                        help='Resume journal (default: <source>/.ingest_state.jsonl)')
+    parser.add_argument('--manifest', action='store_true',
+                        help='Also write manifests/train.jsonl and manifests/val.jsonl')
+    args = parser.parse_args()
+
+    # One pooled connection per concurrent transfer
+    s3 = boto3.client('s3', config=Config(max_pool_connections=args.workers))
+    stats = ingest_directory(
+        s3, args.source, args.bucket,
+        workers=args.workers,
+        multipart_threshold=args.multipart_threshold_mb * 2**20,
+        multipart_chunksize=args.chunk_mb * 2**20,
+        val_fraction=args.val_fraction,
+        state_path=args.state_file or os.path.join(args.source, '.ingest_state.jsonl'),
+        write_manifest=args.manifest
+    )
+
+    print(f"\nUploaded {stats.uploaded}, copied {stats.copied}, skipped {stats.skipped}, "
+          f"failed {stats.failed} in {stats.elapsed:.1f}s")
+    print(f"{stats.files_per_sec:.1f} files/sec, {stats.mb_per_sec:.1f} MB/s")
+    sys.exit(1 if stats.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Queue-driven preprocessing: enqueue shard work items, then run workers.
+
+    python scripts/preprocess.py enqueue --bucket ml-training-data --prefix train/
+    python scripts/preprocess.py work --bucket ml-training-data --processes 8
+
+Workers can be started on any number of nodes against the same queue. Pass
+--queue-dir to use a local directory instead of the SQS training-jobs-queue.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+import boto3
+from botocore.config import Config
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.pipeline.preprocess import FileQueue, PreprocessWorker, SQSQueue, enqueue_shards
+
+
+def make_queue(args):
+    if args.queue_dir:
+        return FileQueue(args.queue_dir)
+    return SQSQueue(args.queue_url)
+
+
+def work(args) -> None:
+    # Clients are created per process; boto3 clients must not cross a fork
+    s3 = boto3.client('s3', config=Config(max_pool_connections=args.download_workers))
+    worker = PreprocessWorker(
+        make_queue(args), s3, args.bucket, args.output_bucket or args.bucket,
+        output_prefix=args.output_prefix,
+        image_size=args.image_size,
+        visibility_timeout=args.visibility_timeout,
+        download_workers=args.download_workers
+    )
+    processed = worker.run(idle_timeout=args.idle_timeout)
+    print(f"Worker {os.getpid()} processed {processed} shards")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distributed dataset preprocessing')
+    parser.add_argument('command', choices=['enqueue', 'work'])
+    parser.add_argument('--bucket', required=True, help='Bucket holding the raw images')
+    parser.add_argument('--queue-url', default=None,
+                        help='SQS queue URL (default: the training-jobs-queue)')
+    parser.add_argument('--queue-dir', default=None, help='Use a local directory queue')
+    parser.add_argument('--prefix', default='train/', help='Raw prefix to enqueue')
+    parser.add_argument('--shard-size', type=int, default=1000, help='Samples per shard')
+    parser.add_argument('--output-bucket', default=None, help='Default: --bucket')
+    parser.add_argument('--output-prefix', default='shards/')
+    parser.add_argument('--image-size', type=int, default=256, help='Shorter side after resize')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes on this node')
+    parser.add_argument('--download-workers', type=int, default=16,
+                        help='Concurrent downloads per worker')
+    parser.add_argument('--visibility-timeout', type=int, default=300)
+    parser.add_argument('--idle-timeout', type=float, default=60.0,
+                        help='Exit after the queue has been empty this long')
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        enqueue_shards(make_queue(args), boto3.client('s3'), args.bucket, args.prefix,
+                       shard_size=args.shard_size)
+        return
+
+    if args.processes == 1:
+        work(args)
+        return
+    ctx = mp.get_context('spawn')
+    processes = [ctx.Process(target=work, args=(args,)) for _ in range(args.processes)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    sys.exit(max(p.exitcode for p in processes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Run the node-local sample cache daemon.
+
+Start one per host before training; every rank and job that sets
+``data_cache_socket`` in its TrainingConfig then shares one copy of each
+sample and one GET per key:
+
+    python scripts/sample_cache.py --memory-gb 64 --allow-url s3://training-data &
+    # TrainingConfig: data_cache_socket: /tmp/sample_cache.sock
+
+The daemon only reads the storage URLs given with ``--allow-url`` (the
+``data_storage`` or ``s3://<data_bucket>`` of the jobs it serves), and its
+socket is only accessible to its owner unless ``--socket-mode`` says otherwise.
+
+With ``data_cache_decoded`` clients ask for decoded pixels, which costs more
+memory per sample (about 10x a JPEG) but saves every rank the JPEG decode.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.sample_cache import DEFAULT_SOCKET, SampleCache, SampleCacheServer
+
+
+def report(cache: SampleCache, interval: float, stopped: threading.Event) -> None:
+    while not stopped.wait(interval):
+        stats = cache.stats
+        requests = stats.hits + stats.misses + stats.deduplicated
+        hit_rate = (stats.hits + stats.deduplicated) / requests if requests else 0.0
+        print(f"{stats.entries} samples, {stats.bytes / 2**30:.2f} GiB cached; "
+              f"{requests} requests, {stats.misses} GETs ({hit_rate:.0%} served from cache), "
+              f"{stats.evictions} evictions", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the node-local sample cache')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--allow-url', action='append', required=True, dest='allowed_urls',
+                        help='Storage URL clients may read through the cache (repeatable)')
+    parser.add_argument('--socket-mode', type=lambda mode: int(mode, 8), default=0o600,
+                        help='Octal permissions of the socket, e.g. 660 to share with a group')
+    parser.add_argument('--memory-gb', type=float, default=16.0, help='Cache memory budget')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='Concurrent backend GETs for cache misses')
+    parser.add_argument('--stats-interval', type=float, default=60.0)
+    args = parser.parse_args()
+
+    cache = SampleCache(int(args.memory_gb * 2**30), args.allowed_urls,
+                        max_concurrency=args.concurrency)
+    server = SampleCacheServer(args.socket, cache, mode=args.socket_mode)
+    stopped = threading.Event()
+    threading.Thread(target=report, args=(cache, args.stats_interval, stopped),
+                     daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"Sample cache serving {', '.join(args.allowed_urls)} on {args.socket} "
+          f"with {args.memory_gb:g} GiB", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -24,7 +24,6 @@ def main():
         ("python scripts/create_iam_policy.py", "Setting up IAM policy"),
         ("sleep 10", "Waiting for policy to propagate"),
         ("python scripts/deploy.py --config config/production.yml", "Deploying infrastructure"),
-        ("sleep 5", "Waiting for resources to propagate"),
         ("python scripts/validate_deployment.py --config config/production.yml", "Validating deployment")
     ]
     
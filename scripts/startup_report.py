@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Report process startup cost: module import time and time to first batch.
+
+Import times come from ``python -X importtime`` in a fresh interpreter, so
+nothing is cached by this process. Time to first batch launches a fresh
+interpreter that builds an S3Dataset and DataLoader against the in-process
+S3 stand-in and is timed from launch until the first batch arrives.
+
+    python scripts/startup_report.py --num-workers 0 4
+
+The same measurements run as the ``startup`` group of benchmark_suite.py,
+which tracks them against a baseline.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+STARTUP_MODULES = ['src.pipeline.trainer', 'src.pipeline.data_loader']
+
+
+def import_times(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """Cumulative import seconds of ``module`` and per-package self times."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    total = 0.0
+    packages = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        packages.append((int(self_us) / 1e6, name.strip()))
+        if name.strip() == module:
+            total = int(cumulative_us) / 1e6
+    return total, sorted(packages, reverse=True)
+
+
+def _first_batch_child(num_workers: int, batch_size: int, samples: int) -> None:
+    start = time.perf_counter()
+    import torch
+    from src.pipeline.data_loader import S3Dataset
+    imported = time.perf_counter()
+
+    # Local AWS set-up is excluded from the reported time
+    from scripts.benchmark_suite import BUCKET, populate
+    from src.utils.local_aws import local_aws
+    with local_aws() as network:
+        populate(network, samples, image_size=64)
+        setup = time.perf_counter() - imported
+
+        loader = torch.utils.data.DataLoader(S3Dataset(BUCKET, prefix='train/'),
+                                             batch_size=batch_size, num_workers=num_workers)
+        next(iter(loader))
+        print(json.dumps({'import_s': imported - start, 'setup_s': setup}), flush=True)
+
+
+def time_to_first_batch(num_workers: int, batch_size: int = 16,
+                        samples: int = 256) -> Dict[str, float]:
+    """Wall time from launching a fresh process to its first DataLoader batch."""
+    start = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--first-batch-child',
+         '--num-workers', str(num_workers), '--batch-size', str(batch_size),
+         '--samples', str(samples)],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True
+    )
+    line = child.stdout.readline()
+    elapsed = time.perf_counter() - start
+    child.wait()
+    if child.returncode != 0 or not line:
+        raise RuntimeError(f"First-batch probe failed with exit code {child.returncode}")
+    phases = json.loads(line)
+    return {'first_batch_s': elapsed - phases['setup_s'], 'import_s': phases['import_s']}
+
+
+def startup_metrics(num_workers: List[int]) -> Dict[str, Dict[str, Any]]:
+    """Startup results in the benchmark suite's format."""
+    results = {}
+    for module in STARTUP_MODULES:
+        total, _ = import_times(module)
+        results[f'import_{module.split(".")[-1]}_s'] = {
+            'value': total, 'unit': 's', 'higher_is_better': False}
+    for workers in num_workers:
+        results[f'time_to_first_batch_workers_{workers}_s'] = {
+            'value': time_to_first_batch(workers)['first_batch_s'],
+            'unit': 's', 'higher_is_better': False}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report startup time')
+    parser.add_argument('--num-workers', type=int, nargs='+', default=[0, 4])
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--samples', type=int, default=256)
+    parser.add_argument('--top', type=int, default=15, help='Slowest packages to list')
+    parser.add_argument('--first-batch-child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.first_batch_child:
+        sys.path.insert(0, ROOT)
+        _first_batch_child(args.num_workers[0], args.batch_size, args.samples)
+        return
+
+    for module in STARTUP_MODULES:
+        total, packages = import_times(module)
+        print(f"import {module}: {total * 1000:.0f} ms")
+        for seconds, name in packages[:args.top]:
+            print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    print()
+    for workers in args.num_workers:
+        phases = time_to_first_batch(workers, args.batch_size, args.samples)
+        print(f"time to first batch (num_workers={workers}): "
+              f"{phases['first_batch_s'] * 1000:.0f} ms "
+              f"(imports {phases['import_s'] * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
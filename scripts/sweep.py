@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Run a hyperparameter sweep as concurrent trials on one node.
+
+The search space is a YAML mapping of TrainingConfig fields to choices
+(lists), distributions or fixed values:
+
+    learning_rate: {log_uniform: [1.0e-4, 1.0e-1]}
+    weight_decay: [0.0, 1.0e-4, 5.0e-4]
+
+    python scripts/sweep.py --config config/training.yml --space config/sweep.yml \\
+        --trials 27 --min-epochs 1 --max-epochs 9 --parallel 8
+
+Trials share one listing, one decoded sample cache and one decoded
+validation set; successive halving stops the worst trials at each rung.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.pipeline.config import TrainingConfig
+from src.pipeline.sweep import run_sweep, sample_trials, write_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a single-node hyperparameter sweep')
+    parser.add_argument('--config', required=True, help='Path to the base TrainingConfig YAML')
+    parser.add_argument('--space', required=True, help='Path to the search space YAML')
+    parser.add_argument('--trials', type=int, default=None,
+                        help='Random trials to draw (default: the full grid of choices)')
+    parser.add_argument('--min-epochs', type=int, default=1, help='Budget of the first rung')
+    parser.add_argument('--max-epochs', type=int, default=None,
+                        help='Budget of the last rung (default: epochs from --config)')
+    parser.add_argument('--eta', type=int, default=3, help='Keep the best 1/eta at each rung')
+    parser.add_argument('--parallel', type=int, default=None, help='Concurrent trials')
+    parser.add_argument('--cache-memory-gb', type=float, default=8.0,
+                        help='Decoded sample cache, unless data_cache_socket is configured')
+    parser.add_argument('--work-dir', default=None, help='Trial snapshots (default: a temp dir)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='sweep_results.json')
+    args = parser.parse_args()
+
+    config = TrainingConfig.from_yaml(args.config).__dict__
+    with open(args.space, 'r') as f:
+        space = yaml.safe_load(f)
+    trials = sample_trials(space, args.trials, seed=args.seed)
+    print(f"Sweeping {len(trials)} trials over {', '.join(space)}")
+
+    start = time.perf_counter()
+    results = run_sweep(config, trials, min_epochs=args.min_epochs, max_epochs=args.max_epochs,
+                        eta=args.eta, parallel=args.parallel,
+                        cache_memory=int(args.cache_memory_gb * 2**30), work_dir=args.work_dir)
+    wall_seconds = time.perf_counter() - start
+    write_results(results, args.output, wall_seconds)
+
+    print(f"\n{'trial':>5}  {'status':<9}  {'epochs':>6}  {'val acc':>8}  {'samples/s':>9}  params")
+    for result in results:
+        accuracy = f"{result.val_accuracy:.2f}%" if result.val_accuracy is not None else '-'
+        print(f"{result.trial:>5}  {result.status:<9}  {result.epochs:>6}  {accuracy:>8}  "
+              f"{result.samples_per_s:>9.1f}  {result.params}")
+    print(f"Sweep took {wall_seconds:.1f}s; wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
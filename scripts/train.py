@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Training entry point, meant to be launched with torchrun.
+
+Elastic example for a spot fleet of 1-4 nodes:
+
+    torchrun --nnodes=1:4 --nproc_per_node=gpu --max_restarts=10 \\
+        --rdzv_backend=c10d --rdzv_endpoint=$HEAD_NODE:29400 --rdzv_id=$JOB_ID \\
+        scripts/train.py --config config/training.yml
+
+On a CPU-only node set ``cpu_affinity: true`` and start one rank per NUMA
+node (or a few per node); each rank and its loader workers get their own
+cores:
+
+    torchrun --nproc_per_node=2 scripts/train.py --config config/cpu.yml
+"""
+
+import argparse
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.pipeline.config import TrainingConfig
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.storage import storage_from_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run (elastic) distributed training')
+    parser.add_argument('--config', required=True, help='Path to TrainingConfig YAML')
+    args = parser.parse_args()
+
+    config = TrainingConfig.from_yaml(args.config).__dict__
+    trainer = DistributedTrainer(config, distributed='WORLD_SIZE' in os.environ)
+    model = trainer.build_model()
+    optimizer = trainer.create_optimizer(model)
+
+    storage = storage_from_config(config, 'data')
+    train_dataset = S3Dataset(config['data_bucket'], prefix='train/', storage=storage)
+    val_loader = torch.utils.data.DataLoader(
+        S3Dataset(config['data_bucket'], prefix='val/', storage=storage),
+        batch_size=config['batch_size'],
+        num_workers=config['num_workers'],
+        worker_init_fn=trainer.worker_init_fn
+    )
+    state = trainer.fit(model, optimizer, torch.nn.CrossEntropyLoss(), train_dataset, val_loader)
+    if trainer.preempted:
+        print(f"Preempted at epoch {state.epoch}, step {state.global_step}; "
+              f"the next start resumes from the emergency checkpoint")
+    else:
+        print(f"Training finished at epoch {state.epoch}, step {state.global_step}")
+
+
+if __name__ == "__main__":
+    main()
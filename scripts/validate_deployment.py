@@ -1,10 +1,56 @@
 #!/usr/bin/env python3
 
 import sys
+import os
 import boto3
 import argparse
 import yaml
+from functools import partial
 from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.aws import run_checks
+
+def check_buckets(s3, buckets) -> Tuple[List[str], bool]:
+    """Check each bucket concurrently; returns report lines and status"""
+    def head(bucket):
+        try:
+            s3.head_bucket(Bucket=bucket)
+            return f"✅ {bucket}: EXISTS", True
+        except Exception as e:
+            return f"❌ {bucket}: {str(e)}", False
+
+    results = run_checks({bucket: partial(head, bucket) for bucket in buckets})
+    return [line for line, _ in results.values()], all(ok for _, ok in results.values())
+
+def check_cluster(ecs) -> Tuple[List[str], bool]:
+    try:
+        response = ecs.describe_clusters(clusters=['ml-training-cluster'])
+        if response['clusters'] and response['clusters'][0]['status'] == 'ACTIVE':
+            return ["✅ ml-training-cluster: ACTIVE"], True
+        else:
+            return ["❌ ml-training-cluster: NOT ACTIVE"], False
+    except Exception as e:
+        return [f"❌ ml-training-cluster: {str(e)}"], False
+
+def check_dashboard(cloudwatch) -> Tuple[List[str], bool]:
+    try:
+        cloudwatch.get_dashboard(DashboardName='MLTrainingDashboard')
+        return ["✅ MLTrainingDashboard: EXISTS"], True
+    except Exception as e:
+        return [f"❌ MLTrainingDashboard: {str(e)}"], False
+
+def check_alarms(cloudwatch, alarm_names) -> Tuple[List[str], bool]:
+    """Check all alarms with a single DescribeAlarms call"""
+    try:
+        response = cloudwatch.describe_alarms(AlarmNames=alarm_names)
+        found = {alarm['AlarmName'] for alarm in response['MetricAlarms']}
+    except Exception as e:
+        return [f"❌ {alarm_name}: {str(e)}" for alarm_name in alarm_names], False
+    lines = [f"✅ {alarm_name}: EXISTS" if alarm_name in found else f"❌ {alarm_name}: NOT FOUND"
+             for alarm_name in alarm_names]
+    return lines, all(alarm_name in found for alarm_name in alarm_names)
 
 def validate_resources(config_path):
     """Validate deployed AWS resources"""
@@ -21,73 +67,31 @@ def validate_resources(config_path):
         print("\nDeployment Validation Results:")
         print("=============================")
         
-        # Validate S3 buckets
         bucket_prefix = config['infrastructure']['storage']['s3_bucket_prefix']
         buckets = [
             f"{bucket_prefix}-data",
             f"{bucket_prefix}-checkpoints",
             f"{bucket_prefix}-logs"
         ]
+        alarm_names = [f"MLTraining_{alert['metric']}" for alert in config['monitoring']['alerts']]
         
-        print("\nChecking S3 Buckets:")
-        all_buckets_exist = True
-        for bucket in buckets:
-            try:
-                s3.head_bucket(Bucket=bucket)
-                print(f"✅ {bucket}: EXISTS")
-            except Exception as e:
-                print(f"❌ {bucket}: {str(e)}")
-                all_buckets_exist = False
-
-        # Validate ECS Cluster
-        print("\nChecking ECS Cluster:")
-        try:
-            response = ecs.describe_clusters(clusters=['ml-training-cluster'])
-            if response['clusters'] and response['clusters'][0]['status'] == 'ACTIVE':
-                print("✅ ml-training-cluster: ACTIVE")
-                cluster_exists = True
-            else:
-                print("❌ ml-training-cluster: NOT ACTIVE")
-                cluster_exists = False
-        except Exception as e:
-            print(f"❌ ml-training-cluster: {str(e)}")
-            cluster_exists = False
-
-        # Validate CloudWatch Dashboard
-        print("\nChecking CloudWatch Dashboard:")
-        try:
-            cloudwatch.get_dashboard(DashboardName='MLTrainingDashboard')
-            print("✅ MLTrainingDashboard: EXISTS")
-            dashboard_exists = True
-        except Exception as e:
-            print(f"❌ MLTrainingDashboard: {str(e)}")
-            dashboard_exists = False
-
-        # Validate CloudWatch Alarms
-        print("\nChecking CloudWatch Alarms:")
-        alarms_exist = True
-        for alert in config['monitoring']['alerts']:
-            alarm_name = f"MLTraining_{alert['metric']}"
-            try:
-                response = cloudwatch.describe_alarms(AlarmNames=[alarm_name])
-                if response['MetricAlarms']:
-                    print(f"✅ {alarm_name}: EXISTS")
-                else:
-                    print(f"❌ {alarm_name}: NOT FOUND")
-                    alarms_exist = False
-            except Exception as e:
-                print(f"❌ {alarm_name}: {str(e)}")
-                alarms_exist = False
+        # All checks are read-only and independent, so run them concurrently
+        # and print the reports in a fixed order
+        results = run_checks({
+            "S3 Buckets": lambda: check_buckets(s3, buckets),
+            "ECS Cluster": lambda: check_cluster(ecs),
+            "CloudWatch Dashboard": lambda: check_dashboard(cloudwatch),
+            "CloudWatch Alarms": lambda: check_alarms(cloudwatch, alarm_names)
+        })
+        for resource, (lines, _) in results.items():
+            print(f"\nChecking {resource}:")
+            for line in lines:
+                print(line)
 
         # Overall validation result
         print("\nValidation Summary:")
         print("==================")
-        validations = {
-            "S3 Buckets": all_buckets_exist,
-            "ECS Cluster": cluster_exists,
-            "CloudWatch Dashboard": dashboard_exists,
-            "CloudWatch Alarms": alarms_exist
-        }
+        validations = {resource: ok for resource, (_, ok) in results.items()}
 
         for resource, status in validations.items():
             print(f"{resource}: {'✅ PASS' if status else '❌ FAIL'}")
@@ -111,4 +115,4 @@ def main():
     return 0 if success else 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
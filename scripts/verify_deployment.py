@@ -3,6 +3,11 @@ import boto3
 import argparse
 from typing import Dict, Any
 import sys
+import os
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.aws import run_checks
 
 class DeploymentVerifier:
     def __init__(self, config_path: str):
@@ -40,15 +45,18 @@ class DeploymentVerifier:
     def verify_cloudwatch_metrics(self) -> bool:
         """Verify CloudWatch metrics are properly configured"""
         try:
-            for metric in self.config['monitoring']['metrics']:
+            def has_metric(name):
                 response = self.aws_clients['cloudwatch'].list_metrics(
-                    MetricName=metric['name'],
+                    MetricName=name,
                     Namespace='MLTraining'
                 )
                 if not response['Metrics']:
-                    print(f"Missing metric: {metric['name']}")
+                    print(f"Missing metric: {name}")
                     return False
-            return True
+                return True
+
+            names = [metric['name'] for metric in self.config['monitoring']['metrics']]
+            return all(run_checks({name: partial(has_metric, name) for name in names}).values())
         except Exception as e:
             print(f"Error verifying CloudWatch metrics: {e}")
             return False
@@ -69,13 +77,12 @@ class DeploymentVerifier:
             return False
     
     def verify_all(self) -> Dict[str, bool]:
-        """Run all verifications"""
-        results = {
-            'S3 Buckets': self.verify_s3_buckets(),
-            'CloudWatch Metrics': self.verify_cloudwatch_metrics(),
-            'Logging': self.verify_logging()
-        }
-        return results
+        """Run all verifications concurrently"""
+        return run_checks({
+            'S3 Buckets': self.verify_s3_buckets,
+            'CloudWatch Metrics': self.verify_cloudwatch_metrics,
+            'Logging': self.verify_logging
+        })
 
 def main():
     parser = argparse.ArgumentParser()
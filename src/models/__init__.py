@@ -0,0 +1 @@
+from src.models.resnet import MODEL_REGISTRY, ResNet, create_model
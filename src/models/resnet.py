@@ -0,0 +1,235 @@
+import contextlib
+import torch
+import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
+from torch.utils.checkpoint import checkpoint
+from typing import Callable, Dict, Iterable, List, Optional, Type, Union
+
+
+def conv3x3(in_planes: int, out_planes: int, stride: int = 1) -> nn.Conv2d:
+    return nn.Conv2d(in_planes, out_planes, kernel_size=3, stride=stride,
+                     padding=1, bias=False)
+
+
+def conv1x1(in_planes: int, out_planes: int, stride: int = 1) -> nn.Conv2d:
+    return nn.Conv2d(in_planes, out_planes, kernel_size=1, stride=stride, bias=False)
+
+
+def _fuse_pair(module: nn.Module, conv_name: str, bn_name: str) -> None:
+    """Fold ``module.<bn_name>`` into ``module.<conv_name>`` in place."""
+    conv = getattr(module, conv_name)
+    bn = getattr(module, bn_name)
+    if isinstance(bn, nn.BatchNorm2d):
+        setattr(module, conv_name, fuse_conv_bn_eval(conv, bn))
+        setattr(module, bn_name, nn.Identity())
+
+
+@contextlib.contextmanager
+def _frozen_bn_stats(module: nn.Module):
+    """Restore every BatchNorm buffer in ``module`` on exit.
+
+    Used around the backward-pass recompute of checkpointed stages, which
+    would otherwise update the running statistics a second time per step
+    (doubling the effective momentum).
+    """
+    buffers = [buf for m in module.modules() if isinstance(m, nn.modules.batchnorm._BatchNorm)
+               for buf in m.buffers()]
+    saved = [buf.clone() for buf in buffers]
+    try:
+        yield
+    finally:
+        with torch.no_grad():
+            for buf, value in zip(buffers, saved):
+                buf.copy_(value)
+
+
+class BasicBlock(nn.Module):
+    expansion = 1
+
+    def __init__(self, inplanes: int, planes: int, stride: int = 1,
+                 downsample: Optional[nn.Module] = None):
+        super().__init__()
+        self.conv1 = conv3x3(inplanes, planes, stride)
+        self.bn1 = nn.BatchNorm2d(planes)
+        self.relu = nn.ReLU(inplace=True)
+        self.conv2 = conv3x3(planes, planes)
+        self.bn2 = nn.BatchNorm2d(planes)
+        self.downsample = downsample
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        identity = x if self.downsample is None else self.downsample(x)
+        out = self.relu(self.bn1(self.conv1(x)))
+        out = self.bn2(self.conv2(out))
+        return self.relu(out + identity)
+
+    def fuse(self) -> None:
+        _fuse_pair(self, 'conv1', 'bn1')
+        _fuse_pair(self, 'conv2', 'bn2')
+
+
+class Bottleneck(nn.Module):
+    expansion = 4
+
+    def __init__(self, inplanes: int, planes: int, stride: int = 1,
+                 downsample: Optional[nn.Module] = None):
+        super().__init__()
+        self.conv1 = conv1x1(inplanes, planes)
+        self.bn1 = nn.BatchNorm2d(planes)
+        self.conv2 = conv3x3(planes, planes, stride)
+        self.bn2 = nn.BatchNorm2d(planes)
+        self.conv3 = conv1x1(planes, planes * self.expansion)
+        self.bn3 = nn.BatchNorm2d(planes * self.expansion)
+        self.relu = nn.ReLU(inplace=True)
+        self.downsample = downsample
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        identity = x if self.downsample is None else self.downsample(x)
+        out = self.relu(self.bn1(self.conv1(x)))
+        out = self.relu(self.bn2(self.conv2(out)))
+        out = self.bn3(self.conv3(out))
+        return self.relu(out + identity)
+
+    def fuse(self) -> None:
+        _fuse_pair(self, 'conv1', 'bn1')
+        _fuse_pair(self, 'conv2', 'bn2')
+        _fuse_pair(self, 'conv3', 'bn3')
+
+
+class ResNet(nn.Module):
+    """ResNet with torchvision-compatible parameter names.
+
+    ``checkpoint_stages`` lists the residual stages (1-4) whose activations are
+    recomputed in the backward pass instead of stored, trading compute for
+    memory. ``channels_last`` runs the network in NHWC memory format.
+    """
+
+    def __init__(self, block: Type[Union[BasicBlock, Bottleneck]], layers: List[int],
+                 num_classes: int = 1000,
+                 checkpoint_stages: Iterable[int] = (),
+                 channels_last: bool = False):
+        super().__init__()
+        self.inplanes = 64
+        self.checkpoint_stages = set(checkpoint_stages)
+        self.channels_last = channels_last
+
+        self.conv1 = nn.Conv2d(3, self.inplanes, kernel_size=7, stride=2, padding=3, bias=False)
+        self.bn1 = nn.BatchNorm2d(self.inplanes)
+        self.relu = nn.ReLU(inplace=True)
+        self.maxpool = nn.MaxPool2d(kernel_size=3, stride=2, padding=1)
+        self.layer1 = self._make_layer(block, 64, layers[0])
+        self.layer2 = self._make_layer(block, 128, layers[1], stride=2)
+        self.layer3 = self._make_layer(block, 256, layers[2], stride=2)
+        self.layer4 = self._make_layer(block, 512, layers[3], stride=2)
+        self.avgpool = nn.AdaptiveAvgPool2d((1, 1))
+        self.fc = nn.Linear(512 * block.expansion, num_classes)
+
+        for m in self.modules():
+            if isinstance(m, nn.Conv2d):
+                nn.init.kaiming_normal_(m.weight, mode='fan_out', nonlinearity='relu')
+            elif isinstance(m, nn.BatchNorm2d):
+                nn.init.constant_(m.weight, 1)
+                nn.init.constant_(m.bias, 0)
+
+        if channels_last:
+            self.to(memory_format=torch.channels_last)
+
+    def _make_layer(self, block: Type[Union[BasicBlock, Bottleneck]], planes: int,
+                    blocks: int, stride: int = 1) -> nn.Sequential:
+        downsample = None
+        if stride != 1 or self.inplanes != planes * block.expansion:
+            downsample = nn.Sequential(
+                conv1x1(self.inplanes, planes * block.expansion, stride),
+                nn.BatchNorm2d(planes * block.expansion),
+            )
+        layers = [block(self.inplanes, planes, stride, downsample)]
+        self.inplanes = planes * block.expansion
+        for _ in range(1, blocks):
+            layers.append(block(self.inplanes, planes))
+        return nn.Sequential(*layers)
+
+    @property
+    def stages(self) -> List[nn.Sequential]:
+        return [self.layer1, self.layer2, self.layer3, self.layer4]
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+        x = self.maxpool(self.relu(self.bn1(self.conv1(x))))
+
+        for index, stage in enumerate(self.stages, start=1):
+            if index in self.checkpoint_stages and self.training and torch.is_grad_enabled():
+                # The recompute would update BatchNorm running stats again
+                x = checkpoint(stage, x, use_reentrant=False,
+                               context_fn=lambda stage=stage: (contextlib.nullcontext(),
+                                                               _frozen_bn_stats(stage)))
+            else:
+                x = stage(x)
+
+        x = torch.flatten(self.avgpool(x), 1)
+        return self.fc(x)
+
+    def fuse(self) -> 'ResNet':
+        """Fold every BatchNorm into its preceding conv for inference.
+
+        Only valid in eval mode; returns ``self`` for chaining.
+        """
+        if self.training:
+            raise RuntimeError("Conv+BN folding requires the model to be in eval mode")
+        _fuse_pair(self, 'conv1', 'bn1')
+        for stage in self.stages:
+            for block in stage:
+                block.fuse()
+                if block.downsample is not None:
+                    _fuse_pair(block.downsample, '0', '1')
+        if self.channels_last:
+            # Folded convs get freshly allocated (contiguous) weights
+            self.to(memory_format=torch.channels_last)
+        return self
+
+
+def resnet18(**kwargs) -> ResNet:
+    return ResNet(BasicBlock, [2, 2, 2, 2], **kwargs)
+
+
+def resnet34(**kwargs) -> ResNet:
+    return ResNet(BasicBlock, [3, 4, 6, 3], **kwargs)
+
+
+def resnet50(**kwargs) -> ResNet:
+    return ResNet(Bottleneck, [3, 4, 6, 3], **kwargs)
+
+
+def resnet101(**kwargs) -> ResNet:
+    return ResNet(Bottleneck, [3, 4, 23, 3], **kwargs)
+
+
+MODEL_REGISTRY: Dict[str, Callable[..., ResNet]] = {
+    'resnet18': resnet18,
+    'resnet34': resnet34,
+    'resnet50': resnet50,
+    'resnet101': resnet101,
+}
+
+
+def _pretrained_state_dict(model_name: str) -> Dict[str, torch.Tensor]:
+    """ImageNet weights of the torchvision model of the same name (downloaded once)."""
+    import torchvision.models as models
+    return models.get_model_weights(model_name).DEFAULT.get_state_dict(progress=False)
+
+
+def create_model(model_name: str, pretrained: bool = False, **kwargs) -> ResNet:
+    """Look up ``model_name`` in the registry and build the model.
+
+    ``pretrained`` initialises it from torchvision's ImageNet weights; the
+    classifier is left freshly initialised when ``num_classes`` differs.
+    """
+    if model_name not in MODEL_REGISTRY:
+        raise ValueError(f"Unknown model: {model_name}. "
+                         f"Available: {', '.join(sorted(MODEL_REGISTRY))}")
+    model = MODEL_REGISTRY[model_name](**kwargs)
+    if pretrained:
+        state = _pretrained_state_dict(model_name)
+        if state['fc.weight'].shape != model.fc.weight.shape:
+            state['fc.weight'], state['fc.bias'] = model.fc.weight, model.fc.bias
+        model.load_state_dict(state)
+    return model
@@ -0,0 +1,209 @@
+import copy
+import os
+import re
+import resource
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import torch
+
+from src.pipeline.trainer import DistributedTrainer
+
+
+@dataclass
+class BatchSizeResult:
+    max_batch_size: int
+    batch_size: int
+    throughput: Dict[int, float] = field(default_factory=dict)  # samples/sec
+
+
+def _device() -> torch.device:
+    return torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
+
+def _reset_peak_memory(device: torch.device) -> None:
+    if device.type == 'cuda':
+        torch.cuda.empty_cache()
+        torch.cuda.reset_peak_memory_stats(device)
+        return
+    try:
+        # Linux resets VmHWM (peak RSS) when "5" is written to clear_refs
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_memory_mb(device: torch.device) -> float:
+    if device.type == 'cuda':
+        return torch.cuda.max_memory_allocated(device) / 2**20
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux and cannot be reset
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _default_memory_budget_mb(device: torch.device) -> Optional[float]:
+    """Leave headroom below physical memory so the OOM killer never fires.
+
+    CUDA raises a catchable OutOfMemoryError, so no budget is needed there.
+    """
+    if device.type == 'cuda':
+        return None
+    try:
+        return 0.8 * os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (ValueError, OSError):
+        return None
+
+
+def _is_oom(error: BaseException) -> bool:
+    if isinstance(error, MemoryError):
+        return True
+    message = str(error).lower()
+    return 'out of memory' in message or "can't allocate memory" in message
+
+
+def _make_batch(batch_size: int, input_shape: Tuple[int, ...], num_classes: int,
+                device: torch.device) -> Tuple[torch.Tensor, torch.Tensor]:
+    return (torch.randn(batch_size, *input_shape, device=device),
+            torch.randint(0, num_classes, (batch_size,), device=device))
+
+
+def find_batch_size(trainer: DistributedTrainer,
+                    model: torch.nn.Module,
+                    optimizer: torch.optim.Optimizer,
+                    criterion: torch.nn.Module,
+                    input_shape: Tuple[int, ...] = (3, 224, 224),
+                    num_classes: int = 10,
+                    max_batch_size: int = 4096,
+                    memory_budget_mb: Optional[float] = None,
+                    candidates: int = 4,
+                    warmup_steps: int = 2,
+                    timed_steps: int = 5) -> BatchSizeResult:
+    """Find the largest batch that fits, then the fastest batch below it.
+
+    Batch sizes are probed with ``trainer.train_step`` on synthetic data: the
+    size is doubled until a step runs out of memory (or exceeds
+    ``memory_budget_mb``), then binary-searched between the last fit and the
+    first failure. Under a budget, a size whose peak memory (extrapolated
+    linearly from the probes that fit) would exceed it counts as a failure
+    without being run, so a probe never overshoots physical memory.
+    Throughput is then measured at ``candidates`` sizes between half the
+    limit and the limit, and the one with the most samples/sec wins.
+
+    Model and optimizer state are restored before returning.
+    """
+    device = _device()
+    if memory_budget_mb is None:
+        memory_budget_mb = _default_memory_budget_mb(device)
+
+    model_state = copy.deepcopy(model.state_dict())
+    optimizer_state = copy.deepcopy(optimizer.state_dict())
+
+    peaks: Dict[int, float] = {}  # batch size -> peak MB, for probes that fit
+
+    def projected_mb(batch_size: int) -> Optional[float]:
+        # Peak memory is a fixed cost plus a per-sample cost
+        if len(peaks) < 2:
+            return None
+        small, large = min(peaks), max(peaks)
+        per_sample = (peaks[large] - peaks[small]) / (large - small)
+        return peaks[large] + per_sample * (batch_size - large)
+
+    def fits(batch_size: int) -> bool:
+        if memory_budget_mb is not None:
+            projected = projected_mb(batch_size)
+            if projected is not None and projected > memory_budget_mb:
+                return False
+        _reset_peak_memory(device)
+        try:
+            batch = _make_batch(batch_size, input_shape, num_classes, device)
+            trainer.train_step(model, batch, optimizer, criterion)
+        except (RuntimeError, MemoryError) as e:
+            if not _is_oom(e):
+                raise
+            return False
+        finally:
+            optimizer.zero_grad(set_to_none=True)
+            if device.type == 'cuda':
+                torch.cuda.empty_cache()
+        peak = _peak_memory_mb(device)
+        if memory_budget_mb is not None and peak > memory_budget_mb:
+            return False
+        peaks[batch_size] = peak
+        return True
+
+    def measure(batch_size: int) -> float:
+        batch = _make_batch(batch_size, input_shape, num_classes, device)
+        for _ in range(warmup_steps):
+            trainer.train_step(model, batch, optimizer, criterion)
+        # train_step returns loss.item(), which synchronizes the device
+        start = time.perf_counter()
+        for _ in range(timed_steps):
+            trainer.train_step(model, batch, optimizer, criterion)
+        return batch_size * timed_steps / (time.perf_counter() - start)
+
+    try:
+        if not fits(1):
+            raise RuntimeError("A batch size of 1 does not fit in memory")
+
+        low, high = 1, None
+        while high is None and low < max_batch_size:
+            candidate = min(low * 2, max_batch_size)
+            if fits(candidate):
+                low = candidate
+            else:
+                high = candidate
+        if high is not None:
+            while high - low > 1:
+                mid = (low + high) // 2
+                if fits(mid):
+                    low = mid
+                else:
+                    high = mid
+        limit = low
+        print(f"Largest batch size that fits: {limit}")
+
+        sizes = _candidate_sizes(limit, candidates)
+        throughput = {}
+        for batch_size in sizes:
+            throughput[batch_size] = measure(batch_size)
+            print(f"batch_size={batch_size}: {throughput[batch_size]:.1f} samples/sec")
+        best = max(throughput, key=throughput.get)
+    finally:
+        model.load_state_dict(model_state)
+        optimizer.load_state_dict(optimizer_state)
+
+    return BatchSizeResult(max_batch_size=limit, batch_size=best, throughput=throughput)
+
+
+def _candidate_sizes(limit: int, count: int) -> List[int]:
+    """``count`` sizes spread evenly from half the limit up to the limit."""
+    if count <= 1 or limit == 1:
+        return [limit]
+    low = max(limit // 2, 1)
+    step = (limit - low) / (count - 1)
+    return sorted({int(round(low + i * step)) for i in range(count)})
+
+
+def write_batch_size(config_path: str, batch_size: int) -> None:
+    """Write ``batch_size`` into a TrainingConfig or production-style YAML.
+
+    Existing ``batch_size:`` lines are edited in place so comments and layout
+    survive; a top-level key is appended if none exists.
+    """
+    with open(config_path, 'r') as f:
+        text = f.read()
+    pattern = re.compile(r'^(\s*batch_size:\s*)\d+', re.MULTILINE)
+    if pattern.search(text):
+        text = pattern.sub(lambda m: f"{m.group(1)}{batch_size}", text)
+    else:
+        text = text.rstrip('\n') + f"\nbatch_size: {batch_size}\n"
+    with open(config_path, 'w') as f:
+        f.write(text)
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 import os
 import yaml
 
@@ -10,8 +10,21 @@ class TrainingConfig:
     epochs: int = 10
     num_workers: int = 4
     model_name: str = 'resnet50'
+    num_classes: int = 10
+    pretrained: bool = False  # start from torchvision's ImageNet weights
+    checkpoint_stages: List[int] = field(default_factory=list)  # ResNet stages 1-4
+    channels_last: bool = False
     checkpoint_bucket: Optional[str] = None
     data_bucket: Optional[str] = None
+    # s3://bucket, file:///path or memory://name; default to the buckets above
+    data_storage: Optional[str] = None
+    checkpoint_storage: Optional[str] = None
+    storage_max_connections: int = 64
+    storage_max_attempts: int = 5
+    storage_concurrency: int = 32  # concurrent fetches per loader process
+    # Socket of the node-local sample cache (scripts/sample_cache.py)
+    data_cache_socket: Optional[str] = None
+    data_cache_decoded: bool = False  # cache decoded pixels instead of JPEG bytes
     device: str = 'cuda'
     optimizer: str = 'adam'
     scheduler: str = 'cosine'
@@ -19,6 +32,39 @@ class TrainingConfig:
     weight_decay: float = 1e-4
     gradient_clip: float = 1.0
     mixed_precision: bool = True
+    sharding: str = 'ddp'  # 'ddp', 'zero' (optimizer state) or 'fsdp'
+    seed: int = 0
+    # Shared by restarts of one job, unique per job; default TORCHELASTIC_RUN_ID
+    run_id: Optional[str] = None
+    # Node-local disk; default /tmp/elastic_snapshot_<run_id>.pt
+    snapshot_path: Optional[str] = None
+    keep_snapshot: bool = False  # keep it once fit completes, e.g. to train further
+    snapshot_every: int = 100  # steps
+    scale_lr_on_resize: bool = True
+    handle_preemption: bool = True
+    preemption_grace_seconds: float = 30.0  # SIGTERM to SIGKILL
+    preemption_check_every: int = 10  # steps between cross-rank SIGTERM checks
+    accelerated: bool = False  # torch.compile, channels_last, fused optimizer
+    compile_mode: Optional[str] = None  # e.g. 'max-autotune'
+    compile_cache_dir: str = '/tmp/torchinductor_cache'
+    divergence_guard: bool = False
+    divergence_check_every: int = 50  # steps between checks / CPU snapshots
+    divergence_loss_threshold: Optional[float] = None  # NaN/Inf always trigger
+    divergence_grad_norm_threshold: Optional[float] = None
+    divergence_lr_factor: float = 1.0  # applied to the LR on each rollback
+    divergence_max_rollbacks: int = 5
+    # Progressive resizing: first epoch of each stage -> training resolution;
+    # empty trains at the full 224
+    resolution_schedule: Dict[int, int] = field(default_factory=dict)
+    scale_batch_with_resolution: bool = False  # constant pixels per batch
+    track_sample_losses: bool = False
+    # Share of below-mean-loss samples trained on per epoch; 1.0 disables pruning
+    prune_keep_fraction: float = 1.0
+    prune_warmup_epochs: int = 1  # full-data epochs before pruning starts
+    prune_anneal_epochs: int = 1  # final full-data epochs
+    # CPU-only nodes: pin ranks and loader workers to disjoint cores/NUMA nodes
+    cpu_affinity: bool = False
+    loader_cores_per_rank: Optional[int] = None  # default min(num_workers, half the rank's cores)
 
     @classmethod
     def from_yaml(cls, yaml_path: str) -> 'TrainingConfig':
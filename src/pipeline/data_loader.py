@@ -1,44 +1,98 @@
-import boto3
 import torch
 from torch.utils.data import Dataset, DataLoader
-import torchvision.transforms as transforms
-from typing import Tuple, List
+from typing import Any, Dict, Optional, Tuple, List, Union
 import io
 import os
 from PIL import Image
+from src.utils.storage import S3Storage, Storage, storage_from_config
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+def normalize_images(images: torch.Tensor) -> torch.Tensor:
+    """Turn a batch of uint8 RGB pixels into normalized float model input."""
+    mean = torch.tensor(IMAGENET_MEAN, device=images.device).view(1, 3, 1, 1)
+    std = torch.tensor(IMAGENET_STD, device=images.device).view(1, 3, 1, 1)
+    return (images.float() / 255 - mean) / std
+
 
 class S3Dataset(Dataset):
-    def __init__(self, bucket_name: str, prefix: str):
-        self.s3_client = boto3.client('s3')
+    """Images under ``prefix/class_N/`` of a storage backend.
+
+    Reads ``s3://bucket`` unless another ``storage`` (local disk, memory) is
+    given. Nothing is listed or fetched at construction: the prefix is listed
+    on first use, and each DataLoader worker creates its own connections.
+    Batched loading fetches all samples of a batch concurrently.
+
+    ``image_list`` reuses a listing made earlier, e.g. by a sweep that
+    starts several trials on the same data.
+
+    The output resolution can be changed between epochs with
+    ``set_resolution``; it lives in shared memory, so running (persistent)
+    DataLoader workers pick it up without being restarted.
+
+    With ``normalize=False`` samples are uint8 pixels, a quarter of the
+    size, for holding a decoded copy in memory; ``normalize_images`` turns
+    a batch of them into model input.
+    """
+
+    def __init__(self, bucket_name: str, prefix: str, storage: Optional[Storage] = None,
+                 image_list: Optional[List[Tuple[str, int]]] = None, normalize: bool = True):
         self.bucket = bucket_name
         self.prefix = prefix
-        self.image_list = self._get_image_list()
-        
-        self.transform = transforms.Compose([
-            transforms.Resize(256),
-            transforms.CenterCrop(224),
-            transforms.ToTensor(),
-            transforms.Normalize(
-                mean=[0.485, 0.456, 0.406],
-                std=[0.229, 0.224, 0.225]
-            )
-        ])
+        self.storage = storage or S3Storage(bucket_name)
+        self._image_list = image_list
+        self.normalize = normalize
+        self._resolution = torch.full((1,), 224, dtype=torch.int32).share_memory_()
+        self._transforms: Dict[int, Any] = {}
+
+    @property
+    def image_list(self) -> List[Tuple[str, int]]:
+        if self._image_list is None:
+            self._image_list = self._get_image_list()
+        return self._image_list
+
+    @property
+    def resolution(self) -> int:
+        return int(self._resolution.item())
+
+    def set_resolution(self, resolution: int) -> None:
+        """Crop size of samples loaded from now on, in every worker."""
+        self._resolution.fill_(resolution)
+
+    @property
+    def transform(self):
+        resolution = self.resolution
+        transform = self._transforms.get(resolution)
+        if transform is None:
+            # Imported here: only needed once samples are decoded
+            import torchvision.transforms as transforms
+            # Same 256/224 resize-to-crop ratio at every resolution
+            steps = [
+                transforms.Resize(round(resolution * 256 / 224)),
+                transforms.CenterCrop(resolution),
+            ]
+            if self.normalize:
+                steps += [transforms.ToTensor(),
+                          transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)]
+            else:
+                steps.append(transforms.PILToTensor())
+            transform = self._transforms[resolution] = transforms.Compose(steps)
+        return transform
     
     def _get_image_list(self) -> List[Tuple[str, int]]:
-        """Get list of images from S3 bucket."""
+        """Get list of images from storage."""
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket,
-                Prefix=self.prefix
-            )
-            if 'Contents' not in response:
+            images = [(obj.key, self._get_label(obj.key))
+                      for obj in self.storage.list(self.prefix)
+                      if not obj.key.endswith('/')]  # Skip directories
+            if not images:
                 # Return at least one dummy item to prevent DataLoader errors
                 return [('dummy.jpg', 0)]
-            return [(obj['Key'], self._get_label(obj['Key'])) 
-                    for obj in response['Contents'] 
-                    if not obj['Key'].endswith('/')]  # Skip directories
+            return images
         except Exception as e:
-            print(f"Error accessing S3: {e}")
+            print(f"Error accessing storage: {e}")
             # Return dummy data to prevent initialization errors
             return [('dummy.jpg', 0)]
 
@@ -54,19 +108,13 @@ class S3Dataset(Dataset):
     def __len__(self) -> int:
         return max(len(self.image_list), 1)  # Ensure at least length 1
     
-    def __getitem__(self, idx: int) -> Tuple[torch.Tensor, int]:
+    def _decode(self, image_data: Union[bytes, Image.Image, None],
+                label: int) -> Tuple[torch.Tensor, int]:
         try:
-            image_key, label = self.image_list[idx]
-            
-            # Download image from S3
-            response = self.s3_client.get_object(
-                Bucket=self.bucket,
-                Key=image_key
-            )
-            image_data = response['Body'].read()
-            
-            # Convert to PIL Image
-            image = Image.open(io.BytesIO(image_data))
+            if isinstance(image_data, Image.Image):
+                image = image_data  # already decoded by the sample cache
+            else:
+                image = Image.open(io.BytesIO(image_data))
             if image.mode != 'RGB':
                 image = image.convert('RGB')
         except:
@@ -78,16 +126,35 @@ class S3Dataset(Dataset):
         image = self.transform(image)
         return image, label
 
+    def __getitem__(self, idx: int) -> Tuple[torch.Tensor, int]:
+        return self.__getitems__([idx])[0]
+
+    def __getitems__(self, indices: List[int]) -> List[Tuple[torch.Tensor, int]]:
+        """Load a whole batch, fetching its samples concurrently.
+
+        Called by the DataLoader instead of ``__getitem__`` per index.
+        """
+        entries = [self.image_list[idx] for idx in indices]
+        keys = [key for key, _ in entries]
+        if getattr(self.storage, 'decoded', False):
+            data = self.storage.get_images(keys)
+        else:
+            data = self.storage.get_many(keys, ignore_errors=True)
+        return [self._decode(image_data, label) for image_data, (_, label) in zip(data, entries)]
+
 def create_dataloaders(config: dict) -> Tuple[DataLoader, DataLoader]:
     """Create training and validation dataloaders."""
+    storage = storage_from_config(config, 'data')
     train_dataset = S3Dataset(
-        config['data_bucket'],
-        prefix='train/'
+        config.get('data_bucket'),
+        prefix='train/',
+        storage=storage
     )
     
     val_dataset = S3Dataset(
-        config['data_bucket'],
-        prefix='val/'
+        config.get('data_bucket'),
+        prefix='val/',
+        storage=storage
     )
     
     train_loader = DataLoader(
@@ -0,0 +1,117 @@
+from typing import Any, List, Optional
+
+import torch
+import torch.distributed as dist
+from torch.distributed.optim import ZeroRedundancyOptimizer
+
+
+def _to_cpu(obj: Any) -> Any:
+    """Deep-copy a (nested) optimizer state dict with tensors moved to CPU."""
+    if torch.is_tensor(obj):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {k: _to_cpu(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_cpu(v) for v in obj)
+    return obj
+
+
+class DivergenceGuard:
+    """Detect a diverging run and roll back to an in-memory snapshot.
+
+    Every step ``observe`` folds "loss or grad-norm is non-finite or above its
+    threshold" into a flag that stays on the device, so there is no per-step
+    host sync. The flag is read (and all-reduced across ranks) only in
+    ``diverged``, which the trainer calls every ``check_every`` steps. Healthy
+    windows are followed by a fresh CPU snapshot of the local model and
+    optimizer state; a diverged window is rolled back to the previous snapshot
+    and its batches are not replayed.
+    """
+
+    def __init__(self, check_every: int = 50,
+                 loss_threshold: Optional[float] = None,
+                 grad_norm_threshold: Optional[float] = None,
+                 lr_factor: float = 1.0,
+                 max_rollbacks: int = 5,
+                 distributed: bool = False):
+        self.check_every = check_every
+        self.loss_threshold = loss_threshold
+        self.grad_norm_threshold = grad_norm_threshold
+        self.lr_factor = lr_factor
+        self.max_rollbacks = max_rollbacks
+        self.distributed = distributed
+        self.rollbacks = 0
+        self._flag: Optional[torch.Tensor] = None
+        self._params: List[torch.Tensor] = []
+        self._buffers: List[torch.Tensor] = []
+        self._optimizer_state = None
+
+    @staticmethod
+    def grad_norm(model: torch.nn.Module) -> torch.Tensor:
+        """Total L2 norm of the local gradients, computed on the device.
+
+        Under FSDP this covers only the local shard, which is enough to catch
+        non-finite values and gross explosions.
+        """
+        norms = [torch.linalg.vector_norm(p.grad.detach())
+                 for p in model.parameters() if p.grad is not None]
+        if not norms:
+            return torch.zeros(())
+        return torch.linalg.vector_norm(torch.stack(norms))
+
+    def observe(self, loss: torch.Tensor, grad_norm: torch.Tensor) -> None:
+        bad = ~torch.isfinite(loss) | ~torch.isfinite(grad_norm)
+        if self.loss_threshold is not None:
+            bad = bad | (loss > self.loss_threshold)
+        if self.grad_norm_threshold is not None:
+            bad = bad | (grad_norm > self.grad_norm_threshold)
+        self._flag = bad if self._flag is None else self._flag | bad
+
+    def diverged(self) -> bool:
+        """Read and reset the divergence flag; synchronizes all ranks."""
+        flag = self._flag
+        self._flag = None
+        if flag is None:
+            flag = torch.zeros((), dtype=torch.bool)
+        if self.distributed:
+            device = torch.device('cuda') if dist.get_backend() == 'nccl' else torch.device('cpu')
+            flag = flag.to(device=device, dtype=torch.float32).reshape(1)
+            dist.all_reduce(flag, op=dist.ReduceOp.MAX)
+        return bool(flag.item())
+
+    @staticmethod
+    def _local_optimizer(optimizer: torch.optim.Optimizer) -> torch.optim.Optimizer:
+        # ZeRO's own state_dict is a collective; its wrapped optimizer holds
+        # the local shard
+        if isinstance(optimizer, ZeroRedundancyOptimizer):
+            return optimizer.optim
+        return optimizer
+
+    def snapshot(self, model: torch.nn.Module, optimizer: torch.optim.Optimizer) -> None:
+        """Copy local parameters, buffers and optimizer state to CPU."""
+        self._params = [p.detach().to('cpu', copy=True) for p in model.parameters()]
+        self._buffers = [b.detach().to('cpu', copy=True) for b in model.buffers()]
+        self._optimizer_state = _to_cpu(self._local_optimizer(optimizer).state_dict())
+
+    def rollback(self, model: torch.nn.Module, optimizer: torch.optim.Optimizer) -> None:
+        """Restore the last snapshot and optionally lower the learning rate."""
+        self.rollbacks += 1
+        if self.rollbacks > self.max_rollbacks:
+            raise RuntimeError(f"Training diverged {self.rollbacks} times; giving up")
+        if self._optimizer_state is None:
+            raise RuntimeError("Training diverged before the first snapshot")
+
+        # Lower from the current LR so repeated rollbacks keep compounding
+        lrs = [group['lr'] * self.lr_factor for group in optimizer.param_groups]
+        with torch.no_grad():
+            for param, saved in zip(model.parameters(), self._params):
+                param.copy_(saved, non_blocking=True)
+            for buffer, saved in zip(model.buffers(), self._buffers):
+                buffer.copy_(saved, non_blocking=True)
+        # load_state_dict may keep references to CPU tensors, so hand it a
+        # copy to keep the snapshot intact for a further rollback
+        self._local_optimizer(optimizer).load_state_dict(_to_cpu(self._optimizer_state))
+        for group, lr in zip(optimizer.param_groups, lrs):
+            group['lr'] = lr
+        print(f"Divergence detected, rolled back to the last snapshot "
+              f"(rollback {self.rollbacks}, lr {optimizer.param_groups[0]['lr']:.2e})")
@@ -0,0 +1,92 @@
+import math
+import os
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import torch
+from torch.utils.data import Dataset
+from torch.utils.data.distributed import DistributedSampler
+
+
+@dataclass
+class ElasticState:
+    """Progress that must survive a membership change."""
+    epoch: int = 0
+    samples_seen: int = 0  # global samples consumed in the current epoch
+    global_step: int = 0
+    world_size: int = 1
+
+
+def get_local_rank() -> int:
+    """Device index on this node, as set by torchrun."""
+    return int(os.environ.get('LOCAL_RANK', 0))
+
+
+def get_local_world_size() -> int:
+    """Number of ranks on this node, as set by torchrun."""
+    return int(os.environ.get('LOCAL_WORLD_SIZE', 1))
+
+
+def get_restart_count() -> int:
+    """How many times torchrun has restarted this worker group."""
+    return int(os.environ.get('TORCHELASTIC_RESTART_COUNT', 0))
+
+
+def rescale_learning_rate(optimizer: torch.optim.Optimizer,
+                          old_world_size: int, new_world_size: int) -> None:
+    """Apply the linear scaling rule when the global batch size changes."""
+    if old_world_size == new_world_size:
+        return
+    factor = new_world_size / old_world_size
+    for group in optimizer.param_groups:
+        group['lr'] *= factor
+    print(f"World size changed {old_world_size} -> {new_world_size}, "
+          f"learning rate scaled by {factor:.3f}")
+
+
+class ElasticDistributedSampler(DistributedSampler):
+    """DistributedSampler that can resume part-way through an epoch.
+
+    The epoch permutation depends only on ``seed`` and the epoch, so it is
+    identical for any world size. After a restart the first ``start_index``
+    samples of the permutation are skipped and the remainder is re-sharded
+    across the current ranks.
+    """
+
+    def __init__(self, dataset: Dataset, num_replicas: Optional[int] = None,
+                 rank: Optional[int] = None, shuffle: bool = True, seed: int = 0):
+        super().__init__(dataset, num_replicas=num_replicas, rank=rank,
+                         shuffle=shuffle, seed=seed)
+        self.start_index = 0
+
+    def set_start_index(self, start_index: int) -> None:
+        self.start_index = min(start_index, self._epoch_size())
+
+    def _epoch_size(self) -> int:
+        """Samples in the current epoch across all ranks."""
+        return len(self.dataset)
+
+    def _epoch_indices(self) -> List[int]:
+        """Order of the current epoch's samples; identical on every rank."""
+        if self.shuffle:
+            g = torch.Generator()
+            g.manual_seed(self.seed + self.epoch)
+            return torch.randperm(len(self.dataset), generator=g).tolist()
+        return list(range(len(self.dataset)))
+
+    def _remaining(self) -> int:
+        return self._epoch_size() - self.start_index
+
+    def __len__(self) -> int:
+        return math.ceil(self._remaining() / self.num_replicas)
+
+    def __iter__(self) -> Iterator[int]:
+        indices = self._epoch_indices()[self.start_index:]
+        if not indices:
+            return iter([])
+
+        # Pad so every rank gets the same number of samples
+        total_size = len(self) * self.num_replicas
+        padding = total_size - len(indices)
+        indices += (indices * math.ceil(padding / len(indices)))[:padding]
+        return iter(indices[self.rank:total_size:self.num_replicas])
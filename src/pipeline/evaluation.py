@@ -0,0 +1,216 @@
+import csv
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import torch
+import torch.multiprocessing as mp
+import torch.nn.functional as F
+from torch.nn.modules.utils import consume_prefix_in_state_dict_if_present
+from torch.utils.data import DataLoader, Dataset
+
+from src.models.resnet import create_model
+from src.pipeline.data_loader import normalize_images
+from src.utils.aws import DELETE_BATCH_SIZE, delete_batch
+
+CHECKPOINT_PATTERN = re.compile(r'epoch_(\d+)\.pt$')
+
+
+@dataclass
+class CheckpointResult:
+    key: str
+    epoch: int
+    loss: float
+    accuracy: float
+    eval_seconds: float
+
+
+def load_val_set(dataset: Dataset, batch_size: int = 256,
+                 num_workers: int = 8) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Decode the whole validation set once into shared-memory tensors.
+
+    Worker processes receive the tensors as shared-memory handles, so every
+    checkpoint is evaluated on the same decoded data without copying it.
+    Pass a dataset of uint8 pixels (``S3Dataset(..., normalize=False)``) to
+    keep the copy a quarter of the float size; uint8 images are normalized
+    per batch on the evaluating device.
+    """
+    loader = DataLoader(dataset, batch_size=batch_size, num_workers=num_workers)
+    images: Optional[torch.Tensor] = None
+    labels = torch.empty(len(dataset), dtype=torch.long)
+    offset = 0
+    for data, target in loader:
+        if images is None:
+            images = torch.empty((len(dataset), *data.shape[1:]), dtype=data.dtype)
+        images[offset:offset + len(data)] = data
+        labels[offset:offset + len(data)] = target
+        offset += len(data)
+    return images.share_memory_(), labels.share_memory_()
+
+
+def list_checkpoints(s3, bucket: str, prefix: str = 'checkpoints/') -> List[Tuple[int, str]]:
+    """``(epoch, key)`` of every ``epoch_N.pt`` checkpoint, oldest first."""
+    checkpoints = []
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            match = CHECKPOINT_PATTERN.search(obj['Key'])
+            if match:
+                checkpoints.append((int(match.group(1)), obj['Key']))
+    return sorted(checkpoints)
+
+
+def unwrap_state_dict(state: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+    """Strip the prefixes DDP-wrapped or compiled models add to their keys."""
+    consume_prefix_in_state_dict_if_present(state, 'module.')
+    consume_prefix_in_state_dict_if_present(state, '_orig_mod.')
+    return state
+
+
+# Per-process evaluation state, set up once by _init_worker
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(images: torch.Tensor, labels: torch.Tensor, model_name: str,
+                 num_classes: int, threads: int, counter) -> None:
+    torch.set_num_threads(threads)
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if torch.cuda.is_available():
+        device = torch.device(f'cuda:{index % torch.cuda.device_count()}')
+    else:
+        device = torch.device('cpu')
+    model = create_model(model_name, num_classes=num_classes).to(device).eval()
+    _worker.update(images=images, labels=labels, model=model, device=device)
+
+
+def _evaluate(path: str, batch_size: int) -> Tuple[float, float, float]:
+    start = time.perf_counter()
+    images, labels = _worker['images'], _worker['labels']
+    model, device = _worker['model'], _worker['device']
+
+    state = torch.load(path, map_location='cpu')['model_state_dict']
+    model.load_state_dict(unwrap_state_dict(state))
+
+    loss = 0.0
+    correct = 0
+    with torch.inference_mode():
+        for i in range(0, len(labels), batch_size):
+            data = images[i:i + batch_size].to(device, non_blocking=True)
+            if data.dtype == torch.uint8:
+                data = normalize_images(data)
+            target = labels[i:i + batch_size].to(device, non_blocking=True)
+            output = model(data)
+            loss += F.cross_entropy(output, target, reduction='sum').item()
+            correct += output.argmax(1).eq(target).sum().item()
+    total = len(labels)
+    return loss / total, 100. * correct / total, time.perf_counter() - start
+
+
+def evaluate_checkpoints(s3, bucket: str, checkpoints: List[Tuple[int, str]],
+                         images: torch.Tensor, labels: torch.Tensor,
+                         model_name: str, num_classes: int,
+                         workers: Optional[int] = None,
+                         batch_size: int = 256,
+                         download_workers: int = 4,
+                         tmp_dir: Optional[str] = None) -> List[CheckpointResult]:
+    """Evaluate many checkpoints concurrently; returns them best first.
+
+    Each pool process builds the model once and reuses it for every
+    checkpoint it is handed. Downloads stream in on a thread pool while
+    earlier checkpoints are evaluated; at most ``workers + download_workers``
+    checkpoint files sit on local disk at any time.
+    """
+    if workers is None:
+        workers = torch.cuda.device_count() or max(1, (os.cpu_count() or 1) // 4)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    tmp_dir = tmp_dir or tempfile.mkdtemp(prefix='eval_')
+    slots = threading.BoundedSemaphore(workers + download_workers)
+
+    def download(key: str) -> str:
+        slots.acquire()
+        path = os.path.join(tmp_dir, key.replace('/', '_'))
+        try:
+            s3.download_file(bucket, key, path)
+        except Exception:
+            slots.release()
+            raise
+        return path
+
+    def cleanup(path: str):
+        def done(_) -> None:
+            if os.path.exists(path):
+                os.remove(path)
+            slots.release()
+        return done
+
+    ctx = mp.get_context('spawn')
+    results = []
+    with ThreadPoolExecutor(max_workers=download_workers) as downloads, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                initargs=(images, labels, model_name, num_classes, threads,
+                                          ctx.Value('i', 0))) as pool:
+        pending = {downloads.submit(download, key): (epoch, key) for epoch, key in checkpoints}
+        evaluations = {}
+        for future in as_completed(pending):
+            epoch, key = pending[future]
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"Error downloading {key}: {e}")
+                continue
+            evaluation = pool.submit(_evaluate, path, batch_size)
+            evaluation.add_done_callback(cleanup(path))
+            evaluations[evaluation] = (epoch, key)
+
+        for future in as_completed(evaluations):
+            epoch, key = evaluations[future]
+            try:
+                loss, accuracy, seconds = future.result()
+            except Exception as e:
+                print(f"Error evaluating {key}: {e}")
+                continue
+            print(f"{key}: loss {loss:.4f}, accuracy {accuracy:.2f}% ({seconds:.1f}s)")
+            results.append(CheckpointResult(key, epoch, loss, accuracy, seconds))
+
+    return rank_results(results)
+
+
+def rank_results(results: List[CheckpointResult]) -> List[CheckpointResult]:
+    """Highest accuracy first; lower loss, then later epoch, break ties."""
+    return sorted(results, key=lambda r: (-r.accuracy, r.loss, -r.epoch))
+
+
+def write_results(results: List[CheckpointResult], path: str) -> None:
+    """Write the ranked results as CSV, one row per checkpoint."""
+    with open(path, 'w', newline='') as f:
+        fieldnames = ['rank', *asdict(results[0])] if results else ['rank']
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for rank, result in enumerate(results, 1):
+            writer.writerow({'rank': rank, **asdict(result)})
+
+
+def prune_checkpoints(s3, bucket: str, results: List[CheckpointResult],
+                      keep_top_k: int) -> List[str]:
+    """Delete every ranked checkpoint outside the best ``keep_top_k``.
+
+    Keys that fail transiently (``SlowDown``) are retried; the keys that
+    still could not be deleted are reported and left out of the returned
+    list of deleted keys.
+    """
+    doomed = [r.key for r in results[keep_top_k:]]
+    failed = set()
+    for i in range(0, len(doomed), DELETE_BATCH_SIZE):
+        _, errors = delete_batch(s3, bucket, [{'Key': key}
+                                              for key in doomed[i:i + DELETE_BATCH_SIZE]])
+        for error in errors:
+            print(f"Could not delete s3://{bucket}/{error['Key']}: "
+                  f"{error.get('Code')} {error.get('Message', '')}".rstrip())
+            failed.add(error['Key'])
+    return [key for key in doomed if key not in failed]
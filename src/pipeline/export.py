@@ -0,0 +1,253 @@
+import copy
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import Iterable, List, Optional, Tuple
+
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+from src.models.resnet import create_model
+from src.pipeline.evaluation import unwrap_state_dict
+
+EXPORT_FORMATS = ('torchscript', 'onnx')
+QUANTIZATION_MODES = ('dynamic', 'static')
+
+Batch = Tuple[torch.Tensor, torch.Tensor]
+
+
+@dataclass
+class ExportReport:
+    path: str
+    format: str
+    quantization: Optional[str]
+    fp32_accuracy: float
+    accuracy: float
+    fp32_seconds: float
+    seconds: float
+    size_mb: float
+
+    @property
+    def accuracy_delta(self) -> float:
+        return self.accuracy - self.fp32_accuracy
+
+    @property
+    def speedup(self) -> float:
+        return self.fp32_seconds / self.seconds if self.seconds > 0 else 0.0
+
+
+class ExportedModel(torch.nn.Module):
+    """A TorchScript or ONNX artifact behind the ordinary module interface.
+
+    The artifact runs on CPU and its outputs are returned on the input's
+    device, so it can be passed straight to ``DistributedTrainer.validate``.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.session = None
+        self.module = None
+        if path.endswith('.onnx'):
+            ort = _import_onnxruntime()
+            self.session = ort.InferenceSession(path, providers=['CPUExecutionProvider'])
+            self.input_name = self.session.get_inputs()[0].name
+        else:
+            self.module = torch.jit.load(path, map_location='cpu')
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        device = x.device
+        x = x.cpu()
+        if self.session is not None:
+            output = self.session.run(None, {self.input_name: x.contiguous().numpy()})[0]
+            return torch.from_numpy(output).to(device)
+        return self.module(x).to(device)
+
+
+def load_exported(path: str) -> ExportedModel:
+    return ExportedModel(path)
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("ONNX export needs onnx and onnxruntime: "
+                          "pip install onnx onnxruntime") from e
+    return onnxruntime
+
+
+def load_model_from_checkpoint(path: str, model_name: str, num_classes: int) -> torch.nn.Module:
+    """Eager fp32 model in eval mode from a ``save_checkpoint`` file."""
+    model = create_model(model_name, num_classes=num_classes)
+    checkpoint = torch.load(path, map_location='cpu')
+    model.load_state_dict(unwrap_state_dict(checkpoint['model_state_dict']))
+    return model.eval()
+
+
+def quantize_static(model: torch.nn.Module, calibration: Iterable[Batch]) -> torch.nn.Module:
+    """Post-training static int8 quantization of convs, linears and activations.
+
+    Uses FX graph mode, which fuses conv+bn+relu and inserts observers without
+    changes to the model code; activation ranges come from ``calibration``.
+    """
+    batches = list(calibration)
+    example = batches[0][0][:1]
+    qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    prepared = prepare_fx(copy.deepcopy(model).eval(), qconfig_mapping, (example,))
+    with torch.no_grad():
+        for data, _ in batches:
+            prepared(data)
+    return convert_fx(prepared)
+
+
+def _trace(model: torch.nn.Module, example: torch.Tensor) -> torch.jit.ScriptModule:
+    with torch.no_grad():
+        return torch.jit.freeze(torch.jit.trace(model, example).eval())
+
+
+def export_torchscript(model: torch.nn.Module, path: str, example: torch.Tensor,
+                       quantization: Optional[str] = None,
+                       calibration: Optional[List[Batch]] = None) -> None:
+    """Write a frozen TorchScript module, optionally int8-quantized."""
+    if quantization == 'dynamic':
+        # Only Linear layers have dynamic int8 kernels; convs stay fp32
+        model = quantize_dynamic(copy.deepcopy(model), {torch.nn.Linear}, dtype=torch.qint8)
+    elif quantization == 'static':
+        model = quantize_static(model, calibration)
+    elif hasattr(model, 'fuse'):
+        model = copy.deepcopy(model).fuse()
+    torch.jit.save(_trace(model, example), path)
+
+
+class _CalibrationReader:
+    """onnxruntime CalibrationDataReader over validation batches."""
+
+    def __init__(self, batches: List[Batch], input_name: str):
+        self.batches = iter(batches)
+        self.input_name = input_name
+
+    def get_next(self):
+        batch = next(self.batches, None)
+        return None if batch is None else {self.input_name: batch[0].numpy()}
+
+
+def export_onnx(model: torch.nn.Module, path: str, example: torch.Tensor,
+                quantization: Optional[str] = None,
+                calibration: Optional[List[Batch]] = None) -> None:
+    """Write an ONNX graph with a dynamic batch dimension.
+
+    int8 quantization is applied to the exported graph with onnxruntime
+    (QDQ format for static quantization).
+    """
+    if hasattr(model, 'fuse'):
+        model = copy.deepcopy(model).fuse()
+    fp32_path = path
+    if quantization is not None:
+        fp32_path = os.path.join(tempfile.mkdtemp(prefix='export_'), 'model_fp32.onnx')
+    torch.onnx.export(
+        model, (example,), fp32_path,
+        input_names=['input'], output_names=['logits'],
+        dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}},
+        opset_version=17
+    )
+    if quantization is None:
+        return
+
+    _import_onnxruntime()
+    from onnxruntime.quantization import QuantFormat, QuantType
+    from onnxruntime.quantization import quantize_dynamic as ort_quantize_dynamic
+    from onnxruntime.quantization import quantize_static as ort_quantize_static
+    if quantization == 'dynamic':
+        ort_quantize_dynamic(fp32_path, path, weight_type=QuantType.QInt8)
+    else:
+        ort_quantize_static(fp32_path, path, _CalibrationReader(calibration, 'input'),
+                            quant_format=QuantFormat.QDQ,
+                            activation_type=QuantType.QUInt8,
+                            weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+
+def _compare(baseline: torch.nn.Module, exported: torch.nn.Module,
+             batches: Iterable[Batch]) -> Tuple[float, float, float, float]:
+    """Accuracy and model seconds of both models, in one pass over ``batches``.
+
+    Batches are consumed one at a time and only model execution is timed,
+    so decoding is neither held in memory nor measured.
+    """
+    correct = [0, 0]
+    seconds = [0.0, 0.0]
+    total = 0
+    warmed_up = False
+    with torch.inference_mode():
+        for data, target in batches:
+            if not warmed_up:
+                # One untimed pass each so lazy initialisation is not measured
+                baseline(data)
+                exported(data)
+                warmed_up = True
+            for i, model in enumerate((baseline, exported)):
+                start = time.perf_counter()
+                output = model(data)
+                seconds[i] += time.perf_counter() - start
+                correct[i] += output.argmax(1).eq(target).sum().item()
+            total += len(target)
+    if total == 0:
+        raise ValueError("No validation batches left to compare on")
+    return 100. * correct[0] / total, seconds[0], 100. * correct[1] / total, seconds[1]
+
+
+def export_model(model: torch.nn.Module, path: str, val_loader: Iterable[Batch],
+                 format: str = 'torchscript',
+                 quantization: Optional[str] = None,
+                 calibration_batches: int = 10,
+                 eval_batches: Optional[int] = None,
+                 calibration_loader: Optional[Iterable[Batch]] = None) -> ExportReport:
+    """Export an eager fp32 model and compare the artifact against it.
+
+    Both models run on every batch of ``val_loader`` (the first
+    ``eval_batches`` if given) as it is loaded, and only model execution is
+    timed. Static quantization calibrates on the first
+    ``calibration_batches`` of ``calibration_loader``, or else of
+    ``val_loader``, in which case those batches are left out of the
+    comparison.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {format}")
+    if quantization is not None and quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {quantization}")
+
+    model = model.cpu().eval()
+    batches = iter(val_loader)
+    calibration = None
+    if quantization == 'static':
+        calibration = list(islice(iter(calibration_loader or batches), calibration_batches))
+        if not calibration:
+            raise ValueError("No calibration batches")
+        example = calibration[0][0][:1]
+    else:
+        first = next(batches, None)
+        if first is None:
+            raise ValueError("The validation loader is empty")
+        example = first[0][:1]
+        batches = chain([first], batches)
+
+    exporter = export_onnx if format == 'onnx' else export_torchscript
+    exporter(model, path, example, quantization=quantization, calibration=calibration)
+
+    fp32_accuracy, fp32_seconds, accuracy, seconds = _compare(
+        model, load_exported(path), islice(batches, eval_batches))
+
+    return ExportReport(
+        path=path,
+        format=format,
+        quantization=quantization,
+        fp32_accuracy=fp32_accuracy,
+        accuracy=accuracy,
+        fp32_seconds=fp32_seconds,
+        seconds=seconds,
+        size_mb=os.path.getsize(path) / 2**20
+    )
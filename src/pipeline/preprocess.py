@@ -0,0 +1,320 @@
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+from PIL import Image
+
+from src.utils.lazy import get_client
+
+QUEUE_NAME = 'training-jobs-queue'
+
+# SendMessageBatch limits: entries per call, and bytes of all bodies together
+# (also the most a single message may hold)
+SQS_BATCH_ENTRIES = 10
+SQS_BATCH_BYTES = 256 * 1024
+
+
+@dataclass
+class Message:
+    body: Dict[str, Any]
+    receipt: str
+
+
+class SQSQueue:
+    """Work queue backed by SQS (by default the ``training-jobs-queue``)."""
+
+    def __init__(self, queue_url: Optional[str] = None, sqs=None):
+        self.sqs = sqs or get_client('sqs')
+        self.queue_url = queue_url or self.sqs.get_queue_url(QueueName=QUEUE_NAME)['QueueUrl']
+
+    def send(self, bodies: List[Dict[str, Any]]) -> None:
+        """Enqueue ``bodies`` in as few batches as SQS's count and size limits allow."""
+        batch, batch_bytes = [], 0
+        for body in bodies:
+            message = json.dumps(body)
+            size = len(message.encode())
+            if size > SQS_BATCH_BYTES:
+                raise ValueError(f"Work item {body.get('shard')} is {size} bytes; "
+                                 f"SQS messages are limited to {SQS_BATCH_BYTES}")
+            if len(batch) == SQS_BATCH_ENTRIES or batch_bytes + size > SQS_BATCH_BYTES:
+                self._send_batch(batch)
+                batch, batch_bytes = [], 0
+            batch.append(message)
+            batch_bytes += size
+        if batch:
+            self._send_batch(batch)
+
+    def _send_batch(self, messages: List[str]) -> None:
+        entries = [{'Id': str(n), 'MessageBody': message} for n, message in enumerate(messages)]
+        response = self.sqs.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+        if response.get('Failed'):
+            raise RuntimeError(f"Failed to enqueue: {response['Failed']}")
+
+    def receive(self, visibility_timeout: int, wait_time: float = 20) -> Optional[Message]:
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=1,
+            WaitTimeSeconds=int(min(wait_time, 20)),
+            VisibilityTimeout=visibility_timeout
+        )
+        messages = response.get('Messages', [])
+        if not messages:
+            return None
+        return Message(body=json.loads(messages[0]['Body']),
+                       receipt=messages[0]['ReceiptHandle'])
+
+    def extend(self, message: Message, visibility_timeout: int) -> None:
+        self.sqs.change_message_visibility(
+            QueueUrl=self.queue_url,
+            ReceiptHandle=message.receipt,
+            VisibilityTimeout=visibility_timeout
+        )
+
+    def delete(self, message: Message) -> None:
+        self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message.receipt)
+
+
+class FileQueue:
+    """Directory-backed queue with SQS-style visibility timeouts.
+
+    Stands in for SQS in tests and single-node runs; any number of threads or
+    processes can share one directory. A message is claimed by atomically
+    renaming it from ``ready/`` into ``inflight/`` under a name that carries
+    its lease expiry, so a lease is extended by renaming again and an expired
+    message is moved back to ``ready/`` by whichever receiver sees it first.
+    """
+
+    def __init__(self, directory: str):
+        self.ready_dir = os.path.join(directory, 'ready')
+        self.inflight_dir = os.path.join(directory, 'inflight')
+        os.makedirs(self.ready_dir, exist_ok=True)
+        os.makedirs(self.inflight_dir, exist_ok=True)
+
+    def send(self, bodies: List[Dict[str, Any]]) -> None:
+        for body in bodies:
+            name = f"{time.time_ns()}-{uuid.uuid4().hex}.json"
+            tmp = os.path.join(self.ready_dir, f".{name}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(body, f)
+            os.replace(tmp, os.path.join(self.ready_dir, name))
+
+    @staticmethod
+    def _lease_name(name: str, visibility_timeout: float) -> str:
+        return f"{time.time() + visibility_timeout:.3f}__{name}"
+
+    def _requeue_expired(self) -> None:
+        now = time.time()
+        for leased in os.listdir(self.inflight_dir):
+            expiry, name = leased.split('__', 1)
+            if float(expiry) < now:
+                try:
+                    os.rename(os.path.join(self.inflight_dir, leased),
+                              os.path.join(self.ready_dir, name))
+                except FileNotFoundError:
+                    pass  # extended, deleted or requeued concurrently
+
+    def receive(self, visibility_timeout: int, wait_time: float = 0) -> Optional[Message]:
+        deadline = time.monotonic() + wait_time
+        while True:
+            self._requeue_expired()
+            for name in sorted(n for n in os.listdir(self.ready_dir) if n.endswith('.json')):
+                leased = self._lease_name(name, visibility_timeout)
+                try:
+                    os.rename(os.path.join(self.ready_dir, name),
+                              os.path.join(self.inflight_dir, leased))
+                except FileNotFoundError:
+                    continue  # claimed by another worker
+                with open(os.path.join(self.inflight_dir, leased)) as f:
+                    return Message(body=json.load(f), receipt=leased)
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.1)
+
+    def extend(self, message: Message, visibility_timeout: int) -> None:
+        leased = self._lease_name(message.receipt.split('__', 1)[1], visibility_timeout)
+        # Raises FileNotFoundError if the lease already expired and was lost
+        os.rename(os.path.join(self.inflight_dir, message.receipt),
+                  os.path.join(self.inflight_dir, leased))
+        message.receipt = leased
+
+    def delete(self, message: Message) -> None:
+        os.remove(os.path.join(self.inflight_dir, message.receipt))
+
+
+def _label_from_key(key: str) -> int:
+    """Same ``.../class_N/file`` convention as ``S3Dataset._get_label``."""
+    try:
+        return int(key.split('/')[-2].split('_')[-1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def enqueue_shards(queue, s3, bucket: str, prefix: str, shard_size: int = 1000,
+                   split: Optional[str] = None) -> int:
+    """List ``prefix`` and enqueue one work item per ``shard_size`` keys.
+
+    Keys are sorted before chunking, so re-enqueueing the same prefix yields
+    the same shard IDs and a shard that is already written is skipped.
+    """
+    split = split or prefix.strip('/').split('/')[-1]
+    keys = []
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        keys.extend(obj['Key'] for obj in page.get('Contents', [])
+                    if not obj['Key'].endswith('/'))
+    keys.sort()
+    items = [{'shard': f"{split}-{i // shard_size:06d}", 'keys': keys[i:i + shard_size]}
+             for i in range(0, len(keys), shard_size)]
+    queue.send(items)
+    print(f"Enqueued {len(items)} shards of up to {shard_size} samples from s3://{bucket}/{prefix}")
+    return len(items)
+
+
+class _Heartbeat(threading.Thread):
+    """Keep a message invisible to other workers while it is processed."""
+
+    def __init__(self, queue, message: Message, visibility_timeout: int, interval: float):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.message = message
+        self.visibility_timeout = visibility_timeout
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.queue.extend(self.message, self.visibility_timeout)
+            except Exception as e:
+                print(f"Heartbeat failed for {self.message.body.get('shard')}: {e}")
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+class PreprocessWorker:
+    """Turn queued shard work items into packed, resized training shards.
+
+    Each item names a shard and its source keys. The worker downloads and
+    decodes the images, resizes the shorter side to ``image_size`` and writes
+    a tar of ``NNNNNN.jpg``/``NNNNNN.cls`` pairs to
+    ``<output_prefix><shard>.tar`` in a single put. Output keys are
+    deterministic and shards that already exist are skipped, so redelivered
+    messages are harmless. Run as many workers as needed, on any node.
+    """
+
+    def __init__(self, queue, s3, source_bucket: str, output_bucket: str,
+                 output_prefix: str = 'shards/',
+                 image_size: int = 256,
+                 quality: int = 90,
+                 visibility_timeout: int = 300,
+                 heartbeat_interval: Optional[float] = None,
+                 download_workers: int = 16):
+        self.queue = queue
+        self.s3 = s3
+        self.source_bucket = source_bucket
+        self.output_bucket = output_bucket
+        self.output_prefix = output_prefix
+        self.image_size = image_size
+        self.quality = quality
+        self.visibility_timeout = visibility_timeout
+        self.heartbeat_interval = heartbeat_interval or visibility_timeout / 3
+        self.download_workers = download_workers
+
+    def shard_key(self, shard: str) -> str:
+        return f"{self.output_prefix}{shard}.tar"
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.output_bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def _load(self, key: str) -> Optional[bytes]:
+        """Download, decode, resize and re-encode one sample."""
+        try:
+            data = self.s3.get_object(Bucket=self.source_bucket, Key=key)['Body'].read()
+            image = Image.open(io.BytesIO(data))
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            width, height = image.size
+            scale = self.image_size / min(width, height)
+            image = image.resize((max(1, round(width * scale)), max(1, round(height * scale))),
+                                 Image.BILINEAR)
+            out = io.BytesIO()
+            image.save(out, format='JPEG', quality=self.quality)
+            return out.getvalue()
+        except Exception as e:
+            print(f"Skipping {key}: {e}")
+            return None
+
+    def process(self, item: Dict[str, Any]) -> Tuple[str, int]:
+        """Build one shard; returns its key and the number of samples written."""
+        key = self.shard_key(item['shard'])
+        if self._exists(key):
+            print(f"{item['shard']}: already written, skipping")
+            return key, 0
+
+        with ThreadPoolExecutor(max_workers=self.download_workers) as pool:
+            samples = list(pool.map(self._load, item['keys']))
+
+        buffer = io.BytesIO()
+        written = 0
+        with tarfile.open(fileobj=buffer, mode='w') as tar:
+            for source_key, sample in zip(item['keys'], samples):
+                if sample is None:
+                    continue
+                label = str(_label_from_key(source_key)).encode()
+                for suffix, payload in (('jpg', sample), ('cls', label)):
+                    info = tarfile.TarInfo(f"{written:06d}.{suffix}")
+                    info.size = len(payload)
+                    tar.addfile(info, io.BytesIO(payload))
+                written += 1
+
+        self.s3.put_object(Bucket=self.output_bucket, Key=key, Body=buffer.getvalue(),
+                           Metadata={'samples': str(written)})
+        return key, written
+
+    def run(self, max_messages: Optional[int] = None, idle_timeout: Optional[float] = None) -> int:
+        """Process messages until ``max_messages`` or the queue stays empty.
+
+        A failed item is left on the queue; it becomes visible again when its
+        visibility timeout lapses and is retried (or dead-lettered by SQS).
+        """
+        processed = 0
+        idle_since = time.monotonic()
+        while max_messages is None or processed < max_messages:
+            message = self.queue.receive(self.visibility_timeout, wait_time=1)
+            if message is None:
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                continue
+
+            heartbeat = _Heartbeat(self.queue, message, self.visibility_timeout,
+                                   self.heartbeat_interval)
+            heartbeat.start()
+            start = time.perf_counter()
+            try:
+                key, written = self.process(message.body)
+            except Exception as e:
+                print(f"{message.body.get('shard')}: failed, leaving for retry: {e}")
+                continue
+            finally:
+                heartbeat.stop()
+            self.queue.delete(message)
+            processed += 1
+            idle_since = time.monotonic()
+            print(f"{message.body['shard']}: {written} samples -> {key} "
+                  f"in {time.perf_counter() - start:.1f}s")
+        return processed
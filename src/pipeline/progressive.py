@@ -0,0 +1,40 @@
+from typing import Any, Dict, Optional
+
+
+class ResolutionSchedule:
+    """Training image resolution per epoch for progressive resizing.
+
+    ``stages`` maps the first epoch of each stage to its resolution, e.g.
+    ``{0: 128, 4: 160, 8: 224}``; epochs before the first stage use it too.
+    The resolution of the last stage is the target the base batch size was
+    chosen for, so with batch scaling lower resolutions get proportionally
+    larger batches (pixels per batch, and so activation memory, stay about
+    constant).
+    """
+
+    def __init__(self, stages: Dict[int, int], multiple: int = 8):
+        if not stages:
+            raise ValueError("A resolution schedule needs at least one stage")
+        self.stages = sorted((int(epoch), int(resolution)) for epoch, resolution in stages.items())
+        self.target = self.stages[-1][1]
+        self.multiple = multiple
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['ResolutionSchedule']:
+        stages = config.get('resolution_schedule')
+        return cls(stages) if stages else None
+
+    def resolution(self, epoch: int) -> int:
+        resolution = self.stages[0][1]
+        for start, stage_resolution in self.stages:
+            if epoch >= start:
+                resolution = stage_resolution
+        return resolution
+
+    def batch_size(self, epoch: int, base_batch_size: int) -> int:
+        """``base_batch_size`` scaled by the pixel ratio to the target resolution.
+
+        Rounded down to a multiple of ``multiple`` and never below the base.
+        """
+        scaled = int(base_batch_size * (self.target / self.resolution(epoch)) ** 2)
+        return max(base_batch_size, scaled // self.multiple * self.multiple)
@@ -0,0 +1,142 @@
+import collections
+import math
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import torch
+import torch.distributed as dist
+from torch.utils.data import BatchSampler, Dataset, Sampler
+
+from src.pipeline.elastic import ElasticDistributedSampler
+
+
+class SampleLossTracker:
+    """Latest training loss of every sample, indexed like the dataset.
+
+    For ``S3Dataset`` the index is the position in ``image_list``. Losses are
+    one float32 per sample (NaN until a sample is first seen) and stay on
+    ``device``, so recording them does not synchronise with the host. Each
+    rank records the samples it trained on; ``merge`` combines them at the
+    end of an epoch so every rank holds the same array.
+    """
+
+    def __init__(self, num_samples: int, device: Union[str, torch.device] = 'cpu'):
+        self.losses = torch.full((num_samples,), math.nan, device=device)
+        self._recorded = torch.full_like(self.losses, math.nan)
+
+    def record(self, indices: torch.Tensor, losses: torch.Tensor) -> None:
+        self._recorded[indices.to(self._recorded.device)] = losses.detach().float()
+
+    def merge(self, distributed: bool = False) -> None:
+        """Fold this epoch's losses from all ranks into ``losses``.
+
+        Collective when ``distributed``. Samples seen by several ranks (the
+        sampler pads the last batches) are averaged.
+        """
+        seen = ~torch.isnan(self._recorded)
+        values = torch.where(seen, self._recorded, torch.zeros_like(self._recorded))
+        counts = seen.float()
+        if distributed:
+            dist.all_reduce(values)
+            dist.all_reduce(counts)
+        merged = counts > 0
+        self.losses[merged] = values[merged] / counts[merged]
+        self._recorded.fill_(math.nan)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {'losses': self.losses.cpu()}
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        self.losses.copy_(state['losses'])
+
+
+class LossPruningSampler(ElasticDistributedSampler):
+    """Elastic sampler that skips part of the well-learned samples each epoch.
+
+    A sample whose last loss is below the mean is kept with probability
+    ``keep_fraction``; kept ones get a loss weight of ``1 / keep_fraction``
+    so the expected gradient is unchanged. Samples not seen yet are always
+    kept. The first ``warmup_epochs`` and the last ``anneal_epochs`` of
+    ``epochs`` use the full dataset.
+
+    The kept set depends only on the merged losses, ``seed`` and the epoch,
+    so it is identical on every rank and after a restart from a snapshot.
+    """
+
+    def __init__(self, dataset: Dataset, tracker: SampleLossTracker,
+                 keep_fraction: float, epochs: int,
+                 warmup_epochs: int = 1, anneal_epochs: int = 1,
+                 num_replicas: Optional[int] = None, rank: Optional[int] = None,
+                 seed: int = 0):
+        if not 0 < keep_fraction <= 1:
+            raise ValueError(f"keep_fraction must be in (0, 1], got {keep_fraction}")
+        super().__init__(dataset, num_replicas=num_replicas, rank=rank, seed=seed)
+        self.tracker = tracker
+        self.keep_fraction = keep_fraction
+        self.epochs = epochs
+        self.warmup_epochs = warmup_epochs
+        self.anneal_epochs = anneal_epochs
+        self._kept: Optional[torch.Tensor] = None
+        self.weights = torch.ones(len(dataset))
+
+    def set_epoch(self, epoch: int) -> None:
+        super().set_epoch(epoch)
+        self._kept = None
+
+    def prunes(self) -> bool:
+        return (self.keep_fraction < 1
+                and self.warmup_epochs <= self.epoch < self.epochs - self.anneal_epochs)
+
+    def _plan(self) -> torch.Tensor:
+        """Indices kept this epoch, in dataset order; also sets ``weights``."""
+        if self._kept is not None:
+            return self._kept
+        num_samples = len(self.dataset)
+        self.weights = torch.ones(num_samples)
+        if not self.prunes():
+            self._kept = torch.arange(num_samples)
+            return self._kept
+
+        losses = self.tracker.losses.cpu()
+        seen = ~torch.isnan(losses)
+        easy = torch.zeros(num_samples, dtype=torch.bool)
+        if seen.any():
+            easy = seen & (losses < losses[seen].mean())
+        g = torch.Generator()
+        g.manual_seed(self.seed + self.epoch + 1_000_003)  # independent of the shuffle
+        keep_easy = torch.rand(num_samples, generator=g) < self.keep_fraction
+        self.weights[easy & keep_easy] = 1 / self.keep_fraction
+        self._kept = torch.nonzero(~easy | keep_easy).flatten()
+        return self._kept
+
+    def _epoch_size(self) -> int:
+        return len(self._plan())
+
+    def _epoch_indices(self) -> List[int]:
+        kept = self._plan()
+        if not self.shuffle:
+            return kept.tolist()
+        g = torch.Generator()
+        g.manual_seed(self.seed + self.epoch)
+        return kept[torch.randperm(len(kept), generator=g)].tolist()
+
+
+class RecordingBatchSampler(BatchSampler):
+    """BatchSampler that remembers the indices of batches not yet consumed.
+
+    Batches are produced in the main process and, with the default in-order
+    DataLoader, consumed in the same order, so ``pop`` returns the indices of
+    the batch just received even while workers prefetch ahead.
+    """
+
+    def __init__(self, sampler: Sampler, batch_size: int, drop_last: bool = False):
+        super().__init__(sampler, batch_size, drop_last)
+        self.pending = collections.deque()
+
+    def __iter__(self) -> Iterator[List[int]]:
+        self.pending.clear()
+        for batch in super().__iter__():
+            self.pending.append(batch)
+            yield batch
+
+    def pop(self) -> List[int]:
+        return self.pending.popleft()
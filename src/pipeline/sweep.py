@@ -0,0 +1,250 @@
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional
+
+import torch
+import torch.multiprocessing as mp
+from torch.utils.data import DataLoader, TensorDataset
+
+from src.pipeline.config import TrainingConfig
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.evaluation import load_val_set
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.sample_cache import SampleCache, SampleCacheServer
+from src.utils.storage import storage_from_config, storage_url
+
+DISTRIBUTIONS = ('uniform', 'log_uniform')
+
+
+def _check_space(space: Dict[str, Any]) -> None:
+    unknown = set(space) - {f.name for f in fields(TrainingConfig)}
+    if unknown:
+        raise ValueError(f"Not TrainingConfig fields: {sorted(unknown)}")
+    for name, spec in space.items():
+        if isinstance(spec, dict) and (len(spec) != 1 or next(iter(spec)) not in DISTRIBUTIONS):
+            raise ValueError(f"{name}: expected one of {DISTRIBUTIONS} with [low, high], "
+                             f"got {spec}")
+
+
+def _sample(spec: Any, rng: random.Random) -> Any:
+    if isinstance(spec, list):
+        return rng.choice(spec)
+    if isinstance(spec, dict):
+        (kind, (low, high)), = spec.items()
+        if kind == 'log_uniform':
+            return math.exp(rng.uniform(math.log(low), math.log(high)))
+        return rng.uniform(low, high)
+    return spec
+
+
+def sample_trials(space: Dict[str, Any], num_trials: Optional[int] = None,
+                  seed: int = 0) -> List[Dict[str, Any]]:
+    """Overrides of TrainingConfig fields, one dict per trial.
+
+    A list in ``space`` is a set of choices, ``{'uniform': [low, high]}`` or
+    ``{'log_uniform': [low, high]}`` a distribution and anything else a fixed
+    value. Without ``num_trials`` the full grid of choices is returned;
+    otherwise ``num_trials`` random draws.
+    """
+    _check_space(space)
+    if num_trials is None:
+        if any(isinstance(spec, dict) for spec in space.values()):
+            raise ValueError("num_trials is required to sample from distributions")
+        names = list(space)
+        values = [spec if isinstance(spec, list) else [spec] for spec in space.values()]
+        return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+    rng = random.Random(seed)
+    return [{name: _sample(spec, rng) for name, spec in space.items()}
+            for _ in range(num_trials)]
+
+
+def halving_rungs(min_epochs: int, max_epochs: int, eta: int = 3) -> List[int]:
+    """Epoch budgets of the successive-halving rungs, e.g. 1, 3, 9 for eta 3."""
+    if not 1 <= min_epochs <= max_epochs or eta < 2:
+        raise ValueError(f"Need 1 <= min_epochs <= max_epochs and eta >= 2, got "
+                         f"{min_epochs}, {max_epochs}, {eta}")
+    rungs = []
+    epochs = min_epochs
+    while epochs < max_epochs:
+        rungs.append(epochs)
+        epochs *= eta
+    return rungs + [max_epochs]
+
+
+@dataclass
+class TrialResult:
+    trial: int
+    params: Dict[str, Any]
+    status: str = 'pending'  # 'completed', 'stopped' by successive halving or 'failed'
+    epochs: int = 0
+    val_accuracy: Optional[float] = None
+    samples: int = 0
+    train_seconds: float = 0.0
+    samples_per_s: float = 0.0
+    error: Optional[str] = None
+
+
+def rank_trials(results: List[TrialResult]) -> List[TrialResult]:
+    """Longest-trained first, then by validation accuracy."""
+    return sorted(results, key=lambda r: (-r.epochs, -(r.val_accuracy or 0.0), r.trial))
+
+
+def write_results(results: List[TrialResult], path: str, wall_seconds: float) -> None:
+    """Write the ranked trials and the sweep's wall-clock time as JSON."""
+    with open(path, 'w') as f:
+        json.dump({'wall_seconds': wall_seconds,
+                   'trials': [asdict(result) for result in results]}, f, indent=2)
+
+
+# Per-process trial state, set up once by _init_trial_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_trial_worker(train_list, images: torch.Tensor, labels: torch.Tensor,
+                       parallel: int, counter) -> None:
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    # Lets cpu_affinity split the node's cores between concurrent trials
+    os.environ['LOCAL_RANK'] = str(slot)
+    os.environ['LOCAL_WORLD_SIZE'] = str(parallel)
+    if torch.cuda.is_available():
+        torch.cuda.set_device(slot % torch.cuda.device_count())
+    else:
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // parallel))
+    _worker.update(train_list=train_list, images=images, labels=labels)
+
+
+def _run_trial(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Train up to ``config['epochs']``, resuming from the trial's snapshot."""
+    train_dataset = S3Dataset(config.get('data_bucket'), prefix='train/',
+                              storage=storage_from_config(config, 'data'),
+                              image_list=_worker['train_list'])
+    val_loader = DataLoader(TensorDataset(_worker['images'], _worker['labels']),
+                            batch_size=config.get('batch_size', 32))
+    torch.manual_seed(config.get('seed', 0))
+    trainer = DistributedTrainer(config, distributed=False)
+    model = trainer.build_model()
+    trainer.fit(model, trainer.create_optimizer(model), torch.nn.CrossEntropyLoss(),
+                train_dataset, val_loader)
+    return trainer.history
+
+
+def run_sweep(config: Dict[str, Any], trials: List[Dict[str, Any]],
+              min_epochs: int = 1, max_epochs: Optional[int] = None, eta: int = 3,
+              parallel: Optional[int] = None, cache_memory: int = 8 * 2**30,
+              work_dir: Optional[str] = None) -> List[TrialResult]:
+    """Train ``trials`` (overrides of ``config``) side by side on this node.
+
+    Up to ``parallel`` trials run at once in a process pool. The training
+    set is listed once and read through one sample cache of decoded images
+    (the node's daemon if ``data_cache_socket`` is set, otherwise one started
+    here), and the validation set is decoded once into shared memory, so
+    trials share every download and decode. Successive halving trains all
+    trials for ``min_epochs``, keeps the best ``1 / eta`` by validation
+    accuracy, and continues them from their snapshots up to ``max_epochs``.
+
+    Trials keep only local snapshots under ``work_dir``; nothing is uploaded
+    to checkpoint storage. A trial that raises, or whose worker process dies,
+    is marked 'failed' and the others carry on (in a new pool if a worker
+    died). Returns the trials ranked by ``rank_trials``.
+    """
+    max_epochs = max_epochs or config.get('epochs', 1)
+    rungs = halving_rungs(min_epochs, max_epochs, eta)
+    if parallel is None:
+        parallel = torch.cuda.device_count() or max(1, (os.cpu_count() or 1) // 4)
+    parallel = max(1, min(parallel, len(trials)))
+    work_dir = work_dir or tempfile.mkdtemp(prefix='sweep_')
+
+    storage = storage_from_config(config, 'data')
+    train_list = S3Dataset(config.get('data_bucket'), prefix='train/', storage=storage).image_list
+    images, labels = load_val_set(S3Dataset(config.get('data_bucket'), prefix='val/',
+                                            storage=storage, normalize=False),
+                                  num_workers=config.get('num_workers', 0))
+    print(f"Listed {len(train_list)} training samples, decoded {len(labels)} validation samples")
+
+    server = None
+    socket_path = config.get('data_cache_socket')
+    if not socket_path:
+        server = SampleCacheServer(os.path.join(work_dir, 'cache.sock'),
+                                   SampleCache(cache_memory, [storage_url(config, 'data')]))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        socket_path = server.server_address
+    base = {**config, 'data_cache_socket': socket_path, 'data_cache_decoded': True,
+            'checkpoint_storage': None, 'checkpoint_bucket': None, 'handle_preemption': False,
+            'keep_snapshot': True}
+
+    results = [TrialResult(i, params) for i, params in enumerate(trials)]
+    alive = list(range(len(trials)))
+    ctx = mp.get_context('spawn')
+    pool = None
+    try:
+        for rung, epochs in enumerate(rungs):
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=parallel, mp_context=ctx,
+                                           initializer=_init_trial_worker,
+                                           initargs=(train_list, images, labels, parallel,
+                                                     ctx.Value('i', 0)))
+            futures = {}
+            for i in alive:
+                try:
+                    futures[pool.submit(_run_trial, {
+                        **base, **trials[i], 'epochs': epochs,
+                        'snapshot_path': os.path.join(work_dir, f'trial_{i}.pt'),
+                    })] = i
+                except BrokenProcessPool as e:
+                    # A trial submitted earlier in this rung already killed its worker
+                    results[i].status, results[i].error = 'failed', f"worker process died: {e}"
+            broken = len(futures) < len(alive)
+            for future in as_completed(futures):
+                result = results[futures[future]]
+                try:
+                    history = future.result()
+                except BrokenProcessPool as e:
+                    # Every trial still running in the pool is lost with it
+                    print(f"Trial {result.trial} failed: worker process died")
+                    result.status, result.error = 'failed', f"worker process died: {e}"
+                    broken = True
+                    continue
+                except Exception as e:
+                    print(f"Trial {result.trial} failed: {e}")
+                    result.status, result.error = 'failed', str(e)
+                    continue
+                result.epochs = epochs
+                result.val_accuracy = history[-1]['val_accuracy']
+                result.samples += sum(entry['samples'] for entry in history)
+                result.train_seconds += history[-1]['elapsed_s']
+                result.samples_per_s = result.samples / result.train_seconds
+                print(f"Trial {result.trial} {result.params}: {epochs} epochs, "
+                      f"val_acc {result.val_accuracy:.2f}, "
+                      f"{result.samples_per_s:.1f} samples/s")
+            if broken:
+                # A broken pool accepts no more work; the next rung gets a new one
+                pool.shutdown()
+                pool = None
+
+            ranked = rank_trials([results[i] for i in alive if results[i].status != 'failed'])
+            keep = len(ranked) if rung == len(rungs) - 1 else max(1, len(ranked) // eta)
+            for result in ranked[keep:]:
+                result.status = 'stopped'
+            alive = [result.trial for result in ranked[:keep]]
+            if rung < len(rungs) - 1:
+                print(f"Rung {rung} ({epochs} epochs): continuing trials {alive}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    for i in alive:
+        results[i].status = 'completed'
+    return rank_trials(results)
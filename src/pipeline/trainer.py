@@ -1,54 +1,308 @@
+import copy
 import os
+import signal
+import threading
+import time
 import torch
 import torch.distributed as dist
+from torch.nn.modules.utils import consume_prefix_in_state_dict_if_present
 from torch.nn.parallel import DistributedDataParallel
-import boto3
-from typing import Dict, Any, Tuple, List
+from torch.distributed.optim import ZeroRedundancyOptimizer
+from torch.utils.data import BatchSampler, Dataset, DataLoader
+from dataclasses import asdict
+from typing import Dict, Any, Tuple, List, Optional
+from src.models.resnet import create_model
+from src.pipeline.divergence import DivergenceGuard
+from src.pipeline.data_loader import normalize_images
+from src.pipeline.progressive import ResolutionSchedule
+from src.pipeline.pruning import LossPruningSampler, RecordingBatchSampler, SampleLossTracker
+from src.utils.affinity import (
+    CpuPlan,
+    apply_plan,
+    format_cpulist,
+    loader_worker_init,
+    plan_affinity,
+)
+from src.utils.storage import Storage, storage_from_config
+from src.pipeline.elastic import (
+    ElasticState,
+    ElasticDistributedSampler,
+    get_local_rank,
+    get_local_world_size,
+    get_restart_count,
+    rescale_learning_rate,
+)
+
+
+def _fsdp():
+    """``torch.distributed.fsdp``, imported only by runs that shard with FSDP.
+
+    It pulls in a large part of torch.distributed. A module-level lazy proxy
+    is not an option: torch imports FSDP internals itself (via torch._dynamo,
+    e.g. from torchvision), and would then see a half-initialised package.
+    """
+    import torch.distributed.fsdp as fsdp
+    return fsdp
+
+
+SHARDING_MODES = ('ddp', 'zero', 'fsdp')
+
+# Per run, so a fresh job never resumes another job's preempted state
+EMERGENCY_CHECKPOINT_KEY = 'checkpoints/emergency_{run_id}.pt'
+
+OPTIMIZERS = {
+    'adam': torch.optim.Adam,
+    'adamw': torch.optim.AdamW,
+    'sgd': torch.optim.SGD,
+}
 
 class DistributedTrainer:
     def __init__(self, config: Dict[str, Any], distributed: bool = False):
         self.config = config
-        self.s3_client = boto3.client('s3')
+        self._storage: Optional[Storage] = None
         self.distributed = distributed
+        self.local_rank = 0
+        self.preempted = False
+        self._preemption_time = None
+        self._previous_sigterm = None
+        self._watchdog: Optional[Tuple[int, int, int, threading.Event]] = None
+        self.accelerated = config.get('accelerated', False)
+        self._compiled_steps = {}
+        self.guard: Optional[DivergenceGuard] = None
+        self.history: List[Dict[str, Any]] = []
+        self.loss_tracker: Optional[SampleLossTracker] = None
+        self._unreduced_criteria = {}
+        self.cpu_plan: Optional[CpuPlan] = None
+        self.sharding = config.get('sharding', 'ddp')
+        if self.sharding not in SHARDING_MODES:
+            raise ValueError(f"Unknown sharding mode: {self.sharding}")
+        if config.get('cpu_affinity', False) and not torch.cuda.is_available():
+            self.configure_cpu_affinity()
         if distributed:
             self.setup_distributed()
+        if self.accelerated:
+            self._configure_compile_cache()
     
+    @property
+    def storage(self) -> Storage:
+        """Checkpoint storage: ``checkpoint_storage`` or the checkpoint bucket on S3."""
+        if self._storage is None:
+            self._storage = storage_from_config(self.config, 'checkpoint')
+        return self._storage
+
+    @property
+    def s3_client(self):
+        """Client behind S3 checkpoint storage, created on first use."""
+        return self.storage.client
+
+    def _has_checkpoint_storage(self) -> bool:
+        return bool(self.config.get('checkpoint_storage') or self.config.get('checkpoint_bucket'))
+
     def setup_distributed(self) -> None:
-        """Initialize distributed training setup."""
+        """Initialize distributed training setup.
+
+        Rank, world size and rendezvous address come from the environment set
+        by torchrun, so the same code runs single-node, multi-node and under
+        elastic membership.
+        """
+        self.local_rank = get_local_rank()
         if torch.cuda.is_available():
-            dist.init_process_group(backend='nccl')
-            torch.cuda.set_device(dist.get_rank())
-        else:
-            dist.init_process_group(backend='gloo')
+            torch.cuda.set_device(self.local_rank)
+        # torchrun keeps one store across restarts of the group; without a
+        # per-attempt prefix a restarted rank can read the address a rank of
+        # the previous attempt published and fail to connect to it
+        store, rank, world_size = next(dist.rendezvous('env://'))
+        store = dist.PrefixStore(f'attempt_{get_restart_count()}', store)
+        dist.init_process_group(backend='nccl' if torch.cuda.is_available() else 'gloo',
+                                store=store, rank=rank, world_size=world_size)
     
+    def configure_cpu_affinity(self) -> None:
+        """Pin this rank and its loader workers to their share of the host's cores.
+
+        Ranks on a host are spread over NUMA nodes and get whole physical
+        cores for their intra-op threads, plus separate cores for their
+        DataLoader workers (``loader_cores_per_rank``). Runs before
+        ``init_process_group`` so gloo's threads inherit the placement.
+        """
+        local_rank = get_local_rank()
+        self.cpu_plan = plan_affinity(local_rank, get_local_world_size(),
+                                      self.config.get('num_workers', 0),
+                                      loader_cores=self.config.get('loader_cores_per_rank'))
+        apply_plan(self.cpu_plan)
+        print(f"Local rank {local_rank}: {self.cpu_plan.threads} threads on CPUs "
+              f"{format_cpulist(self.cpu_plan.compute_cpus)}, loader workers on "
+              f"{format_cpulist(self.cpu_plan.loader_cpus)}, NUMA node {self.cpu_plan.node}")
+
+    @property
+    def worker_init_fn(self):
+        """``worker_init_fn`` for DataLoaders of this rank; pins workers with ``cpu_affinity``."""
+        return loader_worker_init(self.cpu_plan) if self.cpu_plan is not None else None
+
+    def _configure_compile_cache(self) -> None:
+        """Persist compiled graphs on disk so restarts skip most warm-up."""
+        cache_dir = self.config.get('compile_cache_dir', '/tmp/torchinductor_cache')
+        os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', cache_dir)
+        os.environ.setdefault('TORCHINDUCTOR_FX_GRAPH_CACHE', '1')
+        os.environ.setdefault('TORCHINDUCTOR_AUTOGRAD_CACHE', '1')
+        try:
+            import torch._inductor.config as inductor_config
+            inductor_config.fx_graph_cache = True
+        except ImportError:
+            pass
+
+    def _is_main_process(self) -> bool:
+        return not self.distributed or dist.get_rank() == 0
+
+    def _world_size(self) -> int:
+        return dist.get_world_size() if self.distributed else 1
+
+    def _rank(self) -> int:
+        return dist.get_rank() if self.distributed else 0
+
     def load_model(self, model: torch.nn.Module) -> torch.nn.Module:
-        """Wrap model for distributed training."""
+        """Wrap model for distributed training.
+
+        With ``sharding='fsdp'`` parameters, gradients and optimizer state are
+        sharded across ranks; ``'zero'`` keeps DDP for the model and only
+        shards optimizer state (see ``create_optimizer``).
+
+        With ``accelerated`` the weights are converted to channels_last and
+        the wrapped model is compiled in place, so state dict keys and
+        ``isinstance`` checks are unchanged.
+        """
         if torch.cuda.is_available():
             model = model.cuda()
+        if self.accelerated:
+            model = model.to(memory_format=torch.channels_last)
         if self.distributed:
-            return DistributedDataParallel(model)
+            if self.sharding == 'fsdp':
+                device_id = torch.cuda.current_device() if torch.cuda.is_available() else None
+                model = _fsdp().FullyShardedDataParallel(model, device_id=device_id)
+            else:
+                device_ids = [self.local_rank] if torch.cuda.is_available() else None
+                model = DistributedDataParallel(model, device_ids=device_ids)
+        if self.accelerated:
+            model.compile(mode=self.config.get('compile_mode'))
         return model
+
+    def build_model(self) -> torch.nn.Module:
+        """Build the configured ``model_name`` and wrap it for training."""
+        model = create_model(
+            self.config.get('model_name', 'resnet50'),
+            num_classes=self.config.get('num_classes', 10),
+            pretrained=self.config.get('pretrained', False),
+            checkpoint_stages=self.config.get('checkpoint_stages', []),
+            channels_last=self.config.get('channels_last', False)
+        )
+        return self.load_model(model)
+
+    def create_optimizer(self, model: torch.nn.Module) -> torch.optim.Optimizer:
+        """Build the configured optimizer, sharding its state for ZeRO."""
+        name = self.config.get('optimizer', 'adam')
+        if name not in OPTIMIZERS:
+            raise ValueError(f"Unknown optimizer: {name}")
+        optimizer_class = OPTIMIZERS[name]
+        kwargs = {
+            'lr': self.config.get('learning_rate', 0.001),
+            'weight_decay': self.config.get('weight_decay', 0.0),
+        }
+        if self.accelerated:
+            # Fused kernels exist for Adam/AdamW on CUDA; elsewhere use the
+            # multi-tensor (foreach) implementation.
+            if torch.cuda.is_available() and name in ('adam', 'adamw'):
+                kwargs['fused'] = True
+            else:
+                kwargs['foreach'] = True
+        if self.distributed and self.sharding == 'zero':
+            return ZeroRedundancyOptimizer(
+                model.parameters(),
+                optimizer_class=optimizer_class,
+                **kwargs
+            )
+        return optimizer_class(model.parameters(), **kwargs)
     
+    def _to_device(self, data: torch.Tensor,
+                   target: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        if torch.cuda.is_available():
+            data = data.cuda(non_blocking=True)
+            target = target.cuda(non_blocking=True)
+        if data.dtype == torch.uint8:
+            # Decoded pixels kept compact in memory, e.g. a shared val set
+            data = normalize_images(data)
+        if self.accelerated and data.dim() == 4:
+            data = data.contiguous(memory_format=torch.channels_last)
+        return data, target
+
+    def _optimizer_step(self, optimizer: torch.optim.Optimizer) -> None:
+        """Step the optimizer, compiling the step in accelerated mode.
+
+        Fused optimizers are already a single kernel and ZeRO steps contain
+        collectives, so those run eagerly.
+        """
+        fused = any(group.get('fused') for group in optimizer.param_groups)
+        if (not self.accelerated or fused
+                or isinstance(optimizer, ZeroRedundancyOptimizer)):
+            optimizer.step()
+            return
+        step = self._compiled_steps.get(id(optimizer))
+        if step is None:
+            step = torch.compile(optimizer.step, fullgraph=False)
+            self._compiled_steps[id(optimizer)] = step
+        step()
+
     def train_step(self, model: torch.nn.Module, 
                   batch: Tuple[torch.Tensor, torch.Tensor],
                   optimizer: torch.optim.Optimizer,
                   criterion: torch.nn.Module) -> float:
         """Perform one training step."""
+        return self._train_step(model, batch, optimizer, criterion).item()
+
+    def _train_step(self, model: torch.nn.Module,
+                    batch: Tuple[torch.Tensor, torch.Tensor],
+                    optimizer: torch.optim.Optimizer,
+                    criterion: torch.nn.Module,
+                    indices: Optional[List[int]] = None,
+                    sample_weights: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """Training step that returns the detached loss without a host sync.
+
+        With the batch's dataset ``indices`` the per-sample losses are
+        recorded in ``loss_tracker`` and weighted by ``sample_weights``.
+        """
         model.train()
         data, target = batch
         
-        if torch.cuda.is_available():
-            data = data.cuda()
-            target = target.cuda()
+        data, target = self._to_device(data, target)
             
-        optimizer.zero_grad()
+        optimizer.zero_grad(set_to_none=True)
         output = model(data)
-        loss = criterion(output, target)
+        if indices is None:
+            loss = criterion(output, target)
+        else:
+            loss = self._tracked_loss(output, target, criterion, indices, sample_weights)
         loss.backward()
-        optimizer.step()
+        if self.guard is not None:
+            self.guard.observe(loss.detach(), self.guard.grad_norm(model))
+        self._optimizer_step(optimizer)
         
-        return loss.item()
+        return loss.detach()
     
+    def _tracked_loss(self, output: torch.Tensor, target: torch.Tensor,
+                      criterion: torch.nn.Module, indices: List[int],
+                      sample_weights: Optional[torch.Tensor]) -> torch.Tensor:
+        unreduced = self._unreduced_criteria.get(id(criterion))
+        if unreduced is None:
+            if not hasattr(criterion, 'reduction'):
+                raise ValueError(f"{type(criterion).__name__} has no per-sample reduction")
+            unreduced = copy.copy(criterion)
+            unreduced.reduction = 'none'
+            self._unreduced_criteria[id(criterion)] = unreduced
+        losses = unreduced(output, target)
+        index = torch.tensor(indices)
+        self.loss_tracker.record(index, losses)
+        if sample_weights is not None:
+            losses = losses * sample_weights[index].to(losses.device, non_blocking=True)
+        return losses.mean()
+
     def validate(self, model: torch.nn.Module, 
                 val_loader: List[Tuple[torch.Tensor, torch.Tensor]]) -> Tuple[float, float]:
         """Validate the model and return validation loss and accuracy."""
@@ -58,11 +312,10 @@ class DistributedTrainer:
         total = 0
         criterion = torch.nn.CrossEntropyLoss()
         
-        with torch.no_grad():
+        grad_mode = torch.inference_mode() if self.accelerated else torch.no_grad()
+        with grad_mode:
             for data, target in val_loader:
-                if torch.cuda.is_available():
-                    data = data.cuda()
-                    target = target.cuda()
+                data, target = self._to_device(data, target)
                 
                 output = model(data)
                 val_loss += criterion(output, target).item()
@@ -76,20 +329,510 @@ class DistributedTrainer:
         
         return val_loss, accuracy
     
-    def save_checkpoint(self, model: torch.nn.Module, epoch: int) -> None:
-        """Save model checkpoint to S3."""
-        if not self.distributed or (self.distributed and dist.get_rank() == 0):
+    def _is_fsdp(self, model: torch.nn.Module) -> bool:
+        return self.sharding == 'fsdp' and isinstance(model, _fsdp().FullyShardedDataParallel)
+
+    def _model_state_dict(self, model: torch.nn.Module) -> Dict[str, Any]:
+        """Full (unsharded) model state dict; collective under FSDP.
+
+        Keys are those of the bare model, without DDP's ``module.`` prefix.
+        """
+        if isinstance(model, DistributedDataParallel):
+            return model.module.state_dict()
+        if self._is_fsdp(model):
+            fsdp = _fsdp()
+            with fsdp.FullyShardedDataParallel.state_dict_type(
+                model,
+                fsdp.StateDictType.FULL_STATE_DICT,
+                fsdp.FullStateDictConfig(offload_to_cpu=True, rank0_only=True),
+                fsdp.FullOptimStateDictConfig(offload_to_cpu=True, rank0_only=True),
+            ):
+                return model.state_dict()
+        return model.state_dict()
+
+    def _optimizer_state_dict(self, model: torch.nn.Module,
+                              optimizer: torch.optim.Optimizer) -> Optional[Dict[str, Any]]:
+        """Consolidated optimizer state dict; collective under ZeRO and FSDP.
+
+        Only rank 0 receives the full state, other ranks get ``None``.
+        """
+        if isinstance(optimizer, ZeroRedundancyOptimizer):
+            optimizer.consolidate_state_dict(to=0)
+            return optimizer.state_dict() if self._is_main_process() else None
+        if self._is_fsdp(model):
+            fsdp = _fsdp()
+            with fsdp.FullyShardedDataParallel.state_dict_type(
+                model,
+                fsdp.StateDictType.FULL_STATE_DICT,
+                fsdp.FullStateDictConfig(offload_to_cpu=True, rank0_only=True),
+                fsdp.FullOptimStateDictConfig(offload_to_cpu=True, rank0_only=True),
+            ):
+                return fsdp.FullyShardedDataParallel.optim_state_dict(model, optimizer)
+        return optimizer.state_dict()
+
+    def save_checkpoint(self, model: torch.nn.Module, epoch: int,
+                        optimizer: Optional[torch.optim.Optimizer] = None) -> None:
+        """Save model checkpoint to checkpoint storage.
+
+        Under ZeRO and FSDP the sharded state is gathered to rank 0 first, so
+        this must be called on every rank.
+        """
+        model_state = self._model_state_dict(model)
+        optimizer_state = None
+        if optimizer is not None:
+            optimizer_state = self._optimizer_state_dict(model, optimizer)
+
+        if self._is_main_process():
             checkpoint = {
                 'epoch': epoch,
-                'model_state_dict': model.state_dict(),
+                'model_state_dict': model_state,
+                'sharding': self.sharding,
             }
+            if optimizer_state is not None:
+                checkpoint['optimizer_state_dict'] = optimizer_state
             path = f'/tmp/checkpoint_{epoch}.pt'
             torch.save(checkpoint, path)
             
-            self.s3_client.upload_file(
-                path,
-                self.config['checkpoint_bucket'],
-                f'checkpoints/epoch_{epoch}.pt'
-            )
+            self.storage.put_file(f'checkpoints/epoch_{epoch}.pt', path)
             if os.path.exists(path):
-                os.remove(path)
\ No newline at end of file
+                os.remove(path)
+
+    def load_checkpoint(self, model: torch.nn.Module, epoch: int,
+                        optimizer: Optional[torch.optim.Optimizer] = None) -> int:
+        """Load a checkpoint written by ``save_checkpoint`` and return its epoch.
+
+        Checkpoints hold full state keyed like the bare model, so they can be
+        restored into any sharding mode or an unwrapped model; each rank keeps
+        only its own shard. Checkpoints saved with DDP's ``module.`` prefix
+        load too.
+        """
+        path = f'/tmp/checkpoint_{epoch}_load.pt'
+        self.storage.get_file(f'checkpoints/epoch_{epoch}.pt', path)
+        checkpoint = torch.load(path, map_location='cpu')
+        if os.path.exists(path):
+            os.remove(path)
+
+        self._load_state(model, optimizer, checkpoint)
+        return checkpoint['epoch']
+
+    def _load_state(self, model: torch.nn.Module,
+                    optimizer: Optional[torch.optim.Optimizer],
+                    checkpoint: Dict[str, Any]) -> None:
+        """Restore full model/optimizer state, keeping only the local shard."""
+        model_state = copy.copy(checkpoint['model_state_dict'])
+        consume_prefix_in_state_dict_if_present(model_state, 'module.')
+        if self._is_fsdp(model):
+            fsdp = _fsdp()
+            with fsdp.FullyShardedDataParallel.state_dict_type(
+                model,
+                fsdp.StateDictType.FULL_STATE_DICT,
+                fsdp.FullStateDictConfig(offload_to_cpu=True, rank0_only=False),
+                fsdp.FullOptimStateDictConfig(offload_to_cpu=True, rank0_only=False),
+            ):
+                model.load_state_dict(model_state)
+                if optimizer is not None and 'optimizer_state_dict' in checkpoint:
+                    optimizer_state = fsdp.FullyShardedDataParallel.optim_state_dict_to_load(
+                        model=model,
+                        optim=optimizer,
+                        optim_state_dict=checkpoint['optimizer_state_dict']
+                    )
+                    optimizer.load_state_dict(optimizer_state)
+        else:
+            bare = model.module if isinstance(model, DistributedDataParallel) else model
+            bare.load_state_dict(model_state)
+            if optimizer is not None and 'optimizer_state_dict' in checkpoint:
+                optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+
+    def _run_id(self) -> str:
+        """Same for every restart of this job, and for no other job."""
+        return self.config.get('run_id') or os.environ.get('TORCHELASTIC_RUN_ID', 'local')
+
+    def _snapshot_path(self) -> str:
+        return (self.config.get('snapshot_path')
+                or f'/tmp/elastic_snapshot_{self._run_id()}.pt')
+
+    def remove_snapshot(self) -> None:
+        """Delete this node's snapshot so a later run cannot resume from it."""
+        if self.local_rank == 0 and os.path.exists(self._snapshot_path()):
+            os.remove(self._snapshot_path())
+
+    def save_snapshot(self, model: torch.nn.Module,
+                      optimizer: torch.optim.Optimizer,
+                      state: ElasticState) -> None:
+        """Write a local on-disk snapshot for elastic restarts.
+
+        Must be called on every rank. Each node's local rank 0 writes its own
+        copy when it holds the full state, so a restart can resume from any
+        surviving node.
+        """
+        model_state = self._model_state_dict(model)
+        optimizer_state = self._optimizer_state_dict(model, optimizer)
+        if self.local_rank != 0 or optimizer_state is None:
+            return
+        if self.distributed and self.sharding == 'fsdp' and not self._is_main_process():
+            return
+
+        path = self._snapshot_path()
+        snapshot = {
+            'model_state_dict': model_state,
+            'optimizer_state_dict': optimizer_state,
+            'elastic_state': asdict(state),
+        }
+        if self.loss_tracker is not None:
+            snapshot['sample_losses'] = self.loss_tracker.state_dict()
+        torch.save(snapshot, path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def restore_snapshot(self, model: torch.nn.Module,
+                         optimizer: torch.optim.Optimizer) -> ElasticState:
+        """Resume from the newest snapshot held by any rank.
+
+        Ranks compare the step of their local snapshot and the newest one is
+        broadcast, so nodes that joined after a membership change start from
+        the same state. If the world size changed the learning rate is
+        rescaled with the linear scaling rule.
+        """
+        snapshot = None
+        path = self._snapshot_path()
+        if os.path.exists(path):
+            snapshot = torch.load(path, map_location='cpu')
+        elif self._has_checkpoint_storage() and self._is_main_process():
+            snapshot = self._download_emergency_checkpoint()
+        step = snapshot['elastic_state']['global_step'] if snapshot else -1
+
+        if self.distributed:
+            steps = [None] * self._world_size()
+            dist.all_gather_object(steps, step)
+            step = max(steps)
+            if step >= 0:
+                holder = [snapshot if self._rank() == steps.index(step) else None]
+                dist.broadcast_object_list(holder, src=steps.index(step))
+                snapshot = holder[0]
+
+        world_size = self._world_size()
+        if step < 0:
+            return ElasticState(world_size=world_size)
+
+        self._load_state(model, optimizer, snapshot)
+        if self.loss_tracker is not None and 'sample_losses' in snapshot:
+            self.loss_tracker.load_state_dict(snapshot['sample_losses'])
+        state = ElasticState(**snapshot['elastic_state'])
+        if self.config.get('scale_lr_on_resize', True):
+            rescale_learning_rate(optimizer, state.world_size, world_size)
+        state.world_size = world_size
+        if self._is_main_process():
+            print(f"Resumed from snapshot at epoch {state.epoch}, step {state.global_step}")
+        return state
+
+    def _emergency_checkpoint_key(self) -> str:
+        return EMERGENCY_CHECKPOINT_KEY.format(run_id=self._run_id())
+
+    def remove_emergency_checkpoint(self) -> None:
+        """Delete this run's emergency checkpoint once it has been superseded."""
+        if not self._is_main_process():
+            return
+        try:
+            self.storage.delete(self._emergency_checkpoint_key())
+        except Exception as e:
+            print(f"Error removing emergency checkpoint: {e}")
+
+    def _download_emergency_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Fetch the snapshot uploaded on preemption, if there is one."""
+        path = self._snapshot_path() + '.emergency'
+        try:
+            self.storage.get_file(self._emergency_checkpoint_key(), path)
+            return torch.load(path, map_location='cpu')
+        except Exception as e:
+            print(f"No emergency checkpoint available: {e}")
+            return None
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def install_preemption_handler(self) -> None:
+        """Turn SIGTERM (spot interruption) into a stop at the next step.
+
+        A rank blocked in a collective on a peer that is gone (as when
+        torchrun tears down the group to restart it) never reaches a step
+        boundary, and Python cannot run the handler until the collective
+        returns. Distributed runs therefore also start a watchdog that exits
+        the process if no step boundary follows SIGTERM within
+        ``preemption_grace_seconds``.
+        """
+        if threading.current_thread() is not threading.main_thread() \
+                or self._previous_sigterm is not None:
+            return
+        self._previous_sigterm = signal.signal(signal.SIGTERM, self._on_preemption)
+        if self.distributed:
+            # The C-level handler writes each signal number to the wakeup fd
+            # even while the main thread is stuck outside Python
+            read_fd, write_fd = os.pipe()
+            os.set_blocking(write_fd, False)
+            previous_fd = signal.set_wakeup_fd(write_fd, warn_on_full_buffer=False)
+            stopped = threading.Event()
+            self._watchdog = (read_fd, write_fd, previous_fd, stopped)
+            threading.Thread(target=self._preemption_watchdog, args=(read_fd, stopped),
+                             daemon=True).start()
+
+    def uninstall_preemption_handler(self) -> None:
+        """Restore the SIGTERM handling in place before ``install_preemption_handler``."""
+        if self._previous_sigterm is None:
+            return
+        signal.signal(signal.SIGTERM, self._previous_sigterm)
+        self._previous_sigterm = None
+        if self._watchdog is not None:
+            read_fd, write_fd, previous_fd, stopped = self._watchdog
+            stopped.set()
+            signal.set_wakeup_fd(previous_fd)
+            os.close(write_fd)  # the watchdog reads EOF, closes read_fd and exits
+            self._watchdog = None
+
+    def _preemption_watchdog(self, read_fd: int, stopped: threading.Event) -> None:
+        try:
+            while not stopped.is_set():
+                signals = os.read(read_fd, 64)
+                if not signals:
+                    return
+                if signal.SIGTERM in signals:
+                    break
+            if stopped.wait(self.config.get('preemption_grace_seconds', 30.0)):
+                return
+            print("No step boundary since SIGTERM (blocked in a collective?); exiting", flush=True)
+            os._exit(128 + signal.SIGTERM)
+        finally:
+            os.close(read_fd)
+
+    def _on_preemption(self, signum, frame) -> None:
+        if self._preemption_time is None:
+            self._preemption_time = time.monotonic()
+            print(f"Received signal {signum}, stopping at the next step boundary")
+
+    def _preemption_requested(self, step: int) -> bool:
+        """True on every rank once any rank has been signalled.
+
+        Ranks agree through a blocking all_reduce and a device sync, so
+        distributed runs only check every ``preemption_check_every`` steps.
+        """
+        requested = self._preemption_time is not None
+        if self.distributed:
+            if step % self.config.get('preemption_check_every', 10):
+                return False
+            device = torch.device('cuda') if dist.get_backend() == 'nccl' else torch.device('cpu')
+            flag = torch.tensor([float(requested)], device=device)
+            dist.all_reduce(flag, op=dist.ReduceOp.MAX)
+            requested = flag.item() > 0
+        if requested:
+            if self._preemption_time is None:
+                self._preemption_time = time.monotonic()
+            if self._watchdog is not None:
+                self._watchdog[3].set()  # at a step boundary; the snapshot follows
+        return requested
+
+    def emergency_checkpoint(self, model: torch.nn.Module,
+                             optimizer: torch.optim.Optimizer,
+                             state: ElasticState) -> None:
+        """Write a local snapshot, then upload it if the grace period allows.
+
+        Must be called on every rank.
+        """
+        self.save_snapshot(model, optimizer, state)
+        if not self._is_main_process() or not self._has_checkpoint_storage():
+            return
+
+        grace = self.config.get('preemption_grace_seconds', 30.0)
+        remaining = grace - (time.monotonic() - self._preemption_time)
+        if remaining <= 0:
+            print("No time left to upload the emergency checkpoint; kept local copy")
+            return
+        try:
+            self.storage.put_file(self._emergency_checkpoint_key(), self._snapshot_path())
+            print(f"Uploaded emergency checkpoint at step {state.global_step}")
+        except Exception as e:
+            print(f"Error uploading emergency checkpoint: {e}")
+
+    def _check_divergence(self, model: torch.nn.Module,
+                          optimizer: torch.optim.Optimizer) -> None:
+        """Roll back a diverged window, or snapshot a healthy one.
+
+        Training continues with the next batch, so the offending window is
+        skipped rather than replayed.
+        """
+        if self.guard.diverged():
+            self.guard.rollback(model, optimizer)
+        else:
+            self.guard.snapshot(model, optimizer)
+
+    def _apply_resolution(self, schedule: ResolutionSchedule, epoch: int,
+                          train_dataset: Dataset, train_loader: DataLoader) -> None:
+        """Set this epoch's resolution and batch size on a running loader."""
+        resolution = schedule.resolution(epoch)
+        if not hasattr(train_dataset, 'set_resolution'):
+            raise ValueError(f"{type(train_dataset).__name__} does not support "
+                             f"a resolution_schedule")
+        train_dataset.set_resolution(resolution)
+        batch_size = self.config['batch_size']
+        if self.config.get('scale_batch_with_resolution', False):
+            batch_size = schedule.batch_size(epoch, batch_size)
+        # Read by the batch sampler in this process at the start of each epoch
+        train_loader.batch_sampler.batch_size = batch_size
+        if self._is_main_process():
+            print(f"Epoch {epoch}: resolution {resolution}, batch size {batch_size}")
+
+    def fit(self, model: torch.nn.Module,
+            optimizer: torch.optim.Optimizer,
+            criterion: torch.nn.Module,
+            train_dataset: Dataset,
+            val_loader: Optional[List[Tuple[torch.Tensor, torch.Tensor]]] = None) -> ElasticState:
+        """Train for ``config['epochs']`` epochs, resuming from a snapshot.
+
+        Meant to be launched with torchrun: when membership changes torchrun
+        restarts every worker, and ``fit`` picks up from the newest snapshot,
+        re-sharding the rest of the current epoch across the new ranks.
+
+        The local snapshot is removed once training completes unless
+        ``keep_snapshot`` is set; by default it is named after the run id, so
+        other jobs on the same host never resume from it.
+
+        On SIGTERM all ranks stop at the next preemption check (every step,
+        or every ``preemption_check_every`` steps when distributed), write
+        an emergency snapshot (uploaded as this run's emergency checkpoint,
+        which the next epoch checkpoint or completion deletes) and return
+        with ``self.preempted`` set. The SIGTERM handler is only installed
+        while ``fit`` runs, so a later SIGTERM terminates the process. With
+        ``divergence_guard`` a NaN or exploding window is rolled back to an
+        in-memory snapshot instead of continuing.
+
+        With a ``resolution_schedule`` the training resolution (and, with
+        ``scale_batch_with_resolution``, the batch size) changes per epoch
+        while the DataLoader workers keep running. Per-epoch resolution,
+        batch size, wall-clock time and validation accuracy are appended to
+        ``self.history``.
+
+        With ``track_sample_losses`` every sample's latest loss is kept in
+        ``self.loss_tracker`` (merged across ranks each epoch and saved in
+        snapshots). A ``prune_keep_fraction`` below 1 additionally trains on
+        only that share of the below-mean-loss samples between the warm-up
+        and anneal epochs, upweighting the ones kept.
+        """
+        if self.config.get('handle_preemption', True):
+            self.install_preemption_handler()
+        try:
+            return self._fit(model, optimizer, criterion, train_dataset, val_loader)
+        finally:
+            self.uninstall_preemption_handler()
+
+    def _fit(self, model: torch.nn.Module, optimizer: torch.optim.Optimizer,
+             criterion: torch.nn.Module, train_dataset: Dataset,
+             val_loader: Optional[List[Tuple[torch.Tensor, torch.Tensor]]]) -> ElasticState:
+        start = time.perf_counter()
+        keep_fraction = self.config.get('prune_keep_fraction', 1.0)
+        if self.config.get('track_sample_losses', False) or keep_fraction < 1:
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            self.loss_tracker = SampleLossTracker(len(train_dataset), device=device)
+        state = self.restore_snapshot(model, optimizer)
+        if keep_fraction < 1:
+            sampler = LossPruningSampler(
+                train_dataset,
+                self.loss_tracker,
+                keep_fraction=keep_fraction,
+                epochs=self.config.get('epochs', 1),
+                warmup_epochs=self.config.get('prune_warmup_epochs', 1),
+                anneal_epochs=self.config.get('prune_anneal_epochs', 1),
+                num_replicas=self._world_size(),
+                rank=self._rank(),
+                seed=self.config.get('seed', 0)
+            )
+        else:
+            sampler = ElasticDistributedSampler(
+                train_dataset,
+                num_replicas=self._world_size(),
+                rank=self._rank(),
+                seed=self.config.get('seed', 0)
+            )
+        # Built once: workers persist across epochs and the sampler, batch
+        # size and resolution are updated in place before each epoch
+        batch_sampler_class = BatchSampler if self.loss_tracker is None else RecordingBatchSampler
+        num_workers = self.config.get('num_workers', 0)
+        train_loader = DataLoader(
+            train_dataset,
+            batch_sampler=batch_sampler_class(sampler, self.config['batch_size'], drop_last=False),
+            num_workers=num_workers,
+            persistent_workers=num_workers > 0,
+            worker_init_fn=self.worker_init_fn
+        )
+        schedule = ResolutionSchedule.from_config(self.config)
+        snapshot_every = self.config.get('snapshot_every', 100)
+        if self.config.get('divergence_guard', False):
+            self.guard = DivergenceGuard(
+                check_every=self.config.get('divergence_check_every', 50),
+                loss_threshold=self.config.get('divergence_loss_threshold'),
+                grad_norm_threshold=self.config.get('divergence_grad_norm_threshold'),
+                lr_factor=self.config.get('divergence_lr_factor', 1.0),
+                max_rollbacks=self.config.get('divergence_max_rollbacks', 5),
+                distributed=self.distributed
+            )
+            self.guard.snapshot(model, optimizer)
+
+        emergency_removed = False
+        for epoch in range(state.epoch, self.config.get('epochs', 1)):
+            sampler.set_epoch(epoch)
+            sampler.set_start_index(state.samples_seen)
+            if schedule is not None:
+                self._apply_resolution(schedule, epoch, train_dataset, train_loader)
+            loss = float('nan')
+            epoch_start_samples = state.samples_seen
+            for batch in train_loader:
+                if self.loss_tracker is None:
+                    loss = self._train_step(model, batch, optimizer, criterion)
+                else:
+                    loss = self._train_step(model, batch, optimizer, criterion,
+                                            indices=train_loader.batch_sampler.pop(),
+                                            sample_weights=getattr(sampler, 'weights', None))
+                state.samples_seen += batch[0].size(0) * state.world_size
+                state.global_step += 1
+                # Check before any on-disk snapshot so diverged weights are
+                # never persisted
+                if self.guard is not None and (state.global_step % self.guard.check_every == 0
+                                               or state.global_step % snapshot_every == 0):
+                    self._check_divergence(model, optimizer)
+                if self._preemption_requested(state.global_step):
+                    self.emergency_checkpoint(model, optimizer, state)
+                    self.preempted = True
+                    return state
+                if state.global_step % snapshot_every == 0:
+                    self.save_snapshot(model, optimizer, state)
+
+            if self.guard is not None:
+                self._check_divergence(model, optimizer)
+            if self.loss_tracker is not None:
+                self.loss_tracker.merge(self.distributed)
+            samples = state.samples_seen - epoch_start_samples
+            state.epoch = epoch + 1
+            state.samples_seen = 0
+            accuracy = None
+            if val_loader is not None:
+                val_loss, accuracy = self.validate(model, val_loader)
+                if self._is_main_process():
+                    print(f"Epoch {epoch}: loss {float(loss):.4f}, "
+                          f"val_loss {val_loss:.4f}, val_acc {accuracy:.2f}")
+            self.history.append({
+                'epoch': epoch,
+                'resolution': getattr(train_dataset, 'resolution', None),
+                'batch_size': train_loader.batch_sampler.batch_size,
+                'samples': samples,
+                'elapsed_s': time.perf_counter() - start,
+                'val_accuracy': accuracy,
+            })
+            self.save_snapshot(model, optimizer, state)
+            if self._has_checkpoint_storage():
+                self.save_checkpoint(model, epoch, optimizer)
+                if not emergency_removed:
+                    # Superseded by the epoch checkpoint just saved
+                    self.remove_emergency_checkpoint()
+                    emergency_removed = True
+
+        if self._has_checkpoint_storage() and not emergency_removed:
+            self.remove_emergency_checkpoint()
+        if not self.config.get('keep_snapshot', False):
+            self.remove_snapshot()
+        return state
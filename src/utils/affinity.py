@@ -0,0 +1,178 @@
+import ctypes
+import ctypes.util
+import functools
+import glob
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Set
+
+import torch
+
+SYSFS = '/sys/devices/system'
+
+
+def parse_cpulist(text: str) -> List[int]:
+    """``'0-3,8,10-11'`` -> ``[0, 1, 2, 3, 8, 10, 11]``."""
+    cpus = []
+    for part in text.strip().split(','):
+        if part:
+            first, _, last = part.partition('-')
+            cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def format_cpulist(cpus: Iterable[int]) -> str:
+    """``[0, 1, 2, 3, 8]`` -> ``'0-3,8'``."""
+    ranges: List[List[int]] = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(str(first) if first == last else f'{first}-{last}' for first, last in ranges)
+
+
+def _read_cpulist(path: str) -> Optional[List[int]]:
+    try:
+        with open(path) as f:
+            return parse_cpulist(f.read())
+    except OSError:
+        return None
+
+
+@dataclass
+class NumaNode:
+    id: Optional[int]  # None when the kernel exposes no NUMA information
+    cores: List[List[int]]  # physical cores, each a list of hyperthread CPUs
+
+
+def cpu_topology(sysfs: str = SYSFS, available: Optional[Set[int]] = None) -> List[NumaNode]:
+    """CPUs this process may run on, grouped by NUMA node and physical core.
+
+    ``available`` defaults to the current affinity mask, so cpusets of
+    containers and outer launchers are respected. Without NUMA information
+    all CPUs form one node.
+    """
+    if available is None:
+        available = os.sched_getaffinity(0)
+    node_dirs = sorted(glob.glob(os.path.join(sysfs, 'node', 'node[0-9]*')),
+                       key=lambda path: int(re.search(r'(\d+)$', path).group(1)))
+    nodes = [(int(re.search(r'(\d+)$', path).group(1)),
+              _read_cpulist(os.path.join(path, 'cpulist')) or []) for path in node_dirs]
+    if not nodes:
+        nodes = [(None, sorted(available))]
+
+    topology, assigned = [], set()
+    for node_id, cpus in nodes:
+        cores = []
+        for cpu in cpus:
+            if cpu not in available or cpu in assigned:
+                continue
+            siblings = _read_cpulist(
+                os.path.join(sysfs, 'cpu', f'cpu{cpu}', 'topology', 'thread_siblings_list')) or []
+            core = sorted(({cpu} | set(siblings)) & available - assigned)
+            assigned.update(core)
+            cores.append(core)
+        if cores:
+            topology.append(NumaNode(node_id, cores))
+    return topology
+
+
+@dataclass
+class CpuPlan:
+    """Placement of one rank and its DataLoader workers on this host."""
+    compute_cpus: List[int]
+    loader_cpus: List[int]
+    threads: int  # intra-op threads: one per physical compute core
+    node: Optional[int] = None  # NUMA node to take memory from; None if spanning several
+
+
+def plan_affinity(local_rank: int, local_world_size: int, num_workers: int,
+                  topology: Optional[List[NumaNode]] = None,
+                  loader_cores: Optional[int] = None) -> CpuPlan:
+    """Split the host's physical cores between ``local_world_size`` ranks.
+
+    Ranks are spread evenly over NUMA nodes and never share a core; with
+    fewer ranks than nodes each rank spans a group of whole nodes. Of a
+    rank's cores, ``loader_cores`` (default ``num_workers``, at most half)
+    are set aside for its loader workers; the rest run its compute threads.
+    """
+    if topology is None:
+        topology = cpu_topology()
+    if local_world_size <= len(topology):
+        mine = [node for i, node in enumerate(topology)
+                if i * local_world_size // len(topology) == local_rank]
+        cores = [core for node in mine for core in node.cores]
+        node_id = mine[0].id if len(mine) == 1 else None
+    else:
+        node_index = local_rank * len(topology) // local_world_size
+        peers = [rank for rank in range(local_world_size)
+                 if rank * len(topology) // local_world_size == node_index]
+        position = peers.index(local_rank)
+        node_cores = topology[node_index].cores
+        cores = node_cores[position * len(node_cores) // len(peers):
+                           (position + 1) * len(node_cores) // len(peers)]
+        node_id = topology[node_index].id
+    if not cores:
+        total = sum(len(node.cores) for node in topology)
+        raise ValueError(f"No CPU cores left for local rank {local_rank}: "
+                         f"{local_world_size} ranks on {total} physical cores")
+
+    if loader_cores is None:
+        loader_cores = min(num_workers, len(cores) // 2)
+    loader_cores = max(0, min(loader_cores, len(cores) - 1))
+    compute = cores[:len(cores) - loader_cores]
+    # Too few cores to set any aside: workers share the compute cores
+    loader = cores[len(cores) - loader_cores:] if loader_cores else compute
+    return CpuPlan(compute_cpus=[cpu for core in compute for cpu in core],
+                   loader_cpus=[cpu for core in loader for cpu in core],
+                   threads=len(compute), node=node_id)
+
+
+@functools.lru_cache(maxsize=None)
+def _libnuma() -> Optional[ctypes.CDLL]:
+    path = ctypes.util.find_library('numa')
+    if path is None:
+        return None
+    lib = ctypes.CDLL(path)
+    return lib if lib.numa_available() >= 0 else None
+
+
+def bind_memory(node: Optional[int]) -> bool:
+    """Prefer ``node`` for this thread's future allocations (and its new threads').
+
+    Preferred rather than strict, so a full node spills over instead of
+    OOM-killing the rank. Returns False when libnuma is not installed;
+    pinned processes then still get local memory from first-touch placement.
+    """
+    lib = _libnuma()
+    if lib is None or node is None:
+        return False
+    lib.numa_set_preferred(node)
+    return True
+
+
+def pin_process(cpus: List[int], threads: int, node: Optional[int] = None) -> None:
+    """Restrict the calling process to ``cpus`` and ``threads`` intra-op threads."""
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(threads)
+    bind_memory(node)
+
+
+def apply_plan(plan: CpuPlan) -> None:
+    pin_process(plan.compute_cpus, plan.threads, plan.node)
+
+
+def _pin_loader_worker(cpus: List[int], node: Optional[int], worker_id: int) -> None:
+    # Workers decode one sample at a time; more threads only contend
+    pin_process(cpus, 1, node)
+
+
+def loader_worker_init(plan: CpuPlan) -> Callable[[int], None]:
+    """``worker_init_fn`` placing DataLoader workers on the plan's loader cores.
+
+    Picklable, so it also works with the spawn start method.
+    """
+    return functools.partial(_pin_loader_worker, plan.loader_cpus, plan.node)
@@ -0,0 +1,277 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from botocore.exceptions import ClientError
+
+
+def error_code(error: Exception) -> Optional[str]:
+    """AWS error code of a botocore ClientError, if any."""
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code')
+    return None
+
+
+def retry_with_backoff(fn: Callable[[], Any],
+                       retryable: Tuple[Type[BaseException], ...] = (ClientError,),
+                       should_retry: Optional[Callable[[Exception], bool]] = None,
+                       max_attempts: int = 6,
+                       base_delay: float = 0.5,
+                       max_delay: float = 20.0) -> Any:
+    """Call ``fn`` until it succeeds, sleeping with exponential backoff.
+
+    Delays use full jitter (a random fraction of ``base_delay * 2**attempt``,
+    capped at ``max_delay``) so concurrent callers do not retry in lockstep.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except retryable as e:
+            if should_retry is not None and not should_retry(e):
+                raise
+            if attempt == max_attempts - 1:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            print(f"Retrying after {type(e).__name__} in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{max_attempts})")
+            time.sleep(delay)
+
+
+def wait_until(predicate: Callable[[], bool],
+               timeout: float = 120.0,
+               base_delay: float = 0.2,
+               max_delay: float = 10.0,
+               description: str = 'condition') -> None:
+    """Poll ``predicate`` with exponential backoff until it returns True."""
+    deadline = time.monotonic() + timeout
+    delay = base_delay
+    while not predicate():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Timed out waiting for {description}")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def matches(current: Any, desired: Any) -> bool:
+    """True if every key in ``desired`` has the same value in ``current``."""
+    if isinstance(desired, dict) and isinstance(current, dict):
+        return all(k in current and matches(current[k], v) for k, v in desired.items())
+    return current == desired
+
+
+@dataclass
+class Resource:
+    """One node of a deployment graph.
+
+    ``read`` returns the existing state (``None`` if the resource is absent)
+    and ``apply`` creates or updates it. When ``desired`` is ``None`` any
+    existing resource counts as up to date; otherwise the resource is applied
+    only if ``read()`` does not ``matches`` it. ``ready``, if given, is polled
+    with backoff after ``apply`` until the resource can be depended on.
+    """
+    name: str
+    read: Callable[[], Any]
+    apply: Callable[[], Any]
+    desired: Any = None
+    depends_on: List[str] = field(default_factory=list)
+    ready: Optional[Callable[[], bool]] = None
+    ready_timeout: float = 120.0
+
+
+UNCHANGED = 'unchanged'
+APPLIED = 'applied'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class ResourceGraph:
+    """Apply resources concurrently, respecting ``depends_on`` edges.
+
+    Each resource runs as soon as all of its dependencies have succeeded;
+    resources downstream of a failure are skipped rather than attempted.
+    """
+
+    def __init__(self, resources: List[Resource], max_workers: int = 8):
+        self.resources = {r.name: r for r in resources}
+        self.max_workers = max_workers
+        for resource in resources:
+            for dependency in resource.depends_on:
+                if dependency not in self.resources:
+                    raise ValueError(f"{resource.name} depends on unknown resource {dependency}")
+
+    def _reconcile(self, resource: Resource) -> str:
+        current = resource.read()
+        if current is not None and (resource.desired is None
+                                    or matches(current, resource.desired)):
+            return UNCHANGED
+        resource.apply()
+        if resource.ready is not None:
+            wait_until(resource.ready, timeout=resource.ready_timeout,
+                       description=resource.name)
+        return APPLIED
+
+    def apply(self) -> Dict[str, str]:
+        """Reconcile every resource and return its status by name."""
+        status: Dict[str, str] = {}
+        pending = dict(self.resources)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, resource in list(pending.items()):
+                    deps = [status.get(d) for d in resource.depends_on]
+                    if any(s in (FAILED, SKIPPED) for s in deps):
+                        status[name] = SKIPPED
+                        print(f"⏭️  {name}: skipped (dependency failed)")
+                        del pending[name]
+                    elif all(s in (UNCHANGED, APPLIED) for s in deps):
+                        running[pool.submit(self._reconcile, resource)] = name
+                        del pending[name]
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Dependency cycle among: {', '.join(pending)}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        status[name] = future.result()
+                        icon = '✅' if status[name] == APPLIED else '➖'
+                        print(f"{icon} {name}: {status[name]}")
+                    except Exception as e:
+                        status[name] = FAILED
+                        print(f"❌ {name}: {e}")
+        return status
+
+
+def run_checks(checks: Dict[str, Callable[[], Any]], max_workers: int = 8) -> Dict[str, Any]:
+    """Run independent read-only checks concurrently, keeping their order."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(check) for name, check in checks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+RETRYABLE_DELETE_ERRORS = {'SlowDown', 'InternalError', 'ServiceUnavailable', 'RequestTimeout'}
+
+
+@dataclass
+class DeleteStats:
+    deleted: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        return self.deleted / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _is_versioned(s3, bucket: str) -> bool:
+    """True if versioning is or was ever enabled, so old versions may exist."""
+    return 'Status' in s3.get_bucket_versioning(Bucket=bucket)
+
+
+def iter_delete_batches(s3, bucket: str, prefix: str = '',
+                        batch_size: int = DELETE_BATCH_SIZE) -> Iterator[List[Dict[str, str]]]:
+    """Page through every key (and version/delete marker) in batches."""
+    batch: List[Dict[str, str]] = []
+    if _is_versioned(s3, bucket):
+        pages = s3.get_paginator('list_object_versions').paginate(Bucket=bucket, Prefix=prefix)
+        for page in pages:
+            for entry in page.get('Versions', []) + page.get('DeleteMarkers', []):
+                batch.append({'Key': entry['Key'], 'VersionId': entry['VersionId']})
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+    else:
+        pages = s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix)
+        for page in pages:
+            for entry in page.get('Contents', []):
+                batch.append({'Key': entry['Key']})
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def delete_batch(s3, bucket: str, objects: List[Dict[str, str]],
+                  max_attempts: int = 5,
+                  base_delay: float = 0.5) -> Tuple[int, List[Dict[str, Any]]]:
+    """Delete one batch; keys that fail transiently are retried with backoff.
+
+    Returns the number deleted and the per-key errors that remain.
+    """
+    deleted = 0
+    failed: List[Dict[str, Any]] = []
+    for attempt in range(max_attempts):
+        response = retry_with_backoff(
+            lambda: s3.delete_objects(Bucket=bucket, Delete={'Objects': objects, 'Quiet': True}),
+            should_retry=lambda e: error_code(e) in RETRYABLE_DELETE_ERRORS,
+            max_attempts=max_attempts,
+            base_delay=base_delay
+        )
+        errors = response.get('Errors', [])
+        deleted += len(objects) - len(errors)
+        retry = [e for e in errors if e.get('Code') in RETRYABLE_DELETE_ERRORS]
+        failed.extend(e for e in errors if e.get('Code') not in RETRYABLE_DELETE_ERRORS)
+        if not retry:
+            break
+        if attempt == max_attempts - 1:
+            failed.extend(retry)
+            break
+        objects = [{k: e[k] for k in ('Key', 'VersionId') if e.get(k)} for e in retry]
+        time.sleep(random.uniform(0, base_delay * 2 ** attempt))
+    return deleted, failed
+
+
+def delete_all_objects(s3, bucket: str, prefix: str = '',
+                       max_workers: int = 16,
+                       batch_size: int = DELETE_BATCH_SIZE,
+                       progress_interval: float = 5.0) -> DeleteStats:
+    """Delete every object, version and delete marker under ``prefix``.
+
+    Keys are paged in batches of up to 1000 while earlier batches are being
+    deleted by ``max_workers`` concurrent DeleteObjects calls. At most twice
+    that many batches are held in memory, so buckets of any size work.
+    """
+    stats = DeleteStats()
+    lock = threading.Lock()
+    start = time.perf_counter()
+    last_report = start
+
+    def record(future) -> None:
+        nonlocal last_report
+        deleted, errors = future.result()
+        with lock:
+            stats.deleted += deleted
+            stats.failed += len(errors)
+            stats.errors.extend(errors)
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                print(f"{bucket}: {stats.deleted} deleted "
+                      f"({stats.deleted / (now - start):.0f} objects/sec)")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = set()
+        for batch in iter_delete_batches(s3, bucket, prefix, batch_size):
+            if len(in_flight) >= 2 * max_workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(future)
+            in_flight.add(pool.submit(delete_batch, s3, bucket, batch))
+        for future in in_flight:
+            record(future)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,274 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from s3transfer.utils import ChunksizeAdjuster
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'}
+
+# S3 CopyObject handles objects up to 5 GB in a single request
+MAX_COPY_SIZE = 5 * 1024 ** 3
+
+
+@dataclass
+class IngestFile:
+    path: str
+    key: str
+    split: str
+    label: int
+    size: int
+    mtime: float
+    etag: Optional[str] = None
+
+
+@dataclass
+class IngestStats:
+    uploaded: int = 0
+    copied: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes_uploaded: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        done = self.uploaded + self.copied + self.skipped
+        return done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes_uploaded / 2**20 / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def s3_etag(path: str, multipart_threshold: int, multipart_chunksize: int) -> str:
+    """The ETag S3 will report for ``path`` uploaded with these settings.
+
+    Single-part uploads get the MD5 of the content; multipart uploads get the
+    MD5 of the concatenated part MD5s plus ``-<parts>``. Matching it against
+    the ETag from a listing detects already-uploaded content without a HEAD
+    request per object. (Objects encrypted with SSE-KMS have other ETags and
+    are simply uploaded again.)
+    """
+    size = os.path.getsize(path)
+    if size < multipart_threshold:
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    chunksize = ChunksizeAdjuster().adjust_chunksize(multipart_chunksize, size)
+    part_digests = []
+    with open(path, 'rb') as f:
+        for part in iter(lambda: f.read(chunksize), b''):
+            part_digests.append(hashlib.md5(part).digest())
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+def label_for(class_name: str, index: int) -> int:
+    """Label from a ``class_N`` directory name, else the sorted class index."""
+    try:
+        return int(class_name.split('_')[-1])
+    except ValueError:
+        return index
+
+
+def _split_for(relative_path: str, val_fraction: float) -> str:
+    # Hash the path so the split is stable across runs and resumes
+    bucket = int(hashlib.md5(relative_path.encode()).hexdigest(), 16) % 10000
+    return 'val' if bucket < val_fraction * 10000 else 'train'
+
+
+def discover_files(root: str, val_fraction: float = 0.1) -> List[IngestFile]:
+    """Find images under ``root`` and map them to ``<split>/class_<N>/`` keys.
+
+    ``root`` is either ImageNet style (``root/<class>/...``), in which case a
+    stable ``val_fraction`` of files goes to ``val/``, or already split into
+    ``root/train/<class>/`` and ``root/val/<class>/``. Class indices are
+    taken from the classes of both splits, so a class missing from one split
+    does not shift the labels of the other. Files in subdirectories of a
+    class are flattened into its directory (``sub/x.jpg`` becomes
+    ``sub__x.jpg``), since the dataset reads the label from the parent.
+    """
+    if os.path.isdir(os.path.join(root, 'train')):
+        layouts = [(os.path.join(root, split), split)
+                   for split in ('train', 'val') if os.path.isdir(os.path.join(root, split))]
+    else:
+        layouts = [(root, None)]
+
+    class_dirs = {base: sorted(d for d in os.listdir(base) if os.path.isdir(os.path.join(base, d)))
+                  for base, _ in layouts}
+    classes = sorted(set().union(*class_dirs.values()))
+    labels = {class_name: label_for(class_name, index) for index, class_name in enumerate(classes)}
+
+    files = []
+    for base, split in layouts:
+        for class_name in class_dirs[base]:
+            label = labels[class_name]
+            class_dir = os.path.join(base, class_name)
+            for dirpath, _, filenames in os.walk(class_dir):
+                for filename in sorted(filenames):
+                    if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    relative = os.path.relpath(path, class_dir).replace(os.sep, '/')
+                    file_split = split or _split_for(f"{class_name}/{relative}", val_fraction)
+                    stat = os.stat(path)
+                    files.append(IngestFile(
+                        path=path,
+                        key=f"{file_split}/class_{label}/{relative.replace('/', '__')}",
+                        split=file_split,
+                        label=label,
+                        size=stat.st_size,
+                        mtime=stat.st_mtime
+                    ))
+    return files
+
+
+def list_remote_etags(s3, bucket: str, prefixes: List[str]) -> Dict[str, str]:
+    etags = {}
+    paginator = s3.get_paginator('list_objects_v2')
+    for prefix in prefixes:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                etags[obj['Key']] = obj['ETag'].strip('"')
+    return etags
+
+
+def load_state(state_path: Optional[str]) -> Dict[str, dict]:
+    """Records of completed files from an earlier (possibly interrupted) run."""
+    state = {}
+    if state_path and os.path.exists(state_path):
+        with open(state_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from an interrupted run
+                state[record['path']] = record
+    return state
+
+
+def ingest_directory(s3, root: str, bucket: str,
+                     workers: int = 32,
+                     multipart_threshold: int = 8 * 1024 ** 2,
+                     multipart_chunksize: int = 8 * 1024 ** 2,
+                     val_fraction: float = 0.1,
+                     state_path: Optional[str] = None,
+                     write_manifest: bool = False,
+                     progress_interval: float = 5.0) -> IngestStats:
+    """Upload an image directory into the ``train/``/``val/`` layout.
+
+    Content hashes are computed in parallel and compared with the ETags
+    already in the bucket, so unchanged files are skipped and files whose
+    content is already present under another key are copied server-side.
+    The rest go through one transfer manager that uploads many files at once
+    and splits large ones into concurrent multipart uploads. Completed files
+    are appended to ``state_path`` so a resumed run does not re-hash them.
+    """
+    start = time.perf_counter()
+    stats = IngestStats()
+    lock = threading.Lock()
+
+    files = discover_files(root, val_fraction)
+    remote = list_remote_etags(s3, bucket, ['train/', 'val/'])
+    state = load_state(state_path)
+    print(f"Found {len(files)} files, {len(remote)} objects already in s3://{bucket}")
+
+    def hash_file(item: IngestFile) -> None:
+        record = state.get(item.path)
+        if record and record['size'] == item.size and record['mtime'] == item.mtime:
+            item.etag = record['etag']
+        else:
+            item.etag = s3_etag(item.path, multipart_threshold, multipart_chunksize)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(hash_file, files))
+
+    state_file = open(state_path, 'a') if state_path else None
+    last_report = time.perf_counter()
+
+    def finish(item: IngestFile, outcome: str) -> None:
+        nonlocal last_report
+        with lock:
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+            if outcome == 'uploaded':
+                stats.bytes_uploaded += item.size
+            if state_file is not None and outcome != 'failed':
+                state_file.write(json.dumps(asdict(item)) + '\n')
+                state_file.flush()
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                elapsed = now - start
+                print(f"{stats.uploaded + stats.copied + stats.skipped}/{len(files)} files, "
+                      f"{stats.bytes_uploaded / 2**20 / elapsed:.1f} MB/s")
+
+    # Content already in the bucket (or uploaded earlier in this run) is
+    # copied server-side rather than uploaded again
+    key_for_etag = {etag: key for key, etag in remote.items()}
+    uploads, copies = [], []
+    for item in files:
+        if remote.get(item.key) == item.etag:
+            finish(item, 'skipped')
+        elif item.etag in key_for_etag and item.size <= MAX_COPY_SIZE:
+            copies.append((item, key_for_etag[item.etag]))
+        else:
+            key_for_etag[item.etag] = item.key
+            uploads.append(item)
+
+    transfer_config = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=multipart_chunksize,
+        max_concurrency=workers
+    )
+    try:
+        with create_transfer_manager(s3, transfer_config) as manager:
+            futures = []
+            for item in uploads:
+                content_type = mimetypes.guess_type(item.path)[0] or 'application/octet-stream'
+                futures.append((item, manager.upload(
+                    item.path, bucket, item.key,
+                    extra_args={'ContentType': content_type}
+                )))
+            for item, future in futures:
+                try:
+                    future.result()
+                    finish(item, 'uploaded')
+                except Exception as e:
+                    print(f"Error uploading {item.path}: {e}")
+                    finish(item, 'failed')
+
+        def copy(job) -> None:
+            item, source_key = job
+            try:
+                s3.copy_object(Bucket=bucket, Key=item.key,
+                               CopySource={'Bucket': bucket, 'Key': source_key})
+                finish(item, 'copied')
+            except Exception as e:
+                print(f"Error copying {source_key} to {item.key}: {e}")
+                finish(item, 'failed')
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(copy, copies))
+    finally:
+        if state_file is not None:
+            state_file.close()
+
+    if write_manifest:
+        for split in ('train', 'val'):
+            lines = [json.dumps({'key': item.key, 'label': item.label, 'size': item.size})
+                     for item in files if item.split == split]
+            s3.put_object(Bucket=bucket, Key=f"manifests/{split}.jsonl",
+                          Body=('\n'.join(lines) + '\n').encode(),
+                          ContentType='application/x-ndjson')
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,61 @@
+import importlib.util
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Any, Dict, Tuple
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return ``name`` as a module that is only executed on first attribute access.
+
+    Keeps heavy, rarely needed dependencies (boto3) off the import path of
+    every process start and DataLoader worker. For a submodule the parent
+    package is imported eagerly, so prefer lazily importing the heavy package
+    itself. Not for torch or torchvision modules: torch imports its own
+    submodules internally and breaks on a proxy left in ``sys.modules``;
+    import those inside the function that needs them instead.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+boto3 = lazy_import('boto3')
+
+_clients: Dict[Tuple[Any, ...], Any] = {}
+_clients_pid = None
+_clients_lock = threading.Lock()
+
+
+def get_client(service: str, **kwargs) -> Any:
+    """Shared boto3 client for ``service``, created on first use per process.
+
+    boto3 clients are thread-safe but must not cross a fork, so the cache is
+    dropped whenever the process id changes (DataLoader workers, spawned
+    evaluation or preprocessing workers).
+    """
+    global _clients_pid
+    key = (service, *sorted(kwargs.items()))
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = boto3.client(service, **kwargs)
+        return client
+
+
+def reset_clients() -> None:
+    """Forget cached clients, e.g. after credentials or endpoints change."""
+    with _clients_lock:
+        _clients.clear()
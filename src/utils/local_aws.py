@@ -0,0 +1,80 @@
+import contextlib
+import os
+import threading
+import time
+from typing import Iterator, Optional
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+from src.utils.lazy import reset_clients
+
+
+def _payload_size(body) -> int:
+    if body is None:
+        return 0
+    if hasattr(body, '__len__'):
+        return len(body)
+    position = body.tell()
+    size = body.seek(0, os.SEEK_END) - position
+    body.seek(position)
+    return size
+
+
+class NetworkModel:
+    """Sleep ``latency`` per request plus transfer time at ``bandwidth_mbps``.
+
+    ``requests`` counts every AWS request made while the model is attached.
+    """
+
+    def __init__(self, latency: float = 0.0, bandwidth_mbps: Optional[float] = None):
+        self.latency = latency
+        self.bandwidth_mbps = bandwidth_mbps
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def charge(self, nbytes: int = 0, request: bool = True) -> None:
+        delay = 0.0
+        if request:
+            with self._lock:
+                self.requests += 1
+            delay += self.latency
+        if self.bandwidth_mbps:
+            delay += nbytes * 8 / (self.bandwidth_mbps * 1e6)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _on_request(self, params, **kwargs) -> None:
+        self.charge(_payload_size(params.get('body')))
+
+    def _on_download(self, parsed, **kwargs) -> None:
+        self.charge(parsed.get('ContentLength', 0), request=False)
+
+
+@contextlib.contextmanager
+def local_aws(latency: float = 0.0, bandwidth_mbps: Optional[float] = None,
+              region: str = 'us-east-1') -> Iterator[NetworkModel]:
+    """Serve AWS from moto in-process, like a remote region with this network.
+
+    boto3 clients created inside the block (including cached ones from
+    ``get_client``) talk to moto, and every request pays ``latency`` seconds
+    plus its payload size at ``bandwidth_mbps``, so benchmarks and tests can
+    model a remote bucket without network access. Yields the network model,
+    whose settings can be changed inside the block.
+    """
+    network = NetworkModel(latency, bandwidth_mbps)
+    credentials = {'AWS_ACCESS_KEY_ID': 'testing', 'AWS_SECRET_ACCESS_KEY': 'testing',
+                   'AWS_SESSION_TOKEN': 'testing', 'AWS_DEFAULT_REGION': region}
+    with patch.dict(os.environ, credentials), mock_aws():
+        # A fresh default session, so the handlers never outlive the block
+        boto3.setup_default_session()
+        events = boto3.DEFAULT_SESSION.events
+        events.register('before-call', network._on_request)
+        events.register('after-call.s3.GetObject', network._on_download)
+        reset_clients()
+        try:
+            yield network
+        finally:
+            boto3.DEFAULT_SESSION = None
+            reset_clients()
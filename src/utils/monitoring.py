@@ -1,8 +1,8 @@
-import boto3
 import time
 from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
 import json
+from src.utils.lazy import get_client
 
 @dataclass
 class MetricData:
@@ -13,9 +13,20 @@ class MetricData:
 class CloudWatchMonitor:
     def __init__(self, namespace: str = 'MLTraining'):
         """Initialize CloudWatch monitoring."""
-        self.cloudwatch = boto3.client('cloudwatch')
+        self._cloudwatch = None
         self.namespace = namespace
         self._dashboard_metrics = []
+
+    @property
+    def cloudwatch(self):
+        """CloudWatch client, created on first use."""
+        if self._cloudwatch is None:
+            self._cloudwatch = get_client('cloudwatch')
+        return self._cloudwatch
+
+    @cloudwatch.setter
+    def cloudwatch(self, client) -> None:
+        self._cloudwatch = client
     
     def log_metric(self, metric_name: str, value: float, dimensions: Optional[Dict[str, str]] = None):
         """Log a metric to CloudWatch."""
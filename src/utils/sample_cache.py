@@ -0,0 +1,366 @@
+import collections
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from src.utils.storage import Storage, StorageSettings, open_storage
+
+DEFAULT_SOCKET = '/tmp/sample_cache.sock'
+
+_LENGTH = struct.Struct('!I')
+
+# (payload, (height, width) for decoded RGB pixels or None for raw bytes)
+Entry = Tuple[bytes, Optional[Tuple[int, int]]]
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Sample cache connection closed")
+        received += n
+    return bytes(buffer)
+
+
+def _send_message(sock: socket.socket, header: Dict[str, Any], payloads: List[bytes] = ()) -> None:
+    """Length-prefixed JSON header followed by the payloads it describes."""
+    data = json.dumps(header).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+    for payload in payloads:
+        sock.sendall(payload)
+
+
+def _recv_header(sock: socket.socket) -> Dict[str, Any]:
+    size, = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    return json.loads(_recv_exactly(sock, size))
+
+
+def _decode(data: bytes) -> Entry:
+    image = Image.open(io.BytesIO(data))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image.tobytes(), (image.height, image.width)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0  # backend GETs issued
+    deduplicated: int = 0  # requests that joined an in-flight GET
+    evictions: int = 0
+    bytes: int = 0
+    entries: int = 0
+
+
+class SampleCache:
+    """Memory-bounded LRU of samples shared by every client of the daemon.
+
+    Entries are keyed by storage URL, key and representation: raw object
+    bytes, or decoded uint8 RGB pixels so clients also skip JPEG decoding.
+    Concurrent requests for a key that is being fetched wait for that one
+    GET instead of issuing their own. Objects larger than ``memory_budget``
+    are served but not cached.
+
+    Only the storage URLs in ``allowed_urls`` are read; requests for any
+    other URL fail with ``PermissionError``, so clients of the socket cannot
+    make the daemon read arbitrary buckets or paths with its credentials.
+    """
+
+    def __init__(self, memory_budget: int, allowed_urls: Iterable[str],
+                 max_concurrency: int = 64, settings: Optional[StorageSettings] = None):
+        self.memory_budget = memory_budget
+        self.allowed_urls = frozenset(url.rstrip('/') for url in allowed_urls)
+        self.settings = settings or StorageSettings(max_pool_connections=max_concurrency)
+        self.stats = CacheStats()
+        self._entries: 'collections.OrderedDict[Tuple[str, str, bool], Entry]' = \
+            collections.OrderedDict()
+        self._inflight: Dict[Tuple[str, str, bool], Future] = {}
+        self._storages: Dict[str, Storage] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def _storage(self, url: str) -> Storage:
+        storage = self._storages.get(url)
+        if storage is None:
+            storage = self._storages[url] = open_storage(url, self.settings)
+        return storage
+
+    def get_many(self, url: str, keys: List[str], decoded: bool = False) -> List[Future]:
+        """One future per key, resolving to its ``Entry``."""
+        if url.rstrip('/') not in self.allowed_urls:
+            future = Future()
+            future.set_exception(PermissionError(f"{url} is not served by this sample cache"))
+            return [future] * len(keys)
+        futures = []
+        with self._lock:
+            for key in keys:
+                cache_key = (url, key, decoded)
+                entry = self._entries.get(cache_key)
+                if entry is not None:
+                    self._entries.move_to_end(cache_key)
+                    self.stats.hits += 1
+                    future = Future()
+                    future.set_result(entry)
+                elif cache_key in self._inflight:
+                    self.stats.deduplicated += 1
+                    future = self._inflight[cache_key]
+                else:
+                    self.stats.misses += 1
+                    future = self._inflight[cache_key] = self._pool.submit(self._fetch, cache_key)
+                futures.append(future)
+        return futures
+
+    def _fetch(self, cache_key: Tuple[str, str, bool]) -> Entry:
+        url, key, decoded = cache_key
+        try:
+            data = self._storage(url).get(key)
+            entry = _decode(data) if decoded else (data, None)
+        except Exception:
+            with self._lock:
+                del self._inflight[cache_key]
+            raise
+        with self._lock:
+            del self._inflight[cache_key]
+            self._insert(cache_key, entry)
+        return entry
+
+    def _insert(self, cache_key: Tuple[str, str, bool], entry: Entry) -> None:
+        size = len(entry[0])
+        if size > self.memory_budget:
+            return
+        self._entries[cache_key] = entry
+        self.stats.bytes += size
+        while self.stats.bytes > self.memory_budget:
+            _, evicted = self._entries.popitem(last=False)
+            self.stats.bytes -= len(evicted[0])
+            self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        cache = self.server.cache
+        while True:
+            try:
+                request = _recv_header(self.request)
+            except (ConnectionError, OSError):
+                return
+            if request['op'] == 'stats':
+                with cache._lock:
+                    stats = asdict(cache.stats)
+                _send_message(self.request, stats)
+                continue
+
+            entries, payloads = [], []
+            for future in cache.get_many(request['url'], request['keys'], request['decoded']):
+                try:
+                    payload, shape = future.result()
+                except Exception as e:
+                    entries.append({'size': 0, 'error': str(e),
+                                    'missing': isinstance(e, FileNotFoundError)})
+                    continue
+                entries.append({'size': len(payload), 'shape': shape})
+                payloads.append(payload)
+            _send_message(self.request, {'entries': entries}, payloads)
+
+
+class SampleCacheServer(socketserver.ThreadingUnixStreamServer):
+    """Unix-socket front end of a ``SampleCache``, one thread per client connection.
+
+    The socket is created with ``mode`` (owner only by default); use 0o660
+    to share the daemon with a group of users.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, cache: SampleCache, mode: int = 0o600):
+        self.mode = mode
+        if os.path.exists(socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+                raise RuntimeError(f"A sample cache is already serving {socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(socket_path)  # left behind by a daemon that died
+            finally:
+                probe.close()
+        super().__init__(socket_path, _Handler)
+        self.cache = cache
+
+    def server_bind(self) -> None:
+        # Never let the socket exist with wider permissions, even briefly
+        umask = os.umask(0o777 & ~self.mode)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, self.mode)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class NodeCacheStorage(Storage):
+    """Reads ``url`` through the node's sample cache daemon.
+
+    ``get`` and ``get_many`` are served by the daemon, which all ranks and
+    jobs on the host share; a batch is one request. With ``decoded`` the
+    daemon also caches decoded pixels and ``get_images`` skips JPEG decoding.
+    Listing, range reads and writes go straight to the backend. If the
+    daemon is not running, reads fall back to the backend as well.
+    """
+
+    RECONNECT_INTERVAL = 30.0
+
+    def __init__(self, url: str, socket_path: str = DEFAULT_SOCKET, decoded: bool = False,
+                 settings: Optional[StorageSettings] = None):
+        super().__init__(settings)
+        self.url = url
+        self.socket_path = socket_path
+        self.decoded = decoded
+        self.backend = open_storage(url, settings)
+        self._local = threading.local()
+        self._unavailable_until = 0.0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state['_local'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._local = threading.local()
+
+    def _connection(self) -> Optional[socket.socket]:
+        # One connection per thread and process; sockets must not cross a fork
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None and self._local.pid == os.getpid():
+            return sock
+        if time.monotonic() < self._unavailable_until:
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            self._unavailable_until = time.monotonic() + self.RECONNECT_INTERVAL
+            print(f"Sample cache at {self.socket_path} unavailable ({e}); "
+                  f"reading {self.url} directly")
+            return None
+        self._local.sock, self._local.pid = sock, os.getpid()
+        return sock
+
+    def _request(self, header: Dict[str, Any], read_payloads=None) -> Optional[Any]:
+        """Send ``header`` and return the reply (after ``read_payloads``), or ``None``."""
+        sock = self._connection()
+        if sock is None:
+            return None
+        try:
+            _send_message(sock, header)
+            reply = _recv_header(sock)
+            return read_payloads(reply, sock) if read_payloads else reply
+        except OSError:
+            # ConnectionError included; the daemon went away mid-request
+            sock.close()
+            self._local.sock = None
+            return None
+
+    def _fetch(self, keys: List[str], decoded: bool) -> List[Any]:
+        """Per key an ``Entry`` or the exception raised for it."""
+        def read_payloads(reply: Dict[str, Any], sock: socket.socket) -> List[Any]:
+            results = []
+            for key, entry in zip(keys, reply['entries']):
+                if 'error' in entry:
+                    error_class = FileNotFoundError if entry['missing'] else RuntimeError
+                    results.append(error_class(f"{self.url}/{key}: {entry['error']}"))
+                else:
+                    shape = tuple(entry['shape']) if entry['shape'] else None
+                    results.append((_recv_exactly(sock, entry['size']), shape))
+            return results
+
+        results = self._request({'op': 'get', 'url': self.url, 'keys': keys,
+                                 'decoded': decoded}, read_payloads)
+        if results is None:
+            return self._fetch_direct(keys, decoded)
+        return results
+
+    def _fetch_direct(self, keys: List[str], decoded: bool) -> List[Any]:
+        """``_fetch`` from the backend, concurrently like the daemon would."""
+        results = []
+        for key, data in zip(keys, self.backend.get_many(keys, ignore_errors=True)):
+            try:
+                if data is None:
+                    data = self.backend.get(key)  # again, for the error to report
+                results.append(_decode(data) if decoded else (data, None))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def get(self, key: str) -> bytes:
+        result = self._fetch([key], decoded=False)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result[0]
+
+    def get_many(self, keys: List[str], ignore_errors: bool = False) -> List[Optional[bytes]]:
+        results = []
+        for result in self._fetch(keys, decoded=False):
+            if isinstance(result, Exception):
+                if not ignore_errors:
+                    raise result
+                results.append(None)
+            else:
+                results.append(result[0])
+        return results
+
+    def get_images(self, keys: List[str]) -> List[Optional[Image.Image]]:
+        """RGB images for ``keys``, ``None`` where a key cannot be read or decoded."""
+        images = []
+        for result in self._fetch(keys, decoded=self.decoded):
+            if isinstance(result, Exception):
+                images.append(None)
+                continue
+            payload, shape = result
+            try:
+                if shape is not None:
+                    height, width = shape
+                    images.append(Image.frombytes('RGB', (width, height), payload))
+                else:
+                    image = Image.open(io.BytesIO(payload))
+                    images.append(image if image.mode == 'RGB' else image.convert('RGB'))
+            except Exception:
+                images.append(None)
+        return images
+
+    def stats(self) -> Optional[Dict[str, int]]:
+        """The daemon's ``CacheStats``, or ``None`` if it is not reachable."""
+        return self._request({'op': 'stats'})
+
+    def get_range(self, key: str, offset: int, length: int) -> bytes:
+        return self.backend.get_range(key, offset, length)
+
+    def put(self, key: str, data: bytes) -> None:
+        self.backend.put(key, data)
+
+    def put_stream(self, key: str, stream) -> None:
+        self.backend.put_stream(key, stream)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def list(self, prefix: str = '', page_size: int = 1000):
+        return self.backend.list(prefix, page_size)
@@ -0,0 +1,362 @@
+import abc
+import contextlib
+import functools
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from src.utils.lazy import get_client
+
+MISSING_KEY_ERRORS = ('NoSuchKey', '404', 'NotFound')
+
+
+@dataclass(frozen=True)
+class StorageSettings:
+    """Connection pool, retry and concurrency settings shared by all backends.
+
+    ``max_concurrency`` bounds the threads ``get_many`` uses per process; for
+    S3 it should not exceed ``max_pool_connections``, or requests queue for a
+    connection.
+    """
+    max_pool_connections: int = 64
+    max_attempts: int = 5
+    retry_mode: str = 'adaptive'  # botocore 'standard' or 'adaptive'
+    connect_timeout: float = 10.0
+    read_timeout: float = 60.0
+    max_concurrency: int = 32
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'StorageSettings':
+        """Settings from the ``storage_*`` keys of a TrainingConfig dict."""
+        return cls(
+            max_pool_connections=config.get('storage_max_connections', 64),
+            max_attempts=config.get('storage_max_attempts', 5),
+            max_concurrency=config.get('storage_concurrency', 32)
+        )
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+
+
+class Storage(abc.ABC):
+    """Key/value blob store used for datasets and checkpoints.
+
+    Keys are ``/``-separated paths relative to the store. A missing key
+    raises ``FileNotFoundError`` on every backend. Instances hold no
+    connections, so they can be pickled into DataLoader workers. Backends
+    implement the abstract methods; batching, files and the thread pool
+    are shared.
+    """
+
+    def __init__(self, settings: Optional[StorageSettings] = None):
+        self.settings = settings or StorageSettings()
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_pool'] = state['_pool_pid'] = state['_pool_lock'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_range(self, key: str, offset: int, length: int) -> bytes:
+        """``length`` bytes starting at ``offset`` (fewer at the end of the object)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put_stream(self, key: str, stream: BinaryIO) -> None:
+        """Write everything read from ``stream`` without holding it in memory."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key``; deleting a missing key is not an error."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list(self, prefix: str = '', page_size: int = 1000) -> Iterator[ObjectInfo]:
+        """Objects under ``prefix`` in key order, listed lazily.
+
+        Backends that list remotely fetch ``page_size`` keys per request.
+        """
+        raise NotImplementedError
+
+    def get_file(self, key: str, path: str) -> None:
+        with open(path, 'wb') as f:
+            f.write(self.get(key))
+
+    def put_file(self, key: str, path: str) -> None:
+        with open(path, 'rb') as f:
+            self.put_stream(key, f)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Threads do not survive a fork, so each process builds its own pool
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.settings.max_concurrency)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def get_many(self, keys: List[str], ignore_errors: bool = False) -> List[Optional[bytes]]:
+        """Fetch ``keys`` concurrently, returning their contents in order.
+
+        With ``ignore_errors`` a key that cannot be read yields ``None``
+        instead of raising.
+        """
+        if len(keys) <= 1:
+            return [self._get_or_none(key, ignore_errors) for key in keys]
+        return list(self._executor().map(lambda key: self._get_or_none(key, ignore_errors), keys))
+
+    def _get_or_none(self, key: str, ignore_errors: bool) -> Optional[bytes]:
+        try:
+            return self.get(key)
+        except Exception:
+            if not ignore_errors:
+                raise
+            return None
+
+
+@functools.lru_cache(maxsize=None)
+def _boto_config(settings: StorageSettings):
+    # One Config per settings keeps get_client's per-process cache effective
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=settings.max_pool_connections,
+        retries={'max_attempts': settings.max_attempts, 'mode': settings.retry_mode},
+        connect_timeout=settings.connect_timeout,
+        read_timeout=settings.read_timeout
+    )
+
+
+def _missing_key(error: Exception) -> bool:
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') in MISSING_KEY_ERRORS
+
+
+class S3Storage(Storage):
+    """Objects in one S3 bucket."""
+
+    def __init__(self, bucket: str, settings: Optional[StorageSettings] = None):
+        super().__init__(settings)
+        self.bucket = bucket
+
+    @property
+    def client(self):
+        # Cached per process, so forked workers never share a client
+        return get_client('s3', config=_boto_config(self.settings))
+
+    @contextlib.contextmanager
+    def _reading(self, key: str):
+        try:
+            yield
+        except Exception as e:
+            if _missing_key(e):
+                raise FileNotFoundError(f"s3://{self.bucket}/{key}") from e
+            raise
+
+    def get(self, key: str) -> bytes:
+        with self._reading(key):
+            return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+    def get_range(self, key: str, offset: int, length: int) -> bytes:
+        with self._reading(key):
+            response = self.client.get_object(Bucket=self.bucket, Key=key,
+                                              Range=f'bytes={offset}-{offset + length - 1}')
+            return response['Body'].read()
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def put_stream(self, key: str, stream: BinaryIO) -> None:
+        # Managed transfer: multipart with concurrent part uploads
+        self.client.upload_fileobj(stream, self.bucket, key)
+
+    def get_file(self, key: str, path: str) -> None:
+        with self._reading(key):
+            self.client.download_file(self.bucket, key, path)
+
+    def put_file(self, key: str, path: str) -> None:
+        self.client.upload_file(path, self.bucket, key)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def list(self, prefix: str = '', page_size: int = 1000) -> Iterator[ObjectInfo]:
+        pages = self.client.get_paginator('list_objects_v2').paginate(
+            Bucket=self.bucket, Prefix=prefix, PaginationConfig={'PageSize': page_size})
+        for page in pages:
+            for obj in page.get('Contents', []):
+                yield ObjectInfo(key=obj['Key'], size=obj['Size'])
+
+
+class LocalStorage(Storage):
+    """Files under a local directory, e.g. data staged on NVMe or a shared mount."""
+
+    def __init__(self, root: str, settings: Optional[StorageSettings] = None):
+        super().__init__(settings)
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, *key.split('/')))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Key escapes the storage root: {key}")
+        return path
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), 'rb') as f:
+            return f.read()
+
+    def get_range(self, key: str, offset: int, length: int) -> bytes:
+        with open(self._path(key), 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def put(self, key: str, data: bytes) -> None:
+        self._write(key, lambda f: f.write(data))
+
+    def put_stream(self, key: str, stream: BinaryIO) -> None:
+        self._write(key, lambda f: shutil.copyfileobj(stream, f, 8 * 1024 * 1024))
+
+    def _write(self, key: str, write) -> None:
+        # Readers never see a partially written object
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get_file(self, key: str, path: str) -> None:
+        shutil.copyfile(self._path(key), path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str = '', page_size: int = 1000) -> Iterator[ObjectInfo]:
+        # Only the directory that can contain matching keys is walked
+        directory = self._path(prefix.rsplit('/', 1)[0]) if '/' in prefix else self.root
+        if os.path.isdir(directory):
+            for info in self._walk(directory):
+                if info.key.startswith(prefix):
+                    yield info
+
+    def _walk(self, directory: str) -> Iterator[ObjectInfo]:
+        with os.scandir(directory) as scan:
+            # A trailing '/' sorts directories the way S3 orders their keys
+            entries = sorted(scan, key=lambda e: e.name + ('/' if e.is_dir() else ''))
+        for entry in entries:
+            if entry.is_dir():
+                yield from self._walk(entry.path)
+            elif not entry.name.endswith('.tmp'):
+                key = os.path.relpath(entry.path, self.root).replace(os.sep, '/')
+                yield ObjectInfo(key=key, size=entry.stat().st_size)
+
+
+_MEMORY_STORES: Dict[str, Dict[str, bytes]] = {}
+
+
+class MemoryStorage(Storage):
+    """Objects held in a dict, for tests and benchmarks.
+
+    Stores opened with the same ``name`` share their contents within a
+    process; nothing is shared across processes.
+    """
+
+    def __init__(self, name: Optional[str] = None, settings: Optional[StorageSettings] = None):
+        super().__init__(settings)
+        self.name = name
+        self.objects = _MEMORY_STORES.setdefault(name, {}) if name else {}
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.objects[key]
+        except KeyError:
+            raise FileNotFoundError(f"memory://{self.name or ''}/{key}") from None
+
+    def get_range(self, key: str, offset: int, length: int) -> bytes:
+        return self.get(key)[offset:offset + length]
+
+    def put(self, key: str, data: bytes) -> None:
+        self.objects[key] = bytes(data)
+
+    def put_stream(self, key: str, stream: BinaryIO) -> None:
+        self.put(key, stream.read())
+
+    def delete(self, key: str) -> None:
+        self.objects.pop(key, None)
+
+    def list(self, prefix: str = '', page_size: int = 1000) -> Iterator[ObjectInfo]:
+        for key in sorted(k for k in list(self.objects) if k.startswith(prefix)):
+            yield ObjectInfo(key=key, size=len(self.objects[key]))
+
+
+def open_storage(url: str, settings: Optional[StorageSettings] = None) -> Storage:
+    """Storage for ``s3://bucket``, ``memory://name``, ``file:///path`` or a plain path."""
+    if url.startswith('s3://'):
+        bucket = url[len('s3://'):].strip('/')
+        if not bucket or '/' in bucket:
+            raise ValueError(f"Expected s3://bucket, got {url}")
+        return S3Storage(bucket, settings)
+    if url.startswith('memory://'):
+        return MemoryStorage(url[len('memory://'):] or None, settings)
+    if url.startswith('file://'):
+        url = url[len('file://'):]
+    elif '://' in url:
+        raise ValueError(f"Unsupported storage URL: {url}")
+    return LocalStorage(url, settings)
+
+
+def storage_url(config: Dict[str, Any], kind: str) -> str:
+    """URL of the ``kind`` ('data' or 'checkpoint') storage of a TrainingConfig dict.
+
+    ``<kind>_storage`` takes precedence; otherwise ``<kind>_bucket`` on S3.
+    """
+    url = config.get(f'{kind}_storage')
+    if not url:
+        if not config.get(f'{kind}_bucket'):
+            raise ValueError(f"Neither {kind}_storage nor {kind}_bucket is configured")
+        url = f"s3://{config[f'{kind}_bucket']}"
+    return url
+
+
+def storage_from_config(config: Dict[str, Any], kind: str) -> Storage:
+    """Storage for ``kind`` ('data' or 'checkpoint') of a TrainingConfig dict.
+
+    The URL comes from ``storage_url``. With ``<kind>_cache_socket`` reads
+    go through the node's sample cache.
+    """
+    url = storage_url(config, kind)
+    settings = StorageSettings.from_config(config)
+    if config.get(f'{kind}_cache_socket'):
+        from src.utils.sample_cache import NodeCacheStorage
+        return NodeCacheStorage(url, config[f'{kind}_cache_socket'],
+                                decoded=config.get(f'{kind}_cache_decoded', False),
+                                settings=settings)
+    return open_storage(url, settings)
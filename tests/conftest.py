@@ -0,0 +1,9 @@
+import pytest
+from src.utils.lazy import reset_clients
+
+@pytest.fixture(autouse=True)
+def fresh_aws_clients():
+    """Drop cached boto3 clients so each test sees its own patches/mocks"""
+    reset_clients()
+    yield
+    reset_clients()
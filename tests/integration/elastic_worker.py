@@ -0,0 +1,68 @@
+"""Worker launched by torchrun in test_elastic.py.
+
+Rank 1 kills itself mid-epoch on the first attempt when ``KILL_AT_STEP`` is
+set; torchrun then restarts the group, which must resume from the snapshot.
+"""
+import json
+import os
+import sys
+
+import torch
+from torch.utils.data import TensorDataset
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.pipeline.elastic import get_restart_count
+from src.pipeline.trainer import DistributedTrainer
+
+
+class KillableModel(torch.nn.Module):
+    def __init__(self, kill_at_step):
+        super().__init__()
+        self.linear = torch.nn.Linear(4, 2)
+        self.calls = 0
+        self.kill_at_step = kill_at_step
+
+    def forward(self, x):
+        self.calls += 1
+        if self.calls == self.kill_at_step:
+            os._exit(1)
+        return self.linear(x)
+
+
+def main():
+    out_dir = sys.argv[1]
+    config = {
+        'batch_size': 4,
+        'epochs': 2,
+        'learning_rate': 0.1,
+        'optimizer': 'sgd',
+        'snapshot_path': os.path.join(out_dir, 'snapshot.pt'),
+        'snapshot_every': 1,
+    }
+    trainer = DistributedTrainer(config, distributed=True)
+    rank = torch.distributed.get_rank()
+
+    kill_at_step = int(os.environ.get('KILL_AT_STEP', 0))
+    if rank != 1 or get_restart_count() > 0:
+        kill_at_step = 0
+
+    torch.manual_seed(0)
+    dataset = TensorDataset(torch.randn(64, 4), torch.randint(0, 2, (64,)))
+    model = trainer.load_model(KillableModel(kill_at_step))
+    optimizer = trainer.create_optimizer(model)
+    state = trainer.fit(model, optimizer, torch.nn.CrossEntropyLoss(), dataset)
+
+    if rank == 0:
+        with open(os.path.join(out_dir, 'result.json'), 'w') as f:
+            json.dump({
+                'global_step': state.global_step,
+                'epoch': state.epoch,
+                'world_size': state.world_size,
+                'restart_count': get_restart_count(),
+                'lr': optimizer.param_groups[0]['lr'],
+            }, f)
+    torch.distributed.destroy_process_group()
+
+
+if __name__ == "__main__":
+    main()
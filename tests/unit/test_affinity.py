@@ -0,0 +1,103 @@
+import pickle
+from unittest.mock import patch
+
+import pytest
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.affinity import (
+    NumaNode,
+    cpu_topology,
+    format_cpulist,
+    loader_worker_init,
+    parse_cpulist,
+    plan_affinity,
+)
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """Two NUMA nodes of four cores each; CPU n and n + 8 are hyperthread siblings"""
+    for node, cpulist in ((0, '0-3,8-11'), (1, '4-7,12-15')):
+        (tmp_path / 'node' / f'node{node}').mkdir(parents=True)
+        (tmp_path / 'node' / f'node{node}' / 'cpulist').write_text(cpulist + '\n')
+    for cpu in range(16):
+        topology = tmp_path / 'cpu' / f'cpu{cpu}' / 'topology'
+        topology.mkdir(parents=True)
+        topology.joinpath('thread_siblings_list').write_text(f'{cpu % 8},{cpu % 8 + 8}\n')
+    return str(tmp_path)
+
+def test_cpulist_round_trip():
+    """Test kernel cpulist strings are parsed and formatted compactly"""
+    assert parse_cpulist('0-3,8,10-11\n') == [0, 1, 2, 3, 8, 10, 11]
+    assert format_cpulist([11, 0, 1, 2, 3, 8, 10]) == '0-3,8,10-11'
+
+def test_topology_groups_hyperthreads_by_node(sysfs):
+    """Test CPUs are grouped into physical cores within their NUMA node"""
+    topology = cpu_topology(sysfs, available=set(range(16)))
+    assert [node.id for node in topology] == [0, 1]
+    assert topology[0].cores == [[0, 8], [1, 9], [2, 10], [3, 11]]
+    assert topology[1].cores == [[4, 12], [5, 13], [6, 14], [7, 15]]
+
+    restricted = cpu_topology(sysfs, available={0, 1, 8})
+    assert restricted == [NumaNode(0, [[0, 8], [1]])]
+
+def test_ranks_get_disjoint_cores_on_their_node(sysfs):
+    """Test ranks are spread over nodes and never share cores with each other or loaders"""
+    topology = cpu_topology(sysfs, available=set(range(16)))
+    plans = [plan_affinity(rank, 4, num_workers=2, topology=topology) for rank in range(4)]
+
+    assert [plan.node for plan in plans] == [0, 0, 1, 1]
+    assert plans[0].compute_cpus == [0, 8] and plans[0].loader_cpus == [1, 9]
+    assert all(plan.threads == 1 for plan in plans)
+    used = [cpu for plan in plans for cpu in plan.compute_cpus + plan.loader_cpus]
+    assert sorted(used) == list(range(16))
+
+def test_single_rank_spans_all_nodes(sysfs):
+    """Test one rank on a two-node host uses every core and no single memory node"""
+    topology = cpu_topology(sysfs, available=set(range(16)))
+    plan = plan_affinity(0, 1, num_workers=2, topology=topology)
+
+    assert plan.node is None
+    assert plan.threads == 6
+    assert plan.loader_cpus == [6, 14, 7, 15]
+
+def test_too_many_ranks_raises():
+    """Test ranks without a core of their own are rejected"""
+    topology = [NumaNode(0, [[0], [1]])]
+    with pytest.raises(ValueError):
+        plan_affinity(0, 3, num_workers=0, topology=topology)
+
+def test_loader_workers_share_cores_when_scarce():
+    """Test a one-core rank runs its loader workers on its compute core"""
+    plan = plan_affinity(0, 1, num_workers=4, topology=[NumaNode(0, [[3]])])
+    assert plan.compute_cpus == [3] and plan.loader_cpus == [3]
+
+def test_worker_init_pins_single_thread(sysfs):
+    """Test loader workers are pinned to the loader cores with one thread"""
+    plan = plan_affinity(1, 2, num_workers=2,
+                         topology=cpu_topology(sysfs, available=set(range(16))))
+    init = pickle.loads(pickle.dumps(loader_worker_init(plan)))
+
+    with patch('os.sched_setaffinity', create=True) as setaffinity, \
+            patch('torch.set_num_threads') as set_num_threads, \
+            patch('src.utils.affinity._libnuma', return_value=None):
+        init(0)
+    setaffinity.assert_called_once_with(0, plan.loader_cpus)
+    set_num_threads.assert_called_once_with(1)
+
+def test_trainer_pins_cpu_ranks(sysfs, monkeypatch):
+    """Test cpu_affinity pins a CPU-only rank and its loader workers"""
+    monkeypatch.setenv('LOCAL_RANK', '1')
+    monkeypatch.setenv('LOCAL_WORLD_SIZE', '2')
+    topology = cpu_topology(sysfs, available=set(range(16)))
+    with patch('torch.cuda.is_available', return_value=False), \
+            patch('src.utils.affinity.cpu_topology', return_value=topology), \
+            patch('os.sched_setaffinity', create=True) as setaffinity, \
+            patch('torch.set_num_threads') as set_num_threads, \
+            patch('src.utils.affinity._libnuma', return_value=None):
+        trainer = DistributedTrainer({'checkpoint_bucket': 'test-bucket', 'batch_size': 32,
+                                      'num_workers': 2, 'cpu_affinity': True})
+
+    assert trainer.cpu_plan.node == 1
+    setaffinity.assert_called_once_with(0, [4, 12, 5, 13])
+    set_num_threads.assert_called_once_with(2)
+    assert trainer.worker_init_fn is not None
+    assert DistributedTrainer({'checkpoint_bucket': 'b'}).worker_init_fn is None
@@ -0,0 +1,91 @@
+import pytest
+import torch
+from unittest.mock import patch
+from src.pipeline.batch_finder import find_batch_size, write_batch_size, _candidate_sizes
+from src.pipeline.trainer import DistributedTrainer
+
+@pytest.fixture
+def trainer():
+    with patch('boto3.client'):
+        yield DistributedTrainer({'learning_rate': 0.01}, distributed=False)
+
+def test_find_batch_size_respects_memory_limit(trainer, monkeypatch):
+    """Test the search stops at the largest batch under a simulated limit"""
+    model = torch.nn.Sequential(torch.nn.Flatten(), torch.nn.Linear(12, 4))
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    original = trainer.train_step
+
+    def limited_step(model, batch, optimizer, criterion):
+        if batch[0].shape[0] > 37:
+            raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        return original(model, batch, optimizer, criterion)
+
+    monkeypatch.setattr(trainer, 'train_step', limited_step)
+    weights = model[1].weight.detach().clone()
+
+    result = find_batch_size(trainer, model, optimizer, torch.nn.CrossEntropyLoss(),
+                             input_shape=(3, 2, 2), num_classes=4,
+                             warmup_steps=1, timed_steps=1)
+
+    assert result.max_batch_size == 37
+    assert result.batch_size in result.throughput
+    assert max(result.throughput) == 37
+    assert torch.equal(model[1].weight, weights)
+
+def test_find_batch_size_reraises_other_errors(trainer, monkeypatch):
+    """Test non-OOM errors are not mistaken for a memory limit"""
+    model = torch.nn.Linear(4, 2)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+
+    def broken_step(*args):
+        raise RuntimeError("shape mismatch")
+
+    monkeypatch.setattr(trainer, 'train_step', broken_step)
+    with pytest.raises(RuntimeError, match="shape mismatch"):
+        find_batch_size(trainer, model, optimizer, torch.nn.CrossEntropyLoss(),
+                        input_shape=(4,), num_classes=2)
+
+def test_candidate_sizes():
+    """Test throughput candidates span half the limit up to the limit"""
+    assert _candidate_sizes(64, 4) == [32, 43, 53, 64]
+    assert _candidate_sizes(1, 4) == [1]
+
+def test_write_batch_size_preserves_layout(tmp_path):
+    """Test nested production-style configs are edited in place"""
+    config = tmp_path / 'production.yml'
+    config.write_text("data:\n  train_prefix: \"train/\"\n  batch_size: 64  # per rank\n")
+    write_batch_size(str(config), 96)
+    assert config.read_text() == "data:\n  train_prefix: \"train/\"\n  batch_size: 96  # per rank\n"
+
+def test_write_batch_size_appends_missing_key(tmp_path):
+    """Test a batch_size key is added when absent"""
+    config = tmp_path / 'config.yml'
+    config.write_text("learning_rate: 0.001\n")
+    write_batch_size(str(config), 48)
+    assert config.read_text() == "learning_rate: 0.001\nbatch_size: 48\n"
+
+def test_find_batch_size_skips_probes_projected_over_budget(trainer, monkeypatch):
+    """Test sizes extrapolated past the memory budget are never run"""
+    import src.pipeline.batch_finder as batch_finder
+    model = torch.nn.Sequential(torch.nn.Flatten(), torch.nn.Linear(12, 4))
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    original = trainer.train_step
+    probed = []
+    current = {}
+
+    def recording_step(model, batch, optimizer, criterion):
+        probed.append(batch[0].shape[0])
+        current['batch_size'] = batch[0].shape[0]
+        return original(model, batch, optimizer, criterion)
+
+    monkeypatch.setattr(trainer, 'train_step', recording_step)
+    # 100 MB fixed plus 10 MB per sample
+    monkeypatch.setattr(batch_finder, '_peak_memory_mb',
+                        lambda device: 100 + 10 * current['batch_size'])
+
+    result = find_batch_size(trainer, model, optimizer, torch.nn.CrossEntropyLoss(),
+                             input_shape=(3, 2, 2), num_classes=4, memory_budget_mb=500,
+                             candidates=1, warmup_steps=0, timed_steps=1)
+
+    assert result.max_batch_size == 40
+    assert max(probed) == 40
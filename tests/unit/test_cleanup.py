@@ -0,0 +1,55 @@
+import boto3
+import pytest
+from moto import mock_aws
+from unittest.mock import MagicMock
+from src.utils.aws import delete_all_objects, delete_batch
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        yield boto3.client('s3', region_name='us-east-1')
+
+def test_deletes_beyond_first_page(s3):
+    """Test every key is deleted, not just the first listing page"""
+    s3.create_bucket(Bucket='data')
+    for i in range(250):
+        s3.put_object(Bucket='data', Key=f'train/class_0/{i}.jpg', Body=b'x')
+
+    stats = delete_all_objects(s3, 'data', max_workers=4, batch_size=100)
+
+    assert stats.deleted == 250
+    assert stats.failed == 0
+    assert 'Contents' not in s3.list_objects_v2(Bucket='data')
+    s3.delete_bucket(Bucket='data')
+
+def test_deletes_versions_and_delete_markers(s3):
+    """Test versioned buckets are emptied so the bucket itself can be deleted"""
+    s3.create_bucket(Bucket='checkpoints')
+    s3.put_bucket_versioning(Bucket='checkpoints',
+                             VersioningConfiguration={'Status': 'Enabled'})
+    for _ in range(3):
+        s3.put_object(Bucket='checkpoints', Key='checkpoints/epoch_1.pt', Body=b'x')
+    s3.delete_object(Bucket='checkpoints', Key='checkpoints/epoch_1.pt')
+
+    stats = delete_all_objects(s3, 'checkpoints', batch_size=2)
+
+    assert stats.deleted == 4  # three versions and one delete marker
+    s3.delete_bucket(Bucket='checkpoints')
+
+def test_partial_failures_are_retried():
+    """Test keys that fail with a transient error are retried on their own"""
+    s3 = MagicMock()
+    s3.delete_objects.side_effect = [
+        {'Errors': [{'Key': 'b', 'Code': 'SlowDown'}, {'Key': 'c', 'Code': 'AccessDenied'}]},
+        {},
+    ]
+    deleted, errors = delete_batch(s3, 'data', [{'Key': 'a'}, {'Key': 'b'}, {'Key': 'c'}],
+                                   base_delay=0)
+
+    assert deleted == 2
+    assert [e['Key'] for e in errors] == ['c']
+    retried = s3.delete_objects.call_args_list[1].kwargs['Delete']['Objects']
+    assert retried == [{'Key': 'b'}]
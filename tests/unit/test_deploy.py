@@ -0,0 +1,83 @@
+import os
+import time
+import pytest
+import yaml
+from moto import mock_aws
+from scripts.deploy import create_clients, reconcile
+from src.utils.aws import APPLIED, FAILED, SKIPPED, UNCHANGED, Resource, ResourceGraph, matches
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'production.yml')
+
+@pytest.fixture
+def config():
+    with open(CONFIG_PATH) as f:
+        return yaml.safe_load(f)
+
+@pytest.fixture
+def aws(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        yield
+
+def test_deploy_is_idempotent(config, aws):
+    """Test a second deploy with no changes touches nothing and is fast"""
+    clients = create_clients('us-east-1')
+    first = reconcile(config, clients)
+    assert set(first.values()) == {APPLIED}
+
+    start = time.perf_counter()
+    second = reconcile(config, clients)
+    assert set(second.values()) == {UNCHANGED}
+    assert time.perf_counter() - start < 2.0
+
+def test_deploy_applies_only_changed_resources(config, aws):
+    """Test a changed alarm threshold re-applies just that alarm"""
+    clients = create_clients('us-east-1')
+    reconcile(config, clients)
+
+    config['monitoring']['alerts'][0]['condition'] = '> 7.5'
+    status = reconcile(config, clients)
+    changed = [name for name, s in status.items() if s == APPLIED]
+    assert changed == ['alarm:MLTraining_training_loss']
+
+    alarm = clients['cloudwatch'].describe_alarms(
+        AlarmNames=['MLTraining_training_loss'])['MetricAlarms'][0]
+    assert alarm['Threshold'] == 7.5
+
+def test_graph_skips_dependents_of_failures():
+    """Test resources downstream of a failure are skipped, others still run"""
+    applied = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    graph = ResourceGraph([
+        Resource('root', read=lambda: None, apply=fail),
+        Resource('child', read=lambda: None, apply=lambda: applied.append('child'),
+                 depends_on=['root']),
+        Resource('other', read=lambda: None, apply=lambda: applied.append('other')),
+    ])
+    status = graph.apply()
+    assert status == {'root': FAILED, 'child': SKIPPED, 'other': APPLIED}
+    assert applied == ['other']
+
+def test_graph_runs_independent_resources_concurrently():
+    """Test independent slow resources overlap instead of running serially"""
+    resources = [Resource(f'r{i}', read=lambda: None, apply=lambda: time.sleep(0.2))
+                 for i in range(5)]
+    start = time.perf_counter()
+    ResourceGraph(resources, max_workers=5).apply()
+    assert time.perf_counter() - start < 0.6
+
+def test_graph_rejects_unknown_dependency():
+    """Test a dependency on an undeclared resource is an error"""
+    with pytest.raises(ValueError):
+        ResourceGraph([Resource('a', read=lambda: None, apply=lambda: None, depends_on=['b'])])
+
+def test_matches_compares_desired_keys_only():
+    """Test state diffing ignores keys the desired state does not mention"""
+    assert matches({'a': 1, 'b': {'c': 2, 'd': 3}}, {'b': {'c': 2}})
+    assert not matches({'a': 1}, {'a': 2})
+    assert not matches({'a': 1}, {'b': 1})
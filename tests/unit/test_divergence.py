@@ -0,0 +1,81 @@
+import pytest
+import torch
+from torch.utils.data import TensorDataset
+from unittest.mock import patch
+from src.pipeline.divergence import DivergenceGuard
+from src.pipeline.trainer import DistributedTrainer
+
+def test_guard_flags_non_finite_and_thresholds():
+    """Test NaN losses and threshold breaches are flagged and the flag resets"""
+    guard = DivergenceGuard(loss_threshold=5.0, grad_norm_threshold=100.0)
+    guard.observe(torch.tensor(1.0), torch.tensor(2.0))
+    assert not guard.diverged()
+
+    guard.observe(torch.tensor(float('nan')), torch.tensor(2.0))
+    guard.observe(torch.tensor(1.0), torch.tensor(2.0))
+    assert guard.diverged()
+    assert not guard.diverged()
+
+    guard.observe(torch.tensor(6.0), torch.tensor(2.0))
+    assert guard.diverged()
+    guard.observe(torch.tensor(1.0), torch.tensor(float('inf')))
+    assert guard.diverged()
+
+def test_rollback_restores_snapshot():
+    """Test rollback restores weights and optimizer state and lowers the LR"""
+    model = torch.nn.Linear(4, 2)
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.1)
+    guard = DivergenceGuard(lr_factor=0.5)
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+    guard.snapshot(model, optimizer)
+    weights = model.weight.detach().clone()
+    exp_avg = optimizer.state[model.weight]['exp_avg'].clone()
+
+    for _ in range(2):
+        optimizer.zero_grad()
+        model(torch.randn(3, 4)).sum().backward()
+        optimizer.step()
+        guard.rollback(model, optimizer)
+        assert torch.equal(model.weight, weights)
+        assert torch.equal(optimizer.state[model.weight]['exp_avg'], exp_avg)
+
+    assert optimizer.param_groups[0]['lr'] == pytest.approx(0.025)
+
+def test_rollback_limit():
+    """Test repeated divergence eventually stops training"""
+    model = torch.nn.Linear(4, 2)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+    guard = DivergenceGuard(max_rollbacks=1)
+    guard.snapshot(model, optimizer)
+    guard.rollback(model, optimizer)
+    with pytest.raises(RuntimeError):
+        guard.rollback(model, optimizer)
+
+def test_fit_skips_poisoned_window(tmp_path):
+    """Test a NaN batch is rolled back and training finishes with finite weights"""
+    torch.manual_seed(0)
+    data = torch.randn(32, 4)
+    data[5] = float('nan')
+    dataset = TensorDataset(data, torch.randint(0, 2, (32,)))
+    config = {
+        'batch_size': 4,
+        'epochs': 2,
+        'learning_rate': 0.1,
+        'optimizer': 'sgd',
+        'snapshot_path': str(tmp_path / 'snapshot.pt'),
+        'keep_snapshot': True,
+        'divergence_guard': True,
+        'divergence_check_every': 2
+    }
+    with patch('boto3.client'):
+        trainer = DistributedTrainer(config, distributed=False)
+        model = torch.nn.Linear(4, 2)
+        state = trainer.fit(model, trainer.create_optimizer(model),
+                            torch.nn.CrossEntropyLoss(), dataset)
+
+    assert state.global_step == 16
+    # The poisoned sample is seen once per epoch
+    assert trainer.guard.rollbacks == 2
+    assert torch.isfinite(model.weight).all()
+    assert torch.isfinite(torch.load(config['snapshot_path'])['model_state_dict']['weight']).all()
@@ -0,0 +1,99 @@
+import os
+import pytest
+import torch
+from torch.utils.data import TensorDataset
+from unittest.mock import patch
+from src.pipeline.elastic import ElasticDistributedSampler, rescale_learning_rate
+from src.pipeline.trainer import DistributedTrainer
+
+@pytest.fixture
+def elastic_config(tmp_path):
+    return {
+        'batch_size': 4,
+        'epochs': 2,
+        'learning_rate': 0.1,
+        'optimizer': 'sgd',
+        'snapshot_path': str(tmp_path / 'snapshot.pt'),
+        'snapshot_every': 1
+    }
+
+@pytest.fixture
+def dataset():
+    torch.manual_seed(0)
+    return TensorDataset(torch.randn(16, 4), torch.randint(0, 2, (16,)))
+
+class FailingModel(torch.nn.Module):
+    """Linear model that raises after a fixed number of forward calls."""
+    def __init__(self, fail_after):
+        super().__init__()
+        self.linear = torch.nn.Linear(4, 2)
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def forward(self, x):
+        self.calls += 1
+        if self.calls > self.fail_after:
+            raise RuntimeError("node lost")
+        return self.linear(x)
+
+def test_sampler_reshards_remaining_samples():
+    """Test resuming mid-epoch on a new world size covers exactly the rest"""
+    data = list(range(20))
+    full = list(ElasticDistributedSampler(data, num_replicas=1, rank=0, seed=3))
+
+    resumed = []
+    for rank in range(3):
+        sampler = ElasticDistributedSampler(data, num_replicas=3, rank=rank, seed=3)
+        sampler.set_start_index(8)
+        assert len(sampler) == 4
+        resumed.extend(sampler)
+
+    assert sorted(set(resumed)) == sorted(full[8:])
+    assert len(resumed) == 12
+
+def test_sampler_past_end_is_empty():
+    """Test a start index at the end of the epoch yields nothing"""
+    sampler = ElasticDistributedSampler(list(range(5)), num_replicas=2, rank=1)
+    sampler.set_start_index(5)
+    assert list(sampler) == []
+
+def test_rescale_learning_rate():
+    """Test linear LR scaling when the world size changes"""
+    optimizer = torch.optim.SGD(torch.nn.Linear(2, 2).parameters(), lr=0.4)
+    rescale_learning_rate(optimizer, 4, 1)
+    assert optimizer.param_groups[0]['lr'] == pytest.approx(0.1)
+
+def test_fit_resumes_from_snapshot(elastic_config, dataset):
+    """Test training interrupted mid-epoch resumes where it stopped"""
+    with patch('boto3.client'):
+        trainer = DistributedTrainer(elastic_config, distributed=False)
+        model = FailingModel(fail_after=3)
+        optimizer = trainer.create_optimizer(model)
+        with pytest.raises(RuntimeError, match="node lost"):
+            trainer.fit(model, optimizer, torch.nn.CrossEntropyLoss(), dataset)
+
+        restarted = FailingModel(fail_after=100)
+        state = trainer.fit(restarted, trainer.create_optimizer(restarted),
+                            torch.nn.CrossEntropyLoss(), dataset)
+
+    # 16 samples / batch 4 = 4 steps per epoch; 3 ran before the failure
+    assert restarted.calls == 5
+    assert state.epoch == 2
+    assert state.global_step == 8
+
+def test_snapshot_removed_when_fit_completes(elastic_config, dataset):
+    """Test a finished run leaves no snapshot for the next run to resume from"""
+    with patch('boto3.client'):
+        trainer = DistributedTrainer(elastic_config, distributed=False)
+        model = torch.nn.Linear(4, 2)
+        trainer.fit(model, trainer.create_optimizer(model), torch.nn.CrossEntropyLoss(), dataset)
+
+    assert not os.path.exists(elastic_config['snapshot_path'])
+
+def test_default_snapshot_path_is_per_run(monkeypatch):
+    """Test the default snapshot path is named after torchrun's run id"""
+    monkeypatch.setenv('TORCHELASTIC_RUN_ID', 'job-7')
+    assert DistributedTrainer({}, distributed=False)._snapshot_path() == \
+        '/tmp/elastic_snapshot_job-7.pt'
+    assert DistributedTrainer({'run_id': 'sweep'}, distributed=False)._snapshot_path() == \
+        '/tmp/elastic_snapshot_sweep.pt'
@@ -0,0 +1,120 @@
+import csv
+import io
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+import torch
+from moto import mock_aws
+from PIL import Image
+from torch.utils.data import TensorDataset
+from src.models.resnet import create_model
+from src.pipeline.data_loader import S3Dataset, normalize_images
+from src.pipeline.evaluation import (
+    CheckpointResult,
+    evaluate_checkpoints,
+    list_checkpoints,
+    load_val_set,
+    prune_checkpoints,
+    rank_results,
+    write_results,
+)
+from src.utils.storage import MemoryStorage
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='checkpoints')
+        yield client
+
+def _upload(s3, tmp_path, epoch, state_dict):
+    path = tmp_path / f'epoch_{epoch}.pt'
+    torch.save({'epoch': epoch, 'model_state_dict': state_dict}, path)
+    s3.upload_file(str(path), 'checkpoints', f'checkpoints/epoch_{epoch}.pt')
+
+def test_load_val_set_is_shared():
+    """Test the decoded val set lands in shared memory in order"""
+    dataset = TensorDataset(torch.randn(10, 3, 8, 8), torch.arange(10))
+    images, labels = load_val_set(dataset, batch_size=4, num_workers=0)
+
+    assert images.is_shared() and labels.is_shared()
+    assert torch.equal(labels, torch.arange(10))
+
+def test_val_set_keeps_uint8_pixels():
+    """Test a uint8 val set normalizes to exactly the float samples"""
+    storage = MemoryStorage()
+    for i in range(3):
+        buffer = io.BytesIO()
+        Image.new('RGB', (40, 30), (60 * i, 20, 200)).save(buffer, format='JPEG')
+        storage.put(f'val/class_{i}/{i}.jpg', buffer.getvalue())
+
+    images, labels = load_val_set(S3Dataset(None, prefix='val/', storage=storage, normalize=False),
+                                  batch_size=2, num_workers=0)
+    expected, _ = load_val_set(S3Dataset(None, prefix='val/', storage=storage),
+                               batch_size=2, num_workers=0)
+
+    assert images.dtype == torch.uint8
+    assert torch.allclose(normalize_images(images), expected, atol=1e-5)
+    assert torch.equal(labels, torch.arange(3))
+
+def test_evaluate_ranks_checkpoints(s3, tmp_path):
+    """Test checkpoints are evaluated in a pool and ranked by accuracy"""
+    torch.manual_seed(0)
+    images = torch.randn(16, 3, 32, 32)
+    model = create_model('resnet18', num_classes=2).eval()
+    with torch.no_grad():
+        labels = model(images).argmax(1)
+    images, labels = images.share_memory_(), labels.share_memory_()
+
+    # Negating the classifier flips every two-class prediction
+    flipped = {k: -v if k.startswith('fc.') else v for k, v in model.state_dict().items()}
+    _upload(s3, tmp_path, 1, flipped)
+    # DDP checkpoints carry a "module." prefix
+    _upload(s3, tmp_path, 2, {f'module.{k}': v for k, v in model.state_dict().items()})
+    s3.put_object(Bucket='checkpoints', Key='checkpoints/emergency.pt', Body=b'x')
+
+    checkpoints = list_checkpoints(s3, 'checkpoints')
+    assert [epoch for epoch, _ in checkpoints] == [1, 2]
+
+    results = evaluate_checkpoints(s3, 'checkpoints', checkpoints, images, labels,
+                                   'resnet18', 2, workers=2, batch_size=8,
+                                   tmp_dir=str(tmp_path))
+    assert [r.epoch for r in results] == [2, 1]
+    assert results[0].accuracy == 100.0
+    assert results[1].accuracy == 0.0
+
+def test_write_and_prune(s3, tmp_path):
+    """Test the ranked table is written and only the top k survive pruning"""
+    results = rank_results([
+        CheckpointResult(f'checkpoints/epoch_{e}.pt', e, loss=1.0, accuracy=acc, eval_seconds=0.1)
+        for e, acc in [(1, 50.0), (2, 80.0), (3, 70.0)]
+    ])
+    for r in results:
+        s3.put_object(Bucket='checkpoints', Key=r.key, Body=b'x')
+
+    write_results(results, str(tmp_path / 'results.csv'))
+    with open(tmp_path / 'results.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['epoch'] for row in rows] == ['2', '3', '1']
+
+    assert prune_checkpoints(s3, 'checkpoints', results, keep_top_k=2) == ['checkpoints/epoch_1.pt']
+    assert [e for e, _ in list_checkpoints(s3, 'checkpoints')] == [2, 3]
+
+def test_prune_reports_keys_that_were_not_deleted():
+    """Test per-key delete errors are retried or reported, not counted as pruned"""
+    s3 = MagicMock()
+    s3.delete_objects.side_effect = [
+        {'Errors': [{'Key': 'checkpoints/epoch_1.pt', 'Code': 'SlowDown'},
+                    {'Key': 'checkpoints/epoch_2.pt', 'Code': 'AccessDenied'}]},
+        {},
+    ]
+    results = [CheckpointResult(f'checkpoints/epoch_{e}.pt', e, loss=1.0, accuracy=90.0 - e,
+                                eval_seconds=0.1) for e in range(4)]
+
+    deleted = prune_checkpoints(s3, 'checkpoints', results, keep_top_k=1)
+    assert deleted == ['checkpoints/epoch_1.pt', 'checkpoints/epoch_3.pt']
+    assert s3.delete_objects.call_count == 2
@@ -0,0 +1,82 @@
+import pytest
+import torch
+from unittest.mock import patch
+from src.models.resnet import create_model
+from src.pipeline.export import export_model, load_exported, load_model_from_checkpoint
+from src.pipeline.trainer import DistributedTrainer
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return create_model('resnet18', num_classes=4).eval()
+
+@pytest.fixture
+def val_batches(model):
+    images = torch.randn(32, 3, 32, 32)
+    with torch.no_grad():
+        labels = model(images).argmax(1)
+    return [(images[i:i + 8], labels[i:i + 8]) for i in range(0, 32, 8)]
+
+def test_torchscript_export_matches_eager(model, val_batches, tmp_path):
+    """Test the frozen TorchScript artifact reproduces the eager model"""
+    report = export_model(model, str(tmp_path / 'model.pt'), val_batches)
+
+    assert report.fp32_accuracy == 100.0
+    assert report.accuracy_delta == pytest.approx(0.0)
+    exported = load_exported(report.path)
+    images = val_batches[0][0]
+    with torch.no_grad():
+        assert torch.allclose(exported(images), model(images), atol=1e-4)
+
+@pytest.mark.parametrize('quantization', ['dynamic', 'static'])
+def test_quantized_export_is_usable_in_validate(model, val_batches, tmp_path, quantization):
+    """Test int8 artifacts load back and run through validate"""
+    report = export_model(model, str(tmp_path / f'{quantization}.pt'), val_batches,
+                          quantization=quantization, calibration_batches=2,
+                          calibration_loader=val_batches[2:])
+
+    assert report.quantization == quantization
+    assert report.speedup > 0
+    trainer = DistributedTrainer({}, distributed=False)
+    loss, accuracy = trainer.validate(load_exported(report.path), val_batches)
+    assert accuracy == report.accuracy
+
+def test_validation_batches_are_streamed(model, val_batches, tmp_path):
+    """Test batches are compared as they load and calibration batches are left out"""
+    events = []
+
+    def loader():
+        for index, batch in enumerate(val_batches):
+            events.append(f'load {index}')
+            yield batch
+
+    def recording_load(path):
+        exported = load_exported(path)
+
+        def forward(data):
+            events.append('run')
+            return exported(data)
+        return forward
+
+    with patch('src.pipeline.export.load_exported', recording_load):
+        report = export_model(model, str(tmp_path / 'static.pt'), loader(),
+                              quantization='static', calibration_batches=1)
+
+    # Batch 0 only calibrates; batch 1 also gets the untimed warm-up run
+    assert events == ['load 0', 'load 1', 'run', 'run', 'load 2', 'run', 'load 3', 'run']
+    assert report.fp32_accuracy == 100.0
+
+def test_load_model_from_ddp_checkpoint(model, tmp_path):
+    """Test checkpoints of DDP-wrapped models load into a plain model"""
+    path = tmp_path / 'epoch_1.pt'
+    torch.save({'epoch': 1, 'model_state_dict':
+                {f'module.{k}': v for k, v in model.state_dict().items()}}, path)
+
+    restored = load_model_from_checkpoint(str(path), 'resnet18', 4)
+    assert not restored.training
+    assert torch.equal(restored.fc.weight, model.fc.weight)
+
+def test_unknown_format_rejected(model, val_batches, tmp_path):
+    """Test unsupported export formats raise"""
+    with pytest.raises(ValueError):
+        export_model(model, str(tmp_path / 'model.trt'), val_batches, format='tensorrt')
@@ -0,0 +1,101 @@
+import json
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+from src.utils.ingest import discover_files, ingest_directory, s3_etag
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='data')
+        yield client
+
+@pytest.fixture
+def dataset(tmp_path):
+    for label in range(2):
+        class_dir = tmp_path / f'class_{label}'
+        class_dir.mkdir()
+        for i in range(10):
+            (class_dir / f'{i}.jpg').write_bytes(f'{label}-{i}'.encode())
+    (tmp_path / 'class_0' / 'notes.txt').write_text('not an image')
+    return tmp_path
+
+def test_discover_maps_classes_to_split_layout(dataset):
+    """Test files land under <split>/class_<N>/ and non-images are ignored"""
+    files = discover_files(str(dataset), val_fraction=0.3)
+
+    assert len(files) == 20
+    assert {f.split for f in files} == {'train', 'val'}
+    for f in files:
+        assert f.key.startswith(f"{f.split}/class_{f.label}/")
+    # The split is stable across runs
+    assert [f.key for f in discover_files(str(dataset), 0.3)] == [f.key for f in files]
+
+def test_discover_flattens_nested_files(dataset):
+    """Test files in class subdirectories keep the class as their parent"""
+    (dataset / 'class_1' / 'sub').mkdir()
+    (dataset / 'class_1' / 'sub' / 'x.jpg').write_bytes(b'nested')
+
+    nested, = [f for f in discover_files(str(dataset)) if f.path.endswith('x.jpg')]
+    assert nested.key == f"{nested.split}/class_1/sub__x.jpg"
+
+def test_presplit_labels_use_classes_of_both_splits(tmp_path):
+    """Test a class missing from val/ does not shift the val/ labels"""
+    for split, classes in (('train', ['cat', 'dog']), ('val', ['dog'])):
+        for class_name in classes:
+            (tmp_path / split / class_name).mkdir(parents=True)
+            (tmp_path / split / class_name / '0.jpg').write_bytes(f'{split}-{class_name}'.encode())
+
+    labels = {(f.split, f.path.split(os.sep)[-2]): f.label for f in discover_files(str(tmp_path))}
+    assert labels == {('train', 'cat'): 0, ('train', 'dog'): 1, ('val', 'dog'): 1}
+
+def test_ingest_is_idempotent(s3, dataset, tmp_path):
+    """Test a second run skips everything that is already uploaded"""
+    state = str(tmp_path / 'state.jsonl')
+    first = ingest_directory(s3, str(dataset), 'data', workers=4, state_path=state)
+    assert first.uploaded == 20 and first.failed == 0
+
+    second = ingest_directory(s3, str(dataset), 'data', workers=4, state_path=state)
+    assert second.skipped == 20
+    assert second.uploaded == 0
+
+def test_duplicate_content_is_copied(s3, dataset):
+    """Test identical files are uploaded once and copied server-side"""
+    (dataset / 'class_1' / 'dup.jpg').write_bytes(b'0-0')
+
+    stats = ingest_directory(s3, str(dataset), 'data', workers=4)
+
+    assert stats.uploaded == 20
+    assert stats.copied == 1
+
+def test_multipart_etag_matches_s3(s3, tmp_path):
+    """Test the locally computed multipart ETag matches the uploaded object"""
+    (tmp_path / 'class_0').mkdir()
+    path = tmp_path / 'class_0' / 'big.png'
+    path.write_bytes(os.urandom(6 * 2**20))
+    threshold = chunk = 5 * 2**20
+
+    ingest_directory(s3, str(tmp_path), 'data', multipart_threshold=threshold,
+                     multipart_chunksize=chunk, val_fraction=0.0)
+
+    remote = s3.head_object(Bucket='data', Key='train/class_0/big.png')['ETag'].strip('"')
+    assert remote == s3_etag(str(path), threshold, chunk)
+    assert remote.endswith('-2')
+
+def test_manifest_lists_every_file(s3, dataset):
+    """Test the manifests cover both splits with labels"""
+    ingest_directory(s3, str(dataset), 'data', workers=4, val_fraction=0.3,
+                     write_manifest=True)
+
+    entries = []
+    for split in ('train', 'val'):
+        body = s3.get_object(Bucket='data', Key=f'manifests/{split}.jsonl')['Body'].read()
+        entries += [json.loads(line) for line in body.decode().splitlines() if line]
+    assert len(entries) == 20
+    assert {e['label'] for e in entries} == {0, 1}
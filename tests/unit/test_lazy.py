@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import src.utils.lazy as lazy
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.lazy import get_client
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+
+def test_import_defers_heavy_dependencies():
+    """Test importing the trainer and data loader loads neither boto3 nor torchvision"""
+    code = ("import sys, src.pipeline.trainer, src.pipeline.data_loader; "
+            "print('botocore' in sys.modules, 'torchvision.transforms' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['False', 'False']
+
+def test_import_order_does_not_matter():
+    """Test the data loader can be imported before the trainer and FSDP still loads"""
+    code = ("import src.pipeline.data_loader as data_loader, src.pipeline.trainer as trainer; "
+            "data_loader.S3Dataset('data', prefix='train/').transform; "
+            "print(trainer._fsdp().FullyShardedDataParallel.__name__)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['FullyShardedDataParallel']
+
+def test_clients_are_cached_per_process(monkeypatch):
+    """Test one client per service per process, recreated after a fork"""
+    with patch('boto3.client', side_effect=lambda *a, **kw: object()) as mock_client:
+        first = get_client('s3')
+        assert get_client('s3') is first
+        assert get_client('cloudwatch') is not first
+
+        monkeypatch.setattr(lazy, '_clients_pid', -1)  # as seen from a forked child
+        assert get_client('s3') is not first
+    assert mock_client.call_count == 3
+
+def test_dataset_lists_on_first_use():
+    """Test S3Dataset neither creates a client nor lists S3 until it is used"""
+    with patch('boto3.client') as mock_client:
+        s3 = mock_client.return_value
+        s3.get_paginator.return_value.paginate.return_value = [
+            {'Contents': [{'Key': 'train/class_3/a.jpg', 'Size': 1}]}]
+
+        dataset = S3Dataset('data', prefix='train/')
+        mock_client.assert_not_called()
+
+        assert len(dataset) == 1
+        assert dataset.image_list == [('train/class_3/a.jpg', 3)]
+        s3.get_paginator.assert_called_once_with('list_objects_v2')
+
+def test_trainer_creates_client_on_first_use():
+    """Test DistributedTrainer defers the S3 client until a checkpoint needs it"""
+    with patch('boto3.client') as mock_client:
+        trainer = DistributedTrainer({'checkpoint_bucket': 'b'}, distributed=False)
+        mock_client.assert_not_called()
+        assert trainer.s3_client is mock_client.return_value
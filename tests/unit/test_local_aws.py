@@ -0,0 +1,50 @@
+import time
+
+import boto3
+from scripts.benchmark_suite import compare, metric
+from src.utils.lazy import get_client
+from src.utils.local_aws import local_aws
+
+def test_latency_and_bandwidth_are_injected():
+    """Test each request pays latency plus transfer time, both ways"""
+    with local_aws(latency=0.05, bandwidth_mbps=8) as network:  # 1 MB/s
+        s3 = boto3.client('s3')
+        s3.create_bucket(Bucket='data')
+        start = time.perf_counter()
+        s3.put_object(Bucket='data', Key='a', Body=b'x' * 100_000)
+        assert time.perf_counter() - start >= 0.15
+
+        start = time.perf_counter()
+        assert s3.get_object(Bucket='data', Key='a')['Body'].read() == b'x' * 100_000
+        assert time.perf_counter() - start >= 0.15
+        assert network.requests == 3
+
+def test_cached_clients_use_local_aws():
+    """Test get_client reaches moto inside the block and the session is reset after"""
+    with local_aws():
+        get_client('s3').create_bucket(Bucket='data')
+        cloudwatch = get_client('cloudwatch')
+        cloudwatch.put_metric_data(Namespace='MLTraining',
+                                   MetricData=[{'MetricName': 'training_loss', 'Value': 1.0}])
+        metrics = cloudwatch.list_metrics(Namespace='MLTraining')['Metrics']
+        names = [m['MetricName'] for m in metrics]
+        assert names == ['training_loss']
+    assert boto3.DEFAULT_SESSION is None
+
+def test_compare_flags_regressions_in_both_directions():
+    """Test slower times and lower throughput beyond tolerance are flagged"""
+    baseline = {'results': {
+        'train_step_ms': metric(100.0, 'ms', False),
+        'dataset_getitem_samples_per_s': metric(50.0, 'samples/s', True),
+        'checkpoint_save_s': metric(1.0, 's', False),
+    }}
+    current = {'results': {
+        'train_step_ms': metric(120.0, 'ms', False),
+        'dataset_getitem_samples_per_s': metric(40.0, 'samples/s', True),
+        'checkpoint_save_s': metric(1.05, 's', False),
+        'new_metric': metric(1.0, 's', False),
+    }}
+
+    regressions = compare(baseline, current, tolerance=0.1)
+    assert len(regressions) == 2
+    assert regressions[0].startswith('train_step_ms')
@@ -1,4 +1,6 @@
+import pytest
 import torch
+from src.models.resnet import MODEL_REGISTRY, create_model
 from tests.unit.test_pipeline import SimpleModel
 
 def test_model_forward():
@@ -12,4 +14,83 @@ def test_model_forward():
     assert output.shape == (batch_size, 10)
     
     # Check that output is valid (no NaN values)
-    assert not torch.isnan(output).any()
\ No newline at end of file
+    assert not torch.isnan(output).any()
+
+@pytest.mark.parametrize('model_name', sorted(MODEL_REGISTRY))
+def test_resnet_registry(model_name):
+    """Test every registered ResNet builds and produces class logits"""
+    model = create_model(model_name, num_classes=10)
+    output = model(torch.randn(2, 3, 64, 64))
+    assert output.shape == (2, 10)
+
+def test_unknown_model_name():
+    """Test registry lookup rejects unknown names"""
+    with pytest.raises(ValueError):
+        create_model('vgg16')
+
+def test_activation_checkpointing_matches_gradients():
+    """Test checkpointed stages give the same gradients as the plain model"""
+    torch.manual_seed(0)
+    plain = create_model('resnet18', num_classes=10)
+    checkpointed = create_model('resnet18', num_classes=10, checkpoint_stages=[1, 2, 3, 4])
+    checkpointed.load_state_dict(plain.state_dict())
+
+    data = torch.randn(2, 3, 64, 64)
+    plain(data).sum().backward()
+    checkpointed(data).sum().backward()
+    assert torch.allclose(plain.fc.weight.grad, checkpointed.fc.weight.grad, atol=1e-5)
+    assert torch.allclose(plain.conv1.weight.grad, checkpointed.conv1.weight.grad, atol=1e-4)
+
+def test_channels_last_model():
+    """Test channels_last weights and matching outputs"""
+    torch.manual_seed(0)
+    model = create_model('resnet18', num_classes=10).eval()
+    nhwc = create_model('resnet18', num_classes=10, channels_last=True).eval()
+    nhwc.load_state_dict(model.state_dict())
+    assert nhwc.conv1.weight.is_contiguous(memory_format=torch.channels_last)
+
+    data = torch.randn(2, 3, 64, 64)
+    with torch.no_grad():
+        assert torch.allclose(model(data), nhwc(data), atol=1e-4)
+
+def test_conv_bn_folding():
+    """Test folded model matches eval outputs and has no BatchNorm left"""
+    model = create_model('resnet50', num_classes=10)
+    model(torch.randn(4, 3, 64, 64))  # populate BatchNorm running stats
+    model.eval()
+
+    data = torch.randn(2, 3, 64, 64)
+    with torch.no_grad():
+        expected = model(data)
+        fused = model.fuse()
+        assert not any(isinstance(m, torch.nn.BatchNorm2d) for m in fused.modules())
+        assert torch.allclose(fused(data), expected, atol=1e-4)
+
+def test_conv_bn_folding_requires_eval():
+    """Test folding is refused in training mode"""
+    with pytest.raises(RuntimeError):
+        create_model('resnet18').fuse()
+
+def test_activation_checkpointing_updates_bn_stats_once():
+    """Test the backward recompute leaves BatchNorm running stats as the plain model's"""
+    torch.manual_seed(0)
+    plain = create_model('resnet18', num_classes=10)
+    checkpointed = create_model('resnet18', num_classes=10, checkpoint_stages=[1, 2, 3, 4])
+    checkpointed.load_state_dict(plain.state_dict())
+
+    data = torch.randn(2, 3, 64, 64)
+    plain(data).sum().backward()
+    checkpointed(data).sum().backward()
+    for name, buf in plain.state_dict().items():
+        assert torch.allclose(buf, checkpointed.state_dict()[name], atol=1e-5), name
+
+def test_pretrained_weights(monkeypatch):
+    """Test pretrained weights are loaded and the head is kept for other class counts"""
+    import src.models.resnet as resnet
+    imagenet = create_model('resnet18', num_classes=1000).state_dict()
+    monkeypatch.setattr(resnet, '_pretrained_state_dict', lambda name: dict(imagenet))
+
+    model = create_model('resnet18', num_classes=10, pretrained=True)
+    assert torch.equal(model.conv1.weight, imagenet['conv1.weight'])
+    assert model.fc.out_features == 10
+    assert torch.equal(create_model('resnet18', pretrained=True).fc.weight, imagenet['fc.weight'])
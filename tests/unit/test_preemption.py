@@ -0,0 +1,140 @@
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import pytest
+import torch
+from torch.utils.data import TensorDataset
+from unittest.mock import patch
+from src.pipeline.trainer import DistributedTrainer, EMERGENCY_CHECKPOINT_KEY
+
+@pytest.fixture
+def preemption_config(tmp_path):
+    return {
+        'batch_size': 4,
+        'epochs': 2,
+        'learning_rate': 0.1,
+        'optimizer': 'sgd',
+        'snapshot_path': str(tmp_path / 'snapshot.pt'),
+        'snapshot_every': 100,
+        'checkpoint_bucket': 'test-checkpoints'
+    }
+
+@pytest.fixture
+def dataset():
+    torch.manual_seed(0)
+    return TensorDataset(torch.randn(16, 4), torch.randint(0, 2, (16,)))
+
+@pytest.fixture
+def restore_sigterm():
+    handler = signal.getsignal(signal.SIGTERM)
+    yield
+    signal.signal(signal.SIGTERM, handler)
+
+class SignallingModel(torch.nn.Module):
+    """Linear model that sends itself SIGTERM during a given forward call."""
+    def __init__(self, signal_at=None):
+        super().__init__()
+        self.linear = torch.nn.Linear(4, 2)
+        self.calls = 0
+        self.signal_at = signal_at
+
+    def forward(self, x):
+        self.calls += 1
+        if self.calls == self.signal_at:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return self.linear(x)
+
+def test_sigterm_stops_at_step_boundary(preemption_config, dataset, tmp_path, restore_sigterm):
+    """Test SIGTERM writes an emergency snapshot and the next run resumes from it"""
+    preemption_config['run_id'] = 'job-1'
+    emergency_key = EMERGENCY_CHECKPOINT_KEY.format(run_id='job-1')
+    uploaded = tmp_path / 'uploaded.pt'
+    with patch('boto3.client') as mock_client:
+        s3 = mock_client.return_value
+        s3.upload_file.side_effect = lambda path, bucket, key: shutil.copy(path, uploaded)
+        trainer = DistributedTrainer(preemption_config, distributed=False)
+        model = SignallingModel(signal_at=2)
+        state = trainer.fit(model, trainer.create_optimizer(model),
+                            torch.nn.CrossEntropyLoss(), dataset)
+
+        assert trainer.preempted
+        assert state.global_step == 2
+        s3.upload_file.assert_called_once_with(
+            preemption_config['snapshot_path'], 'test-checkpoints', emergency_key)
+
+        # A replacement node has no local snapshot, only the uploaded one
+        os.remove(preemption_config['snapshot_path'])
+        s3.download_file.side_effect = lambda bucket, key, path: shutil.copy(uploaded, path)
+        s3.upload_file.side_effect = None
+        trainer = DistributedTrainer(preemption_config, distributed=False)
+        restarted = SignallingModel()
+        state = trainer.fit(restarted, trainer.create_optimizer(restarted),
+                            torch.nn.CrossEntropyLoss(), dataset)
+
+    # Superseded once the resumed run saved its next epoch checkpoint
+    s3.delete_object.assert_called_once_with(Bucket='test-checkpoints', Key=emergency_key)
+    assert not trainer.preempted
+    assert restarted.calls == 6
+    assert state.global_step == 8
+
+def test_no_upload_after_grace_period(preemption_config, dataset, restore_sigterm):
+    """Test the upload is skipped when the grace period has run out"""
+    preemption_config['preemption_grace_seconds'] = 0
+    with patch('boto3.client') as mock_client:
+        trainer = DistributedTrainer(preemption_config, distributed=False)
+        model = SignallingModel(signal_at=1)
+        trainer.fit(model, trainer.create_optimizer(model),
+                    torch.nn.CrossEntropyLoss(), dataset)
+
+    assert trainer.preempted
+    assert os.path.exists(preemption_config['snapshot_path'])
+    mock_client.return_value.upload_file.assert_not_called()
+
+def test_distributed_check_is_periodic(preemption_config):
+    """Test ranks only synchronise on the preemption flag every few steps"""
+    preemption_config['preemption_check_every'] = 5
+    with patch('boto3.client'):
+        trainer = DistributedTrainer(preemption_config, distributed=False)
+    trainer.distributed = True
+    with patch('src.pipeline.trainer.dist.get_backend', return_value='gloo'), \
+            patch('src.pipeline.trainer.dist.all_reduce') as all_reduce:
+        requested = [trainer._preemption_requested(step) for step in range(1, 11)]
+
+    assert not any(requested)
+    assert all_reduce.call_count == 2
+
+def test_handler_is_only_installed_during_fit(preemption_config, dataset, restore_sigterm):
+    """Test SIGTERM handling reverts once fit returns, preempted or not"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    for signal_at in (None, 1):
+        with patch('boto3.client'):
+            trainer = DistributedTrainer(preemption_config, distributed=False)
+            model = SignallingModel(signal_at=signal_at)
+            trainer.fit(model, trainer.create_optimizer(model),
+                        torch.nn.CrossEntropyLoss(), dataset)
+        assert trainer.preempted == (signal_at is not None)
+        assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+WATCHDOG_SCRIPT = """
+import os, signal, time
+from unittest.mock import patch
+from src.pipeline.trainer import DistributedTrainer
+with patch('boto3.client'):
+    trainer = DistributedTrainer({'preemption_grace_seconds': 0.5}, distributed=False)
+trainer.distributed = True
+trainer.install_preemption_handler()
+os.kill(os.getpid(), signal.SIGTERM)
+time.sleep(60)  # stands in for a collective that never returns
+"""
+
+def test_watchdog_exits_when_no_step_boundary_follows(tmp_path):
+    """Test a distributed rank stuck after SIGTERM exits after the grace period"""
+    root = os.path.join(os.path.dirname(__file__), '..', '..')
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, '-c', WATCHDOG_SCRIPT], cwd=root, timeout=60,
+                            capture_output=True, text=True)
+    assert result.returncode == 128 + signal.SIGTERM, result.stderr
+    assert time.monotonic() - start < 30
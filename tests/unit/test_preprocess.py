@@ -0,0 +1,127 @@
+import io
+import tarfile
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+from PIL import Image
+from src.pipeline.preprocess import (
+    SQS_BATCH_BYTES,
+    FileQueue,
+    PreprocessWorker,
+    SQSQueue,
+    enqueue_shards,
+)
+
+def _jpeg(width, height):
+    out = io.BytesIO()
+    Image.new('RGB', (width, height), color=(255, 0, 0)).save(out, format='JPEG')
+    return out.getvalue()
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='data')
+        for i in range(5):
+            client.put_object(Bucket='data', Key=f'train/class_{i % 2}/{i}.jpg',
+                              Body=_jpeg(320, 480))
+        client.put_object(Bucket='data', Key='train/class_0/broken.jpg', Body=b'not a jpeg')
+        yield client
+
+def test_file_queue_redelivers_after_visibility_timeout(tmp_path):
+    """Test an unacknowledged message becomes visible again"""
+    queue = FileQueue(str(tmp_path))
+    queue.send([{'shard': 'a'}])
+
+    message = queue.receive(visibility_timeout=0.2)
+    assert message.body == {'shard': 'a'}
+    assert queue.receive(visibility_timeout=1) is None
+
+    time.sleep(0.3)
+    assert queue.receive(visibility_timeout=1).body == {'shard': 'a'}
+
+def test_file_queue_extend_keeps_message_hidden(tmp_path):
+    """Test a heartbeat extension prevents redelivery"""
+    queue = FileQueue(str(tmp_path))
+    queue.send([{'shard': 'a'}])
+    message = queue.receive(visibility_timeout=0.2)
+
+    queue.extend(message, visibility_timeout=5)
+    time.sleep(0.3)
+    assert queue.receive(visibility_timeout=1) is None
+
+    queue.delete(message)
+    time.sleep(0.1)
+    assert queue.receive(visibility_timeout=1) is None
+
+def test_worker_packs_resized_shards(s3, tmp_path):
+    """Test shards hold resized images and labels, skipping undecodable files"""
+    queue = FileQueue(str(tmp_path))
+    assert enqueue_shards(queue, s3, 'data', 'train/', shard_size=4) == 2
+
+    worker = PreprocessWorker(queue, s3, 'data', 'data', image_size=64)
+    assert worker.run(idle_timeout=0) == 2
+
+    samples = 0
+    for shard in ('train-000000', 'train-000001'):
+        body = s3.get_object(Bucket='data', Key=f'shards/{shard}.tar')['Body'].read()
+        with tarfile.open(fileobj=io.BytesIO(body)) as tar:
+            for member in tar.getmembers():
+                if member.name.endswith('.jpg'):
+                    image = Image.open(tar.extractfile(member))
+                    assert min(image.size) == 64
+                    samples += 1
+    assert samples == 5
+
+def test_redelivered_shard_is_skipped(s3, tmp_path):
+    """Test processing the same work item twice leaves one shard and no error"""
+    queue = FileQueue(str(tmp_path))
+    enqueue_shards(queue, s3, 'data', 'train/', shard_size=10)
+    enqueue_shards(queue, s3, 'data', 'train/', shard_size=10)
+
+    worker = PreprocessWorker(queue, s3, 'data', 'data')
+    assert worker.run(idle_timeout=0) == 2
+    keys = [o['Key'] for o in s3.list_objects_v2(Bucket='data', Prefix='shards/')['Contents']]
+    assert keys == ['shards/train-000000.tar']
+
+def test_sqs_queue_round_trip(s3):
+    """Test the SQS queue sends, receives and deletes work items"""
+    sqs = boto3.client('sqs', region_name='us-east-1')
+    sqs.create_queue(QueueName='training-jobs-queue')
+    queue = SQSQueue(sqs=sqs)
+
+    queue.send([{'shard': f'train-{i:06d}'} for i in range(12)])
+    message = queue.receive(visibility_timeout=30, wait_time=0)
+    queue.extend(message, 60)
+    queue.delete(message)
+
+    attributes = sqs.get_queue_attributes(QueueUrl=queue.queue_url,
+                                          AttributeNames=['ApproximateNumberOfMessages'])
+    assert attributes['Attributes']['ApproximateNumberOfMessages'] == '11'
+
+def test_sqs_batches_full_size_shards_under_the_size_limit(s3):
+    """Test shards of 1000 realistic keys are split across batches under 256 KiB"""
+    sqs = boto3.client('sqs', region_name='us-east-1')
+    sqs.create_queue(QueueName='training-jobs-queue')
+    queue = SQSQueue(sqs=sqs)
+    batch_bytes = []
+    sqs.meta.events.register(
+        'before-parameter-build.sqs.SendMessageBatch',
+        lambda params, **kwargs: batch_bytes.append(
+            sum(len(entry['MessageBody'].encode()) for entry in params['Entries'])))
+
+    key = 'train/class_{:04d}/n01440764_{:06d}_augmented_crop_from_original_capture.JPEG'
+    items = [{'shard': f'train-{shard:06d}',
+              'keys': [key.format(shard, n) for n in range(1000)]} for shard in range(12)]
+    queue.send(items)
+
+    assert len(batch_bytes) > 2
+    assert max(batch_bytes) <= SQS_BATCH_BYTES
+    attributes = sqs.get_queue_attributes(QueueUrl=queue.queue_url,
+                                          AttributeNames=['ApproximateNumberOfMessages'])
+    assert attributes['Attributes']['ApproximateNumberOfMessages'] == '12'
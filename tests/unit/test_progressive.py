@@ -0,0 +1,69 @@
+import io
+
+import pytest
+import torch
+from PIL import Image
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.progressive import ResolutionSchedule
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.storage import MemoryStorage
+
+@pytest.fixture
+def dataset():
+    storage = MemoryStorage()
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), color=(200, 10, 10)).save(buffer, format='JPEG')
+    for i in range(16):
+        storage.put(f'train/class_{i % 2}/{i}.jpg', buffer.getvalue())
+    return S3Dataset(None, prefix='train/', storage=storage)
+
+class ShapeRecorder(torch.nn.Module):
+    """Tiny classifier that records the input shape of every batch."""
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 2, 3)
+        self.shapes = []
+
+    def forward(self, x):
+        self.shapes.append(tuple(x.shape))
+        return self.conv(x).mean(dim=(2, 3))
+
+def test_schedule_resolution_and_batch_scaling():
+    """Test stages apply from their first epoch and batches keep pixels constant"""
+    schedule = ResolutionSchedule({3: 160, 0: 112, 6: 224})
+
+    assert [schedule.resolution(e) for e in range(8)] == [112, 112, 112, 160, 160, 160, 224, 224]
+    assert schedule.batch_size(0, 32) == 128
+    assert schedule.batch_size(3, 32) == 56
+    assert schedule.batch_size(6, 32) == 32
+    assert ResolutionSchedule.from_config({}) is None
+
+def test_dataset_resolution_reaches_running_workers(dataset):
+    """Test set_resolution is seen by persistent workers without a restart"""
+    loader = torch.utils.data.DataLoader(dataset, batch_size=4, num_workers=2,
+                                         persistent_workers=True)
+    assert next(iter(loader))[0].shape[-1] == 224
+    dataset.set_resolution(96)
+    assert next(iter(loader))[0].shape[-1] == 96
+
+def test_fit_follows_resolution_schedule(dataset, tmp_path):
+    """Test fit changes resolution and batch size per epoch and records history"""
+    config = {
+        'batch_size': 4,
+        'epochs': 3,
+        'optimizer': 'sgd',
+        'learning_rate': 0.01,
+        'num_workers': 2,
+        'snapshot_path': str(tmp_path / 'snapshot.pt'),
+        'handle_preemption': False,
+        'resolution_schedule': {0: 112, 2: 224},
+        'scale_batch_with_resolution': True,
+    }
+    trainer = DistributedTrainer(config, distributed=False)
+    model = ShapeRecorder()
+    trainer.fit(model, trainer.create_optimizer(model), torch.nn.CrossEntropyLoss(), dataset)
+
+    assert model.shapes[0] == (16, 3, 112, 112)
+    assert model.shapes[-1] == (4, 3, 224, 224)
+    assert [(h['resolution'], h['batch_size']) for h in trainer.history] == [
+        (112, 16), (112, 16), (224, 4)]
@@ -0,0 +1,90 @@
+import math
+
+import pytest
+import torch
+from torch.utils.data import TensorDataset
+from src.pipeline.pruning import LossPruningSampler, RecordingBatchSampler, SampleLossTracker
+from src.pipeline.trainer import DistributedTrainer
+
+@pytest.fixture
+def dataset():
+    torch.manual_seed(0)
+    return TensorDataset(torch.randn(32, 4), torch.randint(0, 2, (32,)))
+
+@pytest.fixture
+def pruning_config(tmp_path):
+    return {
+        'batch_size': 4,
+        'epochs': 4,
+        'learning_rate': 0.1,
+        'optimizer': 'sgd',
+        'snapshot_path': str(tmp_path / 'snapshot.pt'),
+        'handle_preemption': False,
+        'prune_keep_fraction': 0.25,
+        'prune_warmup_epochs': 1,
+        'prune_anneal_epochs': 1
+    }
+
+def test_tracker_merges_recorded_losses():
+    """Test losses are only updated for samples recorded this epoch"""
+    tracker = SampleLossTracker(4)
+    tracker.record(torch.tensor([0, 2]), torch.tensor([1.0, 3.0]))
+    tracker.merge()
+    tracker.record(torch.tensor([2]), torch.tensor([5.0]))
+    tracker.merge()
+
+    assert tracker.losses[[0, 2]].tolist() == [1.0, 5.0]
+    assert all(math.isnan(v) for v in tracker.losses[[1, 3]].tolist())
+
+def test_sampler_prunes_easy_samples_between_warmup_and_anneal():
+    """Test only below-mean samples are dropped, kept ones upweighted"""
+    tracker = SampleLossTracker(100)
+    tracker.losses.copy_(torch.cat([torch.full((50,), 0.1), torch.full((50,), 2.0)]))
+    sampler = LossPruningSampler(list(range(100)), tracker, keep_fraction=0.2, epochs=4,
+                                 num_replicas=1, rank=0)
+
+    sampler.set_epoch(0)
+    assert len(list(sampler)) == 100  # warm-up
+
+    sampler.set_epoch(1)
+    indices = list(sampler)
+    easy = [i for i in indices if i < 50]
+    assert set(range(50, 100)) <= set(indices)
+    assert 0 < len(easy) < 25
+    assert sampler.weights[easy].eq(5.0).all() and sampler.weights[50:].eq(1.0).all()
+
+    sampler.set_epoch(3)
+    assert len(list(sampler)) == 100  # anneal
+
+def test_pruned_epoch_is_identical_across_ranks():
+    """Test ranks shard the same pruned permutation without overlap"""
+    tracker = SampleLossTracker(40)
+    tracker.losses.copy_(torch.arange(40, dtype=torch.float32))
+    epochs = []
+    for num_replicas, rank in ((1, 0), (2, 0), (2, 1)):
+        sampler = LossPruningSampler(list(range(40)), tracker, keep_fraction=0.5, epochs=5,
+                                     num_replicas=num_replicas, rank=rank, seed=7)
+        sampler.set_epoch(2)
+        epochs.append(list(sampler))
+    full, rank0, rank1 = epochs
+    assert len(full) < 40
+    assert len(rank0) == len(rank1)
+    assert set(rank0 + rank1) == set(full)
+
+def test_recording_batch_sampler_pops_in_order():
+    """Test recorded batch indices come back in the order batches were made"""
+    batches = RecordingBatchSampler(list(range(10)), batch_size=4)
+    iterator = iter(batches)
+    first, second = next(iterator), next(iterator)
+    assert batches.pop() == first and batches.pop() == second
+
+def test_fit_tracks_losses_and_processes_fewer_samples(pruning_config, dataset):
+    """Test fit records every sample's loss and trains on fewer samples while pruning"""
+    trainer = DistributedTrainer(pruning_config, distributed=False)
+    model = torch.nn.Linear(4, 2)
+    trainer.fit(model, trainer.create_optimizer(model), torch.nn.CrossEntropyLoss(), dataset)
+
+    assert not torch.isnan(trainer.loss_tracker.losses).any()
+    samples = [entry['samples'] for entry in trainer.history]
+    assert samples[0] == samples[-1] == 32
+    assert samples[1] < 32 and samples[2] < 32
@@ -0,0 +1,132 @@
+import io
+import os
+import stat
+import threading
+
+import boto3
+import pytest
+from PIL import Image
+from src.utils.local_aws import local_aws
+from src.utils.sample_cache import NodeCacheStorage, SampleCache, SampleCacheServer
+from src.utils.storage import MemoryStorage, storage_from_config
+
+@pytest.fixture
+def network():
+    with local_aws(latency=0.05) as network:
+        boto3.client('s3').create_bucket(Bucket='data')
+        yield network
+
+@pytest.fixture
+def cache_server(tmp_path):
+    cache = SampleCache(memory_budget=2**20,
+                        allowed_urls=['s3://data', 'memory://sample-cache-decoded'])
+    server = SampleCacheServer(str(tmp_path / 'cache.sock'), cache)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _jpeg(color=(200, 10, 10), size=16):
+    buffer = io.BytesIO()
+    Image.new('RGB', (size, size), color=color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+def test_concurrent_reads_share_one_get(network, cache_server):
+    """Test ranks asking for the same key at once cause a single backend GET"""
+    boto3.client('s3').put_object(Bucket='data', Key='train/a.jpg', Body=b'sample')
+    requests = network.requests
+    results = []
+
+    def rank():
+        storage = NodeCacheStorage('s3://data', cache_server.server_address)
+        results.append(storage.get_many(['train/a.jpg']))
+
+    threads = [threading.Thread(target=rank) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [[b'sample']] * 4
+    assert network.requests - requests == 1
+    stats = NodeCacheStorage('s3://data', cache_server.server_address).stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] + stats['deduplicated'] == 3
+
+def test_lru_eviction_respects_budget(tmp_path):
+    """Test the least recently used samples are evicted to stay under budget"""
+    memory = MemoryStorage('sample-cache-lru')
+    for name in 'abc':
+        memory.put(name, name.encode() * 400)
+    cache = SampleCache(memory_budget=1000, allowed_urls=['memory://sample-cache-lru'])
+
+    for keys in (['a'], ['b'], ['a'], ['c']):
+        [future.result() for future in cache.get_many('memory://sample-cache-lru', keys)]
+
+    cached = {key for _, key, _ in cache._entries}
+    assert cached == {'a', 'c'}
+    assert cache.stats.bytes == 800
+    assert cache.stats.evictions == 1
+
+def test_decoded_images_and_missing_keys(cache_server):
+    """Test decoded samples come back as RGB images and missing keys as errors"""
+    MemoryStorage('sample-cache-decoded').put('train/red.jpg', _jpeg(size=20))
+    storage = NodeCacheStorage('memory://sample-cache-decoded', cache_server.server_address,
+                               decoded=True)
+
+    image, missing = storage.get_images(['train/red.jpg', 'train/missing.jpg'])
+    assert image.mode == 'RGB' and image.size == (20, 20)
+    assert image.getpixel((10, 10))[0] > 150
+    assert missing is None
+    with pytest.raises(FileNotFoundError):
+        storage.get('train/missing.jpg')
+    assert storage.get_many(['train/missing.jpg'], ignore_errors=True) == [None]
+
+def test_only_allowed_urls_are_served(cache_server):
+    """Test the daemon refuses storage URLs it was not started for"""
+    MemoryStorage('sample-cache-private').put('k', b'secret')
+    storage = NodeCacheStorage('memory://sample-cache-private', cache_server.server_address)
+
+    with pytest.raises(RuntimeError, match='not served'):
+        storage.get('k')
+    assert storage.get_many(['k'], ignore_errors=True) == [None]
+    assert storage.stats()['misses'] == 0
+
+def test_socket_is_private_to_its_owner(cache_server):
+    """Test the socket is created without group or other access"""
+    assert stat.S_IMODE(os.stat(cache_server.server_address).st_mode) == 0o600
+
+def test_falls_back_to_backend_without_daemon(tmp_path):
+    """Test reads go straight to the backend when no daemon is listening"""
+    MemoryStorage('sample-cache-fallback').put('k', b'direct')
+    storage = NodeCacheStorage('memory://sample-cache-fallback', str(tmp_path / 'none.sock'))
+
+    assert storage.get('k') == b'direct'
+    assert storage.get_many(['k', 'missing'], ignore_errors=True) == [b'direct', None]
+    assert storage.stats() is None
+
+def test_fallback_reads_a_batch_concurrently(tmp_path, monkeypatch):
+    """Test a batch read without the daemon is one concurrent get_many on the backend"""
+    MemoryStorage('sample-cache-batch').put('red.jpg', _jpeg())
+    storage = NodeCacheStorage('memory://sample-cache-batch', str(tmp_path / 'none.sock'),
+                               decoded=True)
+    batches = []
+    get_many = storage.backend.get_many
+    monkeypatch.setattr(storage.backend, 'get_many',
+                        lambda keys, **kwargs: batches.append(keys) or get_many(keys, **kwargs))
+
+    image, missing = storage.get_images(['red.jpg', 'missing.jpg'])
+    assert image.size == (16, 16) and missing is None
+    assert batches == [['red.jpg', 'missing.jpg']]
+    with pytest.raises(FileNotFoundError):
+        storage.get('missing.jpg')
+
+def test_config_routes_data_through_cache(tmp_path):
+    """Test data_cache_socket wraps the data storage in the node cache"""
+    storage = storage_from_config({'data_storage': 'memory://sample-cache-config',
+                                   'data_cache_socket': str(tmp_path / 'cache.sock'),
+                                   'data_cache_decoded': True}, 'data')
+
+    assert isinstance(storage, NodeCacheStorage)
+    assert storage.decoded
+    assert isinstance(storage.backend, MemoryStorage)
@@ -0,0 +1,126 @@
+import io
+
+import boto3
+import pytest
+import torch
+from PIL import Image
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.trainer import DistributedTrainer
+from src.utils.local_aws import local_aws
+from src.utils.storage import (
+    LocalStorage,
+    MemoryStorage,
+    S3Storage,
+    Storage,
+    StorageSettings,
+    open_storage,
+)
+
+@pytest.fixture
+def local_s3():
+    with local_aws():
+        s3 = boto3.client('s3')
+        s3.create_bucket(Bucket='data')
+        yield s3
+
+@pytest.fixture(params=['memory', 'local', 's3'])
+def storage(request, tmp_path, local_s3):
+    if request.param == 'memory':
+        return MemoryStorage()
+    if request.param == 'local':
+        return LocalStorage(str(tmp_path))
+    return S3Storage('data')
+
+def test_round_trip_and_ranges(storage, tmp_path):
+    """Test every backend stores, streams and range-reads the same bytes"""
+    storage.put('a/b.bin', b'0123456789')
+    storage.put_stream('a/c.bin', io.BytesIO(b'streamed'))
+    source = tmp_path / 'source.pt'
+    source.write_bytes(b'checkpoint')
+    storage.put_file('ckpt/epoch_1.pt', str(source))
+
+    assert storage.get('a/b.bin') == b'0123456789'
+    assert storage.get_range('a/b.bin', 2, 3) == b'234'
+    assert storage.get('a/c.bin') == b'streamed'
+    storage.get_file('ckpt/epoch_1.pt', str(tmp_path / 'restored.pt'))
+    assert (tmp_path / 'restored.pt').read_bytes() == b'checkpoint'
+
+def test_delete(storage):
+    """Test deleted keys are gone and deleting a missing key is a no-op"""
+    storage.put('ckpt/emergency.pt', b'x')
+    storage.delete('ckpt/emergency.pt')
+    storage.delete('ckpt/emergency.pt')
+    with pytest.raises(FileNotFoundError):
+        storage.get('ckpt/emergency.pt')
+
+def test_missing_key_raises_file_not_found(storage, tmp_path):
+    """Test a missing key is reported the same way by every backend"""
+    with pytest.raises(FileNotFoundError):
+        storage.get('missing')
+    with pytest.raises(FileNotFoundError):
+        storage.get_file('missing', str(tmp_path / 'missing'))
+
+def test_list_is_ordered_and_paginated(storage):
+    """Test listings cover every page, in S3 key order, filtered by prefix"""
+    keys = [f'train/class_{i % 3}/{i:04d}.jpg' for i in range(25)] + ['train.txt', 'val/x.jpg']
+    for key in reversed(keys):
+        storage.put(key, b'x')
+
+    listed = [obj.key for obj in storage.list('train/', page_size=10)]
+    assert listed == sorted(k for k in keys if k.startswith('train/'))
+    assert [obj.key for obj in storage.list('train')] == sorted(keys[:-1])
+
+def test_get_many_keeps_order_and_can_skip_errors():
+    """Test get_many returns results in key order and None for failures"""
+    storage = MemoryStorage(settings=StorageSettings(max_concurrency=4))
+    for i in range(20):
+        storage.put(str(i), bytes([i]))
+
+    assert storage.get_many([str(i) for i in range(20)]) == [bytes([i]) for i in range(20)]
+    assert storage.get_many(['3', 'missing'], ignore_errors=True) == [b'\x03', None]
+    with pytest.raises(FileNotFoundError):
+        storage.get_many(['3', 'missing'])
+
+def test_open_storage_urls(tmp_path):
+    """Test storage URLs select the backend"""
+    assert isinstance(open_storage('s3://bucket'), S3Storage)
+    assert isinstance(open_storage(f'file://{tmp_path}'), LocalStorage)
+    assert isinstance(open_storage(str(tmp_path)), LocalStorage)
+    open_storage('memory://shared').put('k', b'v')
+    assert open_storage('memory://shared').get('k') == b'v'
+    with pytest.raises(ValueError):
+        open_storage('gs://bucket')
+
+def test_dataset_loads_batches_from_storage():
+    """Test S3Dataset reads labels and images through a storage backend"""
+    storage = MemoryStorage()
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32)).save(buffer, format='JPEG')
+    for i in range(4):
+        storage.put(f'train/class_{i}/{i}.jpg', buffer.getvalue())
+
+    dataset = S3Dataset(None, prefix='train/', storage=storage)
+    loader = torch.utils.data.DataLoader(dataset, batch_size=4)
+    images, labels = next(iter(loader))
+    assert images.shape == (4, 3, 224, 224)
+    assert labels.tolist() == [0, 1, 2, 3]
+
+def test_checkpoints_on_local_storage(tmp_path):
+    """Test checkpoints round-trip through a filesystem checkpoint_storage"""
+    trainer = DistributedTrainer({'checkpoint_storage': str(tmp_path)}, distributed=False)
+    model = torch.nn.Linear(4, 2)
+    trainer.save_checkpoint(model, epoch=3)
+    assert (tmp_path / 'checkpoints' / 'epoch_3.pt').exists()
+
+    restored = torch.nn.Linear(4, 2)
+    assert trainer.load_checkpoint(restored, epoch=3) == 3
+    assert torch.equal(restored.weight, model.weight)
+
+def test_incomplete_backend_cannot_be_instantiated():
+    """Test a backend missing any of the abstract methods fails at construction"""
+    class ReadOnly(Storage):
+        def get(self, key):
+            return b''
+
+    with pytest.raises(TypeError, match='abstract'):
+        ReadOnly()
@@ -0,0 +1,110 @@
+import io
+import json
+import math
+import random
+
+import pytest
+from PIL import Image
+from src.pipeline.data_loader import S3Dataset
+from src.pipeline.sweep import (
+    TrialResult,
+    halving_rungs,
+    rank_trials,
+    run_sweep,
+    sample_trials,
+    write_results,
+)
+from src.utils.storage import MemoryStorage
+
+def test_grid_covers_every_combination():
+    """Test lists form a grid and scalars are held fixed"""
+    trials = sample_trials({'learning_rate': [0.1, 0.01], 'weight_decay': [0.0, 1e-4],
+                            'optimizer': 'sgd'})
+    assert len(trials) == 4
+    assert {(t['learning_rate'], t['weight_decay']) for t in trials} == \
+        {(0.1, 0.0), (0.1, 1e-4), (0.01, 0.0), (0.01, 1e-4)}
+    assert all(t['optimizer'] == 'sgd' for t in trials)
+
+def test_random_trials_are_reproducible_and_in_range():
+    """Test distributions are sampled within bounds, identically for a seed"""
+    space = {'learning_rate': {'log_uniform': [1e-4, 1e-1]},
+             'gradient_clip': {'uniform': [0.5, 2.0]},
+             'weight_decay': [0.0, 1e-4]}
+    trials = sample_trials(space, num_trials=20, seed=3)
+
+    assert trials == sample_trials(space, num_trials=20, seed=3)
+    assert all(1e-4 <= t['learning_rate'] <= 1e-1 for t in trials)
+    assert all(0.5 <= t['gradient_clip'] <= 2.0 for t in trials)
+    assert {t['weight_decay'] for t in trials} <= {0.0, 1e-4}
+    # Log-uniform: spread over orders of magnitude, not bunched near the top
+    assert min(math.log10(t['learning_rate']) for t in trials) < -2.5
+
+def test_invalid_spaces_are_rejected():
+    """Test unknown fields, unknown distributions and ungridable spaces raise"""
+    with pytest.raises(ValueError):
+        sample_trials({'learning_rat': [0.1]})
+    with pytest.raises(ValueError):
+        sample_trials({'learning_rate': {'normal': [0, 1]}}, num_trials=2)
+    with pytest.raises(ValueError):
+        sample_trials({'learning_rate': {'uniform': [0.01, 0.1]}})
+
+def test_halving_rungs():
+    """Test rung budgets grow by eta and end at max_epochs"""
+    assert halving_rungs(1, 9, eta=3) == [1, 3, 9]
+    assert halving_rungs(1, 10, eta=3) == [1, 3, 9, 10]
+    assert halving_rungs(2, 2) == [2]
+    with pytest.raises(ValueError):
+        halving_rungs(0, 9)
+
+def test_results_rank_by_budget_then_accuracy(tmp_path):
+    """Test trials that went further rank first and results are written as JSON"""
+    results = [TrialResult(0, {'learning_rate': 0.1}, 'stopped', epochs=1, val_accuracy=80.0),
+               TrialResult(1, {'learning_rate': 0.01}, 'completed', epochs=3, val_accuracy=70.0),
+               TrialResult(2, {'learning_rate': 0.5}, 'failed', error='diverged'),
+               TrialResult(3, {'learning_rate': 0.02}, 'completed', epochs=3, val_accuracy=75.0)]
+    ranked = rank_trials(results)
+    assert [r.trial for r in ranked] == [3, 1, 0, 2]
+
+    path = tmp_path / 'sweep.json'
+    write_results(ranked, str(path), wall_seconds=12.5)
+    written = json.loads(path.read_text())
+    assert written['wall_seconds'] == 12.5
+    assert written['trials'][0]['params'] == {'learning_rate': 0.02}
+    assert written['trials'][-1]['error'] == 'diverged'
+
+def test_dataset_reuses_given_listing():
+    """Test a listing made once is used instead of listing storage again"""
+    listing = [('train/class_1/a.jpg', 1), ('train/class_2/b.jpg', 2)]
+    dataset = S3Dataset(None, prefix='train/', storage=MemoryStorage(), image_list=listing)
+    assert len(dataset) == 2
+    assert dataset.image_list is listing
+
+def test_run_sweep_stops_the_worse_trial_and_resumes_the_survivor(tmp_path):
+    """Test successive halving stops the worse trial and continues the other from its snapshot"""
+    storage = MemoryStorage('sweep-run')
+    rng = random.Random(0)
+    for split, count in (('train', 32), ('val', 8)):
+        for label, color in enumerate(((200, 30, 30), (30, 30, 200))):
+            for n in range(count):
+                # Noisy red or blue squares: easy to learn, but not constant images
+                pixels = [tuple(max(0, min(255, c + rng.randint(-60, 60))) for c in color)
+                          for _ in range(32 * 32)]
+                image = Image.new('RGB', (32, 32))
+                image.putdata(pixels)
+                buffer = io.BytesIO()
+                image.save(buffer, format='PNG')
+                storage.put(f'{split}/class_{label}/{n}.png', buffer.getvalue())
+    config = {'data_storage': 'memory://sweep-run', 'model_name': 'resnet18', 'num_classes': 2,
+              'optimizer': 'sgd', 'batch_size': 8, 'snapshot_every': 1000}
+    # A zero learning rate never improves on the shared initial weights
+    trials = [{'learning_rate': 0.0}, {'learning_rate': 0.01}]
+
+    results = run_sweep(config, trials, min_epochs=1, max_epochs=2, eta=2, parallel=2,
+                        cache_memory=2**24, work_dir=str(tmp_path))
+
+    survivor, stopped = results
+    assert (survivor.trial, survivor.status, survivor.epochs) == (1, 'completed', 2)
+    assert (stopped.trial, stopped.status, stopped.epochs) == (0, 'stopped', 1)
+    # Resumed at epoch 1 rather than retrained from scratch: two epochs of 64 samples
+    assert survivor.samples == 128
+    assert (tmp_path / 'trial_1.pt').exists()
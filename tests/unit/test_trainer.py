@@ -1,5 +1,8 @@
 import pytest
+import shutil
 import torch
+import torch.distributed as dist
+from torch.distributed.optim import ZeroRedundancyOptimizer
 from src.pipeline.trainer import DistributedTrainer
 
 @pytest.fixture
@@ -34,4 +37,101 @@ def test_save_checkpoint(trainer_config, tmp_path):
     
     # This should not raise any errors
     trainer.save_checkpoint(model, epoch=1)
-    
\ No newline at end of file
+    
+def test_invalid_sharding_mode(trainer_config):
+    """Test unknown sharding modes are rejected"""
+    with pytest.raises(ValueError):
+        DistributedTrainer({**trainer_config, 'sharding': 'tensor'}, distributed=False)
+
+def test_checkpoint_round_trip_with_optimizer(trainer_config, tmp_path):
+    """Test model and optimizer state survive save and load"""
+    trainer = DistributedTrainer(trainer_config, distributed=False)
+    model = torch.nn.Linear(10, 2)
+    optimizer = trainer.create_optimizer(model)
+    model(torch.randn(4, 10)).sum().backward()
+    optimizer.step()
+
+    stored = tmp_path / 'epoch_1.pt'
+    trainer.s3_client.upload_file = lambda path, bucket, key: shutil.copy(path, stored)
+    trainer.s3_client.download_file = lambda bucket, key, path: shutil.copy(stored, path)
+    trainer.save_checkpoint(model, epoch=1, optimizer=optimizer)
+
+    restored = torch.nn.Linear(10, 2)
+    restored_optimizer = trainer.create_optimizer(restored)
+    epoch = trainer.load_checkpoint(restored, epoch=1, optimizer=restored_optimizer)
+
+    assert epoch == 1
+    assert torch.equal(restored.weight, model.weight)
+    assert restored_optimizer.state_dict()['state'][0]['step'] == 1
+
+def test_zero_optimizer_single_rank(trainer_config, monkeypatch):
+    """Test ZeRO mode shards optimizer state over a gloo process group"""
+    monkeypatch.setenv('MASTER_ADDR', '127.0.0.1')
+    monkeypatch.setenv('MASTER_PORT', '29533')
+    monkeypatch.setenv('RANK', '0')
+    monkeypatch.setenv('WORLD_SIZE', '1')
+    monkeypatch.setattr(torch.cuda, 'is_available', lambda: False)
+    trainer = DistributedTrainer({**trainer_config, 'sharding': 'zero'}, distributed=True)
+    try:
+        model = trainer.load_model(torch.nn.Linear(10, 2))
+        optimizer = trainer.create_optimizer(model)
+        assert isinstance(optimizer, ZeroRedundancyOptimizer)
+
+        trainer.train_step(model, (torch.randn(4, 10), torch.randint(0, 2, (4,))),
+                           optimizer, torch.nn.CrossEntropyLoss())
+        state = trainer._optimizer_state_dict(model, optimizer)
+        assert len(state['state']) == 2
+    finally:
+        dist.destroy_process_group()
+
+def test_accelerated_mode(trainer_config, tmp_path):
+    """Test the compiled channels_last path trains and validates"""
+    config = {**trainer_config, 'accelerated': True, 'optimizer': 'sgd',
+              'compile_cache_dir': str(tmp_path)}
+    trainer = DistributedTrainer(config, distributed=False)
+    model = trainer.load_model(torch.nn.Sequential(
+        torch.nn.Conv2d(3, 4, 3), torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(), torch.nn.Linear(4, 2)))
+    optimizer = trainer.create_optimizer(model)
+
+    assert model[0].weight.is_contiguous(memory_format=torch.channels_last)
+    assert optimizer.param_groups[0]['foreach']
+
+    batch = (torch.randn(4, 3, 8, 8), torch.randint(0, 2, (4,)))
+    loss = trainer.train_step(model, batch, optimizer, torch.nn.CrossEntropyLoss())
+    val_loss, accuracy = trainer.validate(model, [batch])
+    assert not torch.isnan(torch.tensor(loss))
+    assert 0 <= accuracy <= 100
+    assert list(model.state_dict()) == ['0.weight', '0.bias', '3.weight', '3.bias']
+
+def test_ddp_checkpoint_loads_into_plain_model(trainer_config, tmp_path, monkeypatch):
+    """Test checkpoints carry bare-model keys, whichever way the model was wrapped"""
+    monkeypatch.setenv('MASTER_ADDR', '127.0.0.1')
+    monkeypatch.setenv('MASTER_PORT', '29534')
+    monkeypatch.setenv('RANK', '0')
+    monkeypatch.setenv('WORLD_SIZE', '1')
+    monkeypatch.setattr(torch.cuda, 'is_available', lambda: False)
+    stored = tmp_path / 'epoch_1.pt'
+    trainer = DistributedTrainer(trainer_config, distributed=True)
+    try:
+        model = trainer.load_model(torch.nn.Linear(10, 2))
+        trainer.s3_client.upload_file = lambda path, bucket, key: shutil.copy(path, stored)
+        trainer.save_checkpoint(model, epoch=1)
+    finally:
+        dist.destroy_process_group()
+    assert set(torch.load(stored)['model_state_dict']) == {'weight', 'bias'}
+
+    plain = DistributedTrainer(trainer_config, distributed=False)
+    plain.s3_client.download_file = lambda bucket, key, path: shutil.copy(stored, path)
+    restored = torch.nn.Linear(10, 2)
+    plain.load_checkpoint(restored, epoch=1)
+    assert torch.equal(restored.weight, model.module.weight)
+
+    # Older checkpoints saved with DDP's prefix still load
+    checkpoint = torch.load(stored)
+    checkpoint['model_state_dict'] = {f'module.{k}': v
+                                      for k, v in checkpoint['model_state_dict'].items()}
+    torch.save(checkpoint, stored)
+    restored = torch.nn.Linear(10, 2)
+    plain.load_checkpoint(restored, epoch=1)
+    assert torch.equal(restored.bias, model.module.bias)